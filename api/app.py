@@ -30,6 +30,7 @@ from api.extensions import db
 from api.log_filters import RedactingUvicornLogger, TokenSanitizingFilter
 from api.schemas.core_schemas import ProblemDetail
 from api.services import okta
+from api.services.okta_request_budget import OktaRequestBudget
 
 logger = logging.getLogger(__name__)
 
@@ -225,10 +226,20 @@ def _validate_plugins() -> None:
 
 def _configure_okta() -> None:
     if settings.OKTA_DOMAIN and settings.OKTA_API_TOKEN:
+        request_budget = None
+        if settings.OKTA_REQUEST_BUDGET_PATH:
+            request_budget = OktaRequestBudget(
+                settings.OKTA_REQUEST_BUDGET_PATH,
+                rate=settings.OKTA_REQUEST_BUDGET_RATE,
+                burst=settings.OKTA_REQUEST_BUDGET_BURST,
+                interactive_reserve=settings.OKTA_REQUEST_BUDGET_INTERACTIVE_RESERVE,
+            )
         okta.initialize(
             settings.OKTA_DOMAIN,
             settings.OKTA_API_TOKEN,
             use_group_owners_api=settings.OKTA_USE_GROUP_OWNERS_API,
+            request_budget=request_budget,
+            org_url=settings.OKTA_ORG_URL,
         )
 
 
@@ -423,9 +434,11 @@ def create_app(testing: Optional[bool] = False) -> FastAPI:
         group_requests,
         groups,
         health,
+        okta_event_hooks,
         plugins,
         role_requests,
         roles,
+        sync_runs,
         tags,
         users,
     )
@@ -437,9 +450,11 @@ def create_app(testing: Optional[bool] = False) -> FastAPI:
     app.include_router(bugs.router, responses=DEFAULT_ERROR_RESPONSES)
     app.include_router(group_requests.router, responses=DEFAULT_ERROR_RESPONSES)
     app.include_router(groups.router, responses=DEFAULT_ERROR_RESPONSES)
+    app.include_router(okta_event_hooks.router, responses=DEFAULT_ERROR_RESPONSES)
     app.include_router(plugins.router, responses=DEFAULT_ERROR_RESPONSES)
     app.include_router(role_requests.router, responses=DEFAULT_ERROR_RESPONSES)
     app.include_router(roles.router, responses=DEFAULT_ERROR_RESPONSES)
+    app.include_router(sync_runs.router, responses=DEFAULT_ERROR_RESPONSES)
     app.include_router(tags.router, responses=DEFAULT_ERROR_RESPONSES)
     app.include_router(users.router, responses=DEFAULT_ERROR_RESPONSES)
 
@@ -128,15 +128,17 @@ CurrentUser = Annotated[OktaUser, Depends(get_current_user)]
 # `CurrentUser` when they need the user-id *value*; this dependency is
 # the safety net if a route forgets the declaration. The catch-all SPA
 # route in `api.app` is also gated by it — static assets aren't exempt.
-AUTH_ALLOWLIST_PREFIXES = ("/api/healthz", "/oidc/")
+# The Okta event hook is called by Okta rather than a user, and checks the
+# shared secret Okta sends instead (`api.routers.okta_event_hooks`).
+AUTH_ALLOWLIST_PREFIXES = ("/api/healthz", "/oidc/", "/api/okta-event-hooks")
 
 
 async def require_authenticated(request: Request, db: DbSession) -> None:
-    """Enforce authentication on every request except `/api/healthz` and
-    the OIDC login endpoints. `/api/docs` and `/api/openapi.json` are
-    intentionally inside the gate — they're served in development and,
-    when `ENABLE_API_DOCS` is set, in staging/production, but always to
-    authenticated users only, as is the catch-all SPA route."""
+    """Enforce authentication on every request except `/api/healthz`, the
+    OIDC login endpoints and the Okta event hook. `/api/docs` and
+    `/api/openapi.json` are intentionally inside the gate — they're served in
+    development and, when `ENABLE_API_DOCS` is set, in staging/production, but
+    always to authenticated users only, as is the catch-all SPA route."""
     path = request.url.path
     if any(path == p.rstrip("/") or path.startswith(p) for p in AUTH_ALLOWLIST_PREFIXES):
         return
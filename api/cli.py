@@ -13,14 +13,19 @@ Run via:
 from __future__ import annotations
 
 import asyncio
+import dataclasses
 import functools
+import json
 import uuid
-from typing import Any, Callable, TypeVar, cast
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar, cast
 
 import click
 from sqlalchemy import func, or_, select
 from sqlalchemy.orm import joinedload
 
+if TYPE_CHECKING:
+    from api.syncer import GroupShard
+
 F = TypeVar("F", bound=Callable[..., Any])
 
 
@@ -40,6 +45,7 @@ def _with_app_context(func: F) -> F:
         from api.database import build_async_engine
         from api.extensions import _session_scope, db
         from api.plugins import load_plugins
+        from api.services.okta_request_budget import RequestPriority, okta_request_priority
 
         # Mirror create_app()'s bootstrap so CLI runs get the same
         # token-redacting log filter, Sentry wiring, and OktaService
@@ -66,7 +72,10 @@ def _with_app_context(func: F) -> F:
             load_plugins()
             token = _session_scope.set(f"cli-{uuid.uuid4().hex}")
             try:
-                return await func(*args, **kwargs)
+                # CLI commands are batch work: they yield the shared Okta
+                # request budget to the web tier (see okta_request_budget).
+                with okta_request_priority(RequestPriority.BATCH):
+                    return await func(*args, **kwargs)
             finally:
                 try:
                     await db.session.commit()
@@ -139,24 +148,29 @@ async def _import_from_okta() -> None:
     from api.extensions import db
     from api.models import OktaGroup, OktaUser, OktaUserGroupMember
     from api.services import okta
+    from api.syncer import load_managed_group_index
 
     click.echo("Starting Okta Import")
     if (await db.session.scalar(select(func.count(OktaUser.id))) or 0) > 0:
         click.echo("Skipping import of Okta Users as they were previously imported")
     else:
         click.echo("Importing Okta Users")
-        user_type_to_user_attrs_to_titles: dict[str, Any] = {}
+        user_type_to_user_attrs_to_titles: dict[str | None, Any] = {}
 
-        users = await okta.list_users()
-        for user in users:
-            if user.type.id not in user_type_to_user_attrs_to_titles:
-                user_type_to_user_attrs_to_titles[user.type.id] = (
-                    await okta.get_user_schema(user.type.id)
-                ).user_attrs_to_titles()
+        # Stream the listings page by page, flushing each page's rows (the
+        # session only holds flushed rows weakly), so the import doesn't hold
+        # every Okta object in memory at once
+        async for page in okta.iter_users():
+            for user in page:
+                if user.type_id not in user_type_to_user_attrs_to_titles:
+                    user_type_to_user_attrs_to_titles[user.type_id] = (
+                        await okta.get_user_schema(user.type_id)
+                    ).user_attrs_to_titles()
 
-            user_attrs_to_titles = user_type_to_user_attrs_to_titles[user.type.id]
+                user_attrs_to_titles = user_type_to_user_attrs_to_titles[user.type_id]
 
-            db.session.add(user.update_okta_user(OktaUser(), user_attrs_to_titles))
+                db.session.add(user.update_okta_user(OktaUser(), user_attrs_to_titles))
+            await db.session.flush()
 
         await db.session.commit()
 
@@ -166,22 +180,24 @@ async def _import_from_okta() -> None:
         click.echo("Importing Okta Groups")
 
         # Consider groups with group rules assigning to them as unmanaged by Access
-        group_ids_with_group_rules = await okta.list_groups_with_active_rules()
-        groups = await okta.list_groups()
-        for group in groups:
-            db.session.add(group.update_okta_group(OktaGroup(), group_ids_with_group_rules))
+        managed_groups = await load_managed_group_index()
+        async for page in okta.iter_groups():
+            for group in page:
+                db.session.add(group.update_okta_group(OktaGroup(), managed_groups.group_rules))
+            await db.session.flush()
         await db.session.commit()
 
     if (await db.session.scalar(select(func.count(OktaUserGroupMember.id))) or 0) > 0:
         click.echo("Skipping import of Okta Group Memberships as they were previously imported")
     else:
         click.echo("Importing Okta Group Memberships")
-        groups = await okta.list_groups()
-        for group in groups:
-            members = await okta.list_users_for_group(group.id)
-            for member in members:
-                if member.get_deleted_at() is None:
-                    db.session.add(OktaUserGroupMember(user_id=member.id, group_id=group.id))
+        async for group_page in okta.iter_groups():
+            for group in group_page:
+                async for page in okta.iter_group_users(group.id):
+                    for member in page:
+                        if member.get_deleted_at() is None:
+                            db.session.add(OktaUserGroupMember(user_id=member.id, group_id=group.id))
+                    await db.session.flush()
         await db.session.commit()
     click.echo("Completed Okta Import")
 
@@ -232,6 +248,23 @@ async def _init_builtin_apps(admin_okta_user_email: str) -> None:
     ).execute()
 
 
+# The stages of `access sync`, in the order they run. Only the per-group
+# stages can be sharded; the others reconcile the whole org at once.
+SYNC_STAGES = ("users", "groups", "memberships", "ownerships", "expire-requests")
+SHARDED_SYNC_STAGES = ("memberships", "ownerships")
+
+
+def _parse_group_shard(ctx: click.Context, param: click.Parameter, value: Optional[str]) -> Optional[GroupShard]:
+    from api.syncer import GroupShard
+
+    if value is None:
+        return None
+    try:
+        return GroupShard.parse(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
 @cli.command("sync")
 @click.option(
     "--sync-groups-authoritatively",
@@ -252,13 +285,74 @@ async def _init_builtin_apps(admin_okta_user_email: str) -> None:
     type=click.IntRange(min=1),
     default=10,
     show_default=True,
-    help="Maximum number of groups whose Okta memberships/ownerships are fetched from Okta concurrently.",
+    help="Maximum number of groups whose Okta memberships/ownerships are fetched from Okta concurrently. "
+    "The syncer backs off below it while Okta's rate limit runs low.",
+)
+@click.option(
+    "--okta-write-concurrency",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Maximum number of concurrent Okta calls made per group to correct its memberships/ownerships "
+    "when syncing them authoritatively.",
+)
+@click.option(
+    "--reconcile-lanes",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of groups whose memberships/ownerships are reconciled against the database at once, "
+    "each on its own database connection. Needs Postgres.",
+)
+@click.option(
+    "--full/--incremental",
+    default=None,
+    help="Sync every Okta user and every group's members, or only those changed since the last sync. "
+    "By default each runs in full once SYNC_USERS_FULL_RECONCILE_INTERVAL_SECONDS / "
+    "SYNC_GROUP_MEMBERSHIPS_FULL_RECONCILE_INTERVAL_SECONDS have passed since its last full run.",
+)
+@click.option(
+    "--shard",
+    callback=_parse_group_shard,
+    metavar="INDEX/COUNT",
+    help="Only sync the memberships/ownerships of the groups in this shard (0-based, e.g. 0/4), so COUNT "
+    "processes can each sync a disjoint slice at once. Without --stage, runs only the per-group stages.",
+)
+@click.option(
+    "--stage",
+    "stages",
+    type=click.Choice(SYNC_STAGES),
+    multiple=True,
+    help="Run only these stages (repeatable). Defaults to every stage, or to memberships and ownerships "
+    "with --shard; run the org-wide stages (users, groups, expire-requests) in exactly one process.",
+)
+@click.option(
+    "--group",
+    "group_refs",
+    metavar="ID|NAME",
+    multiple=True,
+    help="Sync only this group, with its memberships and ownerships (repeatable), instead of running the "
+    "stages, and print the changes made.",
+)
+@click.option(
+    "--user",
+    "user_refs",
+    metavar="ID|EMAIL",
+    multiple=True,
+    help="Sync only this user (repeatable), instead of running the stages, and print the changes made.",
 )
 @_with_app_context
 async def sync(
     sync_groups_authoritatively: bool,
     sync_group_memberships_authoritatively: bool,
     group_fetch_concurrency: int,
+    okta_write_concurrency: int,
+    reconcile_lanes: int,
+    full: bool | None,
+    shard: GroupShard | None,
+    stages: tuple[str, ...],
+    group_refs: tuple[str, ...],
+    user_refs: tuple[str, ...],
 ) -> None:
     """Sync users/groups/memberships from Okta to Access and expire stale requests."""
     from sentry_sdk import start_transaction
@@ -267,48 +361,140 @@ async def sync(
     from api.services import okta
     from api.syncer import (
         expire_access_requests,
+        load_managed_group_index,
+        record_sync_stage,
         sync_group_memberships,
         sync_group_ownerships,
         sync_groups,
         sync_users,
     )
 
+    if group_refs or user_refs:
+        if shard is not None or stages:
+            raise click.UsageError("--group and --user can't be combined with --shard or --stage")
+        await _sync_targets(
+            group_refs,
+            user_refs,
+            sync_groups_authoritatively=sync_groups_authoritatively,
+            sync_group_memberships_authoritatively=sync_group_memberships_authoritatively,
+            okta_write_concurrency=okta_write_concurrency,
+        )
+        return
+
+    if not stages:
+        stages = SHARDED_SYNC_STAGES if shard is not None else SYNC_STAGES
+
+    # Each stage this run makes is recorded in the sync ledger under one run id
+    run_id = str(uuid.uuid4())
+    shard_suffix = f":{shard}" if shard is not None else ""
+
     # Pool one Okta client (and its aiohttp connector) for the whole run so the
     # concurrent per-group membership/ownership fan-out reuses connections.
     # No-op when Okta isn't configured (dev/test).
     await okta.start_pooled_client()
     try:
         with start_transaction(op="sync"):
-            await sync_users()
+            if "users" in stages:
+                async with record_sync_stage(run_id, "users"):
+                    await sync_users(full=full)
 
             # Fetch the active group rules once and reuse them across every pass
             # — group rules don't change over the course of a sync run.
-            group_ids_with_group_rules = await okta.list_groups_with_active_rules()
+            managed_groups = None
+            if not {"groups", "memberships", "ownerships"}.isdisjoint(stages):
+                managed_groups = await load_managed_group_index()
 
-            await sync_groups(
-                act_as_authority=sync_groups_authoritatively,
-                group_ids_with_group_rules=group_ids_with_group_rules,
-            )
+            if "groups" in stages:
+                async with record_sync_stage(run_id, "groups"):
+                    await sync_groups(
+                        act_as_authority=sync_groups_authoritatively,
+                        managed_groups=managed_groups,
+                    )
 
             # Re-list groups once after sync_groups (which can create or delete
             # groups in authoritative mode) and reuse the snapshot for both the
             # membership and ownership passes — neither mutates the group set.
-            groups = await okta.list_groups()
+            groups = None
+            if not {"memberships", "ownerships"}.isdisjoint(stages):
+                groups = await okta.list_groups()
+
+            # Reconcile memberships and ownerships in one pass over the groups
+            # when both run, so their Okta fetches share the prefetch window.
+            sync_ownerships = "ownerships" in stages and settings.OKTA_USE_GROUP_OWNERS_API
+            if "memberships" in stages:
+                stage = "memberships+ownerships" if sync_ownerships else "memberships"
+                async with record_sync_stage(run_id, stage + shard_suffix):
+                    await sync_group_memberships(
+                        act_as_authority=sync_group_memberships_authoritatively,
+                        groups=groups,
+                        managed_groups=managed_groups,
+                        concurrency=group_fetch_concurrency,
+                        write_concurrency=okta_write_concurrency,
+                        reconcile_lanes=reconcile_lanes,
+                        full=full,
+                        shard=shard,
+                        include_ownerships=sync_ownerships,
+                    )
+            elif sync_ownerships:
+                async with record_sync_stage(run_id, "ownerships" + shard_suffix):
+                    await sync_group_ownerships(
+                        act_as_authority=sync_group_memberships_authoritatively,
+                        groups=groups,
+                        managed_groups=managed_groups,
+                        concurrency=group_fetch_concurrency,
+                        write_concurrency=okta_write_concurrency,
+                        reconcile_lanes=reconcile_lanes,
+                        shard=shard,
+                    )
+            if "expire-requests" in stages:
+                async with record_sync_stage(run_id, "expire-requests"):
+                    await expire_access_requests()
+    finally:
+        await okta.stop_pooled_client()
 
-            await sync_group_memberships(
-                act_as_authority=sync_group_memberships_authoritatively,
-                groups=groups,
-                group_ids_with_group_rules=group_ids_with_group_rules,
-                concurrency=group_fetch_concurrency,
-            )
-            if settings.OKTA_USE_GROUP_OWNERS_API:
-                await sync_group_ownerships(
-                    act_as_authority=sync_group_memberships_authoritatively,
-                    groups=groups,
-                    group_ids_with_group_rules=group_ids_with_group_rules,
-                    concurrency=group_fetch_concurrency,
+
+async def _sync_targets(
+    group_refs: tuple[str, ...],
+    user_refs: tuple[str, ...],
+    *,
+    sync_groups_authoritatively: bool,
+    sync_group_memberships_authoritatively: bool,
+    okta_write_concurrency: int,
+) -> None:
+    """Sync just the given users, then the given groups, echoing each one's diff as a line of JSON.
+
+    A user is looked up by id or email and a group by id or name; one not in
+    the DB is taken to be an Okta id (or, for a user, an Okta login).
+    """
+    from api.extensions import db
+    from api.models import OktaUser
+    from api.services import okta
+    from api.syncer import load_managed_group_index, resolve_group_id, sync_group, sync_user
+
+    await okta.start_pooled_client()
+    try:
+        for user_ref in user_refs:
+            user_id = (
+                await db.session.scalars(
+                    select(OktaUser.id)
+                    .where(or_(OktaUser.id == user_ref, OktaUser.email.ilike(user_ref)))
+                    .order_by(OktaUser.deleted_at.is_(None).desc())
                 )
-            await expire_access_requests()
+            ).first()
+            user_diff = await sync_user(user_id or user_ref)
+            click.echo(json.dumps(dataclasses.asdict(user_diff)))
+
+        managed_groups = await load_managed_group_index() if len(group_refs) > 0 else None
+        for group_ref in group_refs:
+            group_id = await resolve_group_id(group_ref)
+            group_diff = await sync_group(
+                group_id or group_ref,
+                sync_groups_authoritatively=sync_groups_authoritatively,
+                sync_group_memberships_authoritatively=sync_group_memberships_authoritatively,
+                managed_groups=managed_groups,
+                write_concurrency=okta_write_concurrency,
+            )
+            click.echo(json.dumps(dataclasses.asdict(group_diff)))
     finally:
         await okta.stop_pooled_client()
 
@@ -323,10 +509,37 @@ async def sync(
 )
 @_with_app_context
 async def fix_unmanaged_groups(dry_run: bool) -> None:
-    """Verify and fix unmanaged-group state in Access against Okta."""
-    from api.integrity import verify_and_fix_unmanaged_groups
+    """Verify and fix unmanaged-group state in Access against Okta.
 
-    await verify_and_fix_unmanaged_groups(dry_run=dry_run)
+    Prints each row ended or rejected (or, with --dry-run, that would be) as a line of
+    JSON, then how many rows each phase found or fixed, and how long it took.
+    """
+    from api.integrity import UnmanagedGroupAccess, verify_and_fix_unmanaged_groups
+
+    def _report(access: UnmanagedGroupAccess) -> None:
+        click.echo(json.dumps(dataclasses.asdict(access)))
+
+    summary = await verify_and_fix_unmanaged_groups(dry_run=dry_run, report=_report)
+    verb = "Found" if dry_run else "Fixed"
+    click.echo(
+        f"Found {summary.groups.count} unmanaged groups with access to remove ({summary.groups.duration_seconds:.2f}s)"
+    )
+    click.echo(
+        f"{verb} {summary.role_memberships.count} memberships/ownerships via roles "
+        f"({summary.role_memberships.duration_seconds:.2f}s)"
+    )
+    click.echo(
+        f"{verb} {summary.role_group_maps.count} role memberships/ownerships "
+        f"({summary.role_group_maps.duration_seconds:.2f}s)"
+    )
+    click.echo(
+        f"{'Found' if dry_run else 'Rejected'} {summary.access_requests.count} pending access requests "
+        f"({summary.access_requests.duration_seconds:.2f}s)"
+    )
+    click.echo(
+        f"{'Found' if dry_run else 'Rejected'} {summary.role_requests.count} pending role requests "
+        f"({summary.role_requests.duration_seconds:.2f}s)"
+    )
 
 
 @cli.command("fix-role-memberships")
@@ -337,12 +550,55 @@ async def fix_unmanaged_groups(dry_run: bool) -> None:
     default=False,
     help="If set will run as dry run and not make any changes",
 )
+@click.option(
+    "--okta-write-concurrency",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Maximum number of concurrent Okta calls made to correct the memberships/ownerships.",
+)
+@_with_app_context
+async def fix_role_memberships(dry_run: bool, okta_write_concurrency: int) -> None:
+    """Verify and fix role-membership state in Access.
+
+    Prints each discrepancy found as a line of JSON as soon as it is found, then a summary.
+    """
+    from api.integrity import RoleMembershipDiscrepancy, verify_and_fix_role_memberships
+    from api.services import okta
+
+    def _report(discrepancy: RoleMembershipDiscrepancy) -> None:
+        click.echo(json.dumps(dataclasses.asdict(discrepancy), default=str))
+
+    await okta.start_pooled_client()
+    try:
+        summary = await verify_and_fix_role_memberships(
+            dry_run=dry_run, okta_write_concurrency=okta_write_concurrency, report=_report
+        )
+    finally:
+        await okta.stop_pooled_client()
+    click.echo(
+        f"{'Found' if dry_run else 'Fixed'} {summary.missing} missing and {summary.extra} extra role "
+        f"memberships/ownerships, {summary.failed_okta_writes} Okta calls failed"
+    )
+
+
+@cli.command("sync-okta-events")
 @_with_app_context
-async def fix_role_memberships(dry_run: bool) -> None:
-    """Verify and fix role-membership state in Access."""
-    from api.integrity import verify_and_fix_role_memberships
+async def sync_okta_events() -> None:
+    """Apply the Okta event hook events still queued, e.g. those whose reconcile failed."""
+    from api.config import settings
+    from api.okta_events import sync_okta_events
+    from api.services import okta
 
-    await verify_and_fix_role_memberships(dry_run=dry_run)
+    await okta.start_pooled_client()
+    try:
+        applied = await sync_okta_events(
+            sync_groups_authoritatively=settings.OKTA_EVENT_HOOK_SYNC_GROUPS_AUTHORITATIVELY,
+            sync_group_memberships_authoritatively=settings.OKTA_EVENT_HOOK_SYNC_GROUP_MEMBERSHIPS_AUTHORITATIVELY,
+        )
+    finally:
+        await okta.stop_pooled_client()
+    click.echo(f"Applied {applied} Okta events")
 
 
 @cli.command("notify")
@@ -360,8 +616,15 @@ async def fix_role_memberships(dry_run: bool) -> None:
     default=False,
     help="If set will notify role owners instead of individuals",
 )
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Maximum number of notifications sent at once.",
+)
 @_with_app_context
-async def notify(owner: bool, role_owner: bool) -> None:
+async def notify(owner: bool, role_owner: bool, concurrency: int) -> None:
     """Send expiring-access notifications."""
     from api.syncer import (
         expiring_access_notifications_owner,
@@ -370,11 +633,12 @@ async def notify(owner: bool, role_owner: bool) -> None:
     )
 
     if owner:
-        await expiring_access_notifications_owner()
+        summary = await expiring_access_notifications_owner(concurrency)
     elif role_owner:
-        await expiring_access_notifications_role_owner()
+        summary = await expiring_access_notifications_role_owner(concurrency)
     else:
-        await expiring_access_notifications_user()
+        summary = await expiring_access_notifications_user(concurrency)
+    click.echo(f"Sent {summary.sent} notifications, {summary.failed} failed, in {summary.duration_seconds:.1f} seconds")
 
 
 async def _sync_all_app_groups() -> int:
@@ -73,9 +73,62 @@ class Settings(BaseSettings):
     # Okta
     OKTA_DOMAIN: Optional[str] = None
     OKTA_API_TOKEN: Optional[str] = None
+    # Base URL of the Okta API, defaulting to https://OKTA_DOMAIN. Lets the sync
+    # benchmarks point Access at the local Okta emulator (tests/okta_emulator.py).
+    OKTA_ORG_URL: Optional[str] = None
     OKTA_USE_GROUP_OWNERS_API: bool = False
     CURRENT_OKTA_USER_EMAIL: str = "wumpus@discord.com"
     OKTA_GROUP_PROFILE_CUSTOM_ATTR: Optional[str] = None
+    # Path to a SQLite file holding an Okta request budget shared by every
+    # Access process on the host (web workers and CLI jobs). Each endpoint
+    # family (users, groups, group members, ...) gets a token bucket refilled
+    # at RATE requests/second up to BURST; batch CLI jobs leave the last
+    # INTERACTIVE_RESERVE fraction of each bucket to web requests. Unset
+    # leaves Okta requests unthrottled. Keep RATE below the org's per-endpoint
+    # rate limits.
+    OKTA_REQUEST_BUDGET_PATH: Optional[str] = None
+    # BURST * INTERACTIVE_RESERVE must leave batch jobs at least one request
+    # (checked by OktaRequestBudget).
+    OKTA_REQUEST_BUDGET_RATE: float = Field(default=10.0, gt=0)
+    OKTA_REQUEST_BUDGET_BURST: int = Field(default=50, ge=1)
+    OKTA_REQUEST_BUDGET_INTERACTIVE_RESERVE: float = Field(default=0.25, ge=0, lt=1)
+
+    # Sync
+    # `access sync` normally pulls only the Okta users whose `lastUpdated` is
+    # past the watermark saved by the previous run. A user hard-deleted from
+    # Okta never shows up in that delta, so a full user listing still runs at
+    # most this many seconds apart to reconcile deletions. `--full` /
+    # `--incremental` on the CLI override the schedule for a single run.
+    SYNC_USERS_FULL_RECONCILE_INTERVAL_SECONDS: int = 24 * 60 * 60
+    # Likewise the membership sync only fetches the members of groups whose
+    # Okta `lastMembershipUpdated` moved, or whose memberships changed in
+    # Access, since their last reconcile. Every group is fetched at most this
+    # many seconds apart to catch any other drift.
+    SYNC_GROUP_MEMBERSHIPS_FULL_RECONCILE_INTERVAL_SECONDS: int = 24 * 60 * 60
+    # A membership sync that was killed partway through is resumed by the next
+    # run, skipping the groups it already reconciled, if that run starts within
+    # this many seconds of the interrupted one. Older progress is discarded and
+    # the pass starts over. 0 disables resuming.
+    SYNC_RESUME_WINDOW_SECONDS: int = 6 * 60 * 60
+    # Groups with at least this many active memberships in the DB are
+    # reconciled by streaming their Okta members page by page against the DB
+    # rows, in bounded batches, instead of diffing the whole member list in
+    # memory.
+    SYNC_STREAMING_RECONCILE_MIN_MEMBERS: int = 5000
+    # Okta event hook (`/api/okta-event-hooks`), which reconciles the groups
+    # and users named by Okta's membership and lifecycle events as they happen.
+    # Okta sends this secret in the Authorization header of every delivery;
+    # unset disables the endpoint.
+    OKTA_EVENT_HOOK_SECRET: Optional[str] = None
+    # Whether those reconciles act as the authority, like `access sync
+    # --sync-groups-authoritatively` / `--sync-group-memberships-authoritatively`.
+    # Match the flags the sync CronJob runs with so the two agree on which side wins.
+    OKTA_EVENT_HOOK_SYNC_GROUPS_AUTHORITATIVELY: bool = False
+    OKTA_EVENT_HOOK_SYNC_GROUP_MEMBERSHIPS_AUTHORITATIVELY: bool = False
+    # How long the event hook reuses its listing of the Okta group rules (which
+    # tell the groups managed by Access), so a burst of deliveries lists them
+    # once. `access sync` lists them afresh every run.
+    OKTA_EVENT_HOOK_GROUP_RULES_TTL_SECONDS: int = Field(default=300, ge=0)
 
     # Database
     SQLALCHEMY_DATABASE_URI: Optional[str] = Field(default_factory=lambda: os.getenv("DATABASE_URI"))
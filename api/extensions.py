@@ -16,7 +16,9 @@ Concurrency rule: an AsyncSession must never be used concurrently. ContextVars
 propagate into tasks spawned with `asyncio.create_task`, so a spawned task
 sees the *same* session as its parent — tasks handed to `create_task` /
 `gather` / `wait` may only perform network I/O (Okta calls, notification
-hooks), never `db.session` access.
+hooks), never `db.session` access — unless the task first sets its own
+`_session_scope`, which gives it a session of its own (as the syncer's
+reconcile lanes do).
 """
 
 from __future__ import annotations
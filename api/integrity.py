@@ -1,166 +1,576 @@
+import asyncio
 import logging
+import time
+from collections.abc import AsyncIterator, Callable, Collection
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import chain
+from typing import Literal
+
+from sqlalchemy import ColumnElement, and_, exists, func, or_, select, update
+from sqlalchemy.orm import aliased
 
-from sqlalchemy import func, or_, select, update
 from api.extensions import db
-from api.models import OktaGroup, OktaUserGroupMember, RoleGroupMap
-from api.operations import UnmanageGroup
+from api.models import (
+    AccessRequest,
+    OktaGroup,
+    OktaUserGroupMember,
+    RoleGroupMap,
+    RoleRequest,
+)
+from api.operations import RejectAccessRequests, RejectRoleRequest
+from api.operations.unmanage_group import (
+    ACCESS_REQUEST_REJECTION_REASON,
+    ROLE_REQUEST_REJECTION_REASON,
+    active_role_memberships,
+    active_role_group_maps,
+    pending_access_requests,
+    pending_role_requests,
+)
 from api.services import okta
 
 logger = logging.getLogger(__name__)
 
 
-async def verify_and_fix_unmanaged_groups(dry_run: bool = False) -> None:
-    active_unmanaged_groups = (
-        await db.session.scalars(
-            select(OktaGroup).where(OktaGroup.is_managed.is_(False)).where(OktaGroup.deleted_at.is_(None))
-        )
-    ).all()
-    for group in active_unmanaged_groups:
-        await UnmanageGroup(group=group.id).execute(dry_run=dry_run)
-
-
-async def verify_and_fix_role_memberships(dry_run: bool = False) -> None:
-    active_role_group_maps = (
-        await db.session.scalars(
-            select(RoleGroupMap).where(
-                or_(
-                    RoleGroupMap.ended_at.is_(None),
-                    RoleGroupMap.ended_at > func.now(),
-                )
-            )
-        )
-    ).all()
-    for active_role_group_map in active_role_group_maps:
-        active_role_group_members_query = (
-            select(OktaUserGroupMember)
-            .where(OktaUserGroupMember.group_id == active_role_group_map.role_group_id)
-            .where(
-                or_(
-                    OktaUserGroupMember.ended_at.is_(None),
-                    OktaUserGroupMember.ended_at > func.now(),
-                )
-            )
-            .where(OktaUserGroupMember.is_owner.is_(False))
-        )
-        active_role_group_members_ids = [
-            m.user_id for m in (await db.session.scalars(active_role_group_members_query)).all()
-        ]
+# Unmanaged groups repaired per batch
+_UNMANAGED_GROUP_BATCH_SIZE = 100
+
+
+@dataclass(slots=True)
+class IntegrityPhase:
+    """How many rows a phase of an integrity check found or fixed, and the time it took."""
+
+    count: int = 0
+    duration_seconds: float = 0.0
+
+
+@dataclass(slots=True)
+class UnmanagedGroupFixSummary:
+    # Unmanaged groups still granting access or with pending requests
+    groups: IntegrityPhase = field(default_factory=IntegrityPhase)
+    # Memberships and ownerships of those groups granted through a role
+    role_memberships: IntegrityPhase = field(default_factory=IntegrityPhase)
+    # Role group maps granting access to those groups
+    role_group_maps: IntegrityPhase = field(default_factory=IntegrityPhase)
+    # Pending access requests for those groups
+    access_requests: IntegrityPhase = field(default_factory=IntegrityPhase)
+    # Pending role requests for or from those groups
+    role_requests: IntegrityPhase = field(default_factory=IntegrityPhase)
 
-        active_group_users_for_role = (
+
+@asynccontextmanager
+async def _timed(phase: IntegrityPhase) -> AsyncIterator[None]:
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        phase.duration_seconds += time.monotonic() - started
+
+
+@dataclass(frozen=True, slots=True)
+class UnmanagedGroupAccess:
+    """Access an unmanaged group still grants, or a pending request for it, which the fix
+    ends or rejects.
+
+    ``role_membership``: a membership or ownership of ``group_id`` granted to ``user_id``
+    through role ``role_group_id``. ``role_group_map``: role ``role_group_id`` granting
+    membership or ownership of ``group_id``. ``access_request``: ``user_id``'s pending
+    request for ``group_id``. ``role_request``: ``user_id``'s pending request for role
+    ``role_group_id`` to get ``group_id``, either of which is unmanaged.
+    """
+
+    kind: Literal["role_membership", "role_group_map", "access_request", "role_request"]
+    id: int | str
+    group_id: str
+    user_id: str | None = None
+    role_group_id: str | None = None
+    is_owner: bool | None = None
+
+
+def _log_unmanaged_group_access(access: UnmanagedGroupAccess) -> None:
+    logger.info(f"Unmanaged group {access.group_id} still has {access.kind.replace('_', ' ')} {access.id}")
+
+
+async def verify_and_fix_unmanaged_groups(
+    dry_run: bool = False, *, report: Callable[[UnmanagedGroupAccess], None] = _log_unmanaged_group_access
+) -> UnmanagedGroupFixSummary:
+    """Take away the access unmanaged groups still grant, as `UnmanageGroup` does, for every
+    unmanaged group at once, unless ``dry_run``.
+
+    One query first finds the unmanaged groups with anything to fix. Those are then fixed
+    a batch at a time, each phase with a query or two per batch: role-granted memberships
+    and ownerships and role group maps are ended, and pending access and role requests
+    rejected. Each row a phase ends or rejects is handed to ``report`` before it is fixed.
+    Returns the rows each phase found (in a dry run) or fixed, and its duration.
+    """
+    summary = UnmanagedGroupFixSummary()
+
+    async with _timed(summary.groups):
+        unmanaged_group_ids = (
             await db.session.scalars(
-                select(OktaUserGroupMember)
+                select(OktaGroup.id)
+                .where(OktaGroup.is_managed.is_(False))
+                .where(OktaGroup.deleted_at.is_(None))
                 .where(
                     or_(
-                        OktaUserGroupMember.ended_at.is_(None),
-                        OktaUserGroupMember.ended_at > func.now(),
+                        exists().where(OktaUserGroupMember.group_id == OktaGroup.id, *active_role_memberships()),
+                        exists().where(RoleGroupMap.group_id == OktaGroup.id, *active_role_group_maps()),
+                        exists().where(AccessRequest.requested_group_id == OktaGroup.id, *pending_access_requests()),
+                        exists().where(
+                            or_(
+                                RoleRequest.requested_group_id == OktaGroup.id,
+                                RoleRequest.requester_role_id == OktaGroup.id,
+                            ),
+                            *pending_role_requests(),
+                        ),
                     )
                 )
-                .where(OktaUserGroupMember.role_group_map_id == active_role_group_map.id)
+                .order_by(OktaGroup.id)
             )
         ).all()
-        active_group_users_for_role_ids = [m.user_id for m in active_group_users_for_role]
-
-        # Fix missing group memberships/ownerships for the role by adding the user to the group
-        missing_group_users_for_role = set(active_role_group_members_ids) - set(active_group_users_for_role_ids)
-        if len(missing_group_users_for_role) > 0:
-            logger.info(
-                f"Role {active_role_group_map.role_group_id} is missing group "
-                f"{'ownerships' if active_role_group_map.is_owner else 'memberships'} in group "
-                f"{active_role_group_map.group_id} for users {missing_group_users_for_role}"
-            )
-            if not dry_run:
-                for member in list(missing_group_users_for_role):
-                    role_group_membership = (
-                        await db.session.scalars(
-                            active_role_group_members_query.where(OktaUserGroupMember.user_id == member)
-                        )
-                    ).first()
-                    # `member` came out of `active_role_group_members_ids` which we
-                    # just built from this same query, so the filter must return a
-                    # row. Assert to narrow `Optional` for type checking.
-                    assert role_group_membership is not None
-                    if not active_role_group_map.is_owner:
-                        # Add user to okta group members
-                        await okta.add_user_to_group(
-                            active_role_group_map.group_id,
-                            member,
-                        )
-                    else:
-                        # Add user to okta group owners
-                        # https://help.okta.com/en-us/Content/Topics/identity-governance/group-owner.htm
-                        await okta.add_owner_to_group(
-                            active_role_group_map.group_id,
-                            member,
-                        )
-                    # If the both the role associated group and role group membership has an end date,
-                    # use the earliest of the two for setting the end date for associated group members and owners
-                    if active_role_group_map.ended_at is None:
-                        associated_users_ended_at = role_group_membership.ended_at
-                    elif role_group_membership.ended_at is None:
-                        associated_users_ended_at = active_role_group_map.ended_at
-                    else:
-                        associated_users_ended_at = min(active_role_group_map.ended_at, role_group_membership.ended_at)
-                    db.session.add(
-                        OktaUserGroupMember(
-                            user_id=member,
-                            group_id=active_role_group_map.group_id,
-                            is_owner=active_role_group_map.is_owner,
-                            role_group_map_id=active_role_group_map.id,
-                            ended_at=associated_users_ended_at,
-                        )
+        summary.groups.count = len(unmanaged_group_ids)
+
+    for batch_start in range(0, len(unmanaged_group_ids), _UNMANAGED_GROUP_BATCH_SIZE):
+        batch = unmanaged_group_ids[batch_start : batch_start + _UNMANAGED_GROUP_BATCH_SIZE]
+
+        # End all group memberships and ownerships via a role (not direct memberships or ownerships)
+        async with _timed(summary.role_memberships):
+            role_memberships = (
+                await db.session.execute(
+                    select(
+                        OktaUserGroupMember.id,
+                        OktaUserGroupMember.group_id,
+                        OktaUserGroupMember.user_id,
+                        RoleGroupMap.role_group_id,
+                        OktaUserGroupMember.is_owner,
                     )
+                    .join(RoleGroupMap, RoleGroupMap.id == OktaUserGroupMember.role_group_map_id)
+                    .where(OktaUserGroupMember.group_id.in_(batch), *active_role_memberships())
+                    .order_by(OktaUserGroupMember.id)
+                )
+            ).all()
+            for row in role_memberships:
+                report(
+                    UnmanagedGroupAccess(
+                        kind="role_membership",
+                        id=row.id,
+                        group_id=row.group_id,
+                        user_id=row.user_id,
+                        role_group_id=row.role_group_id,
+                        is_owner=row.is_owner,
+                    )
+                )
+            summary.role_memberships.count += len(role_memberships)
+            if not dry_run and len(role_memberships) > 0:
+                await db.session.execute(
+                    update(OktaUserGroupMember)
+                    .where(OktaUserGroupMember.id.in_([row.id for row in role_memberships]))
+                    .values({OktaUserGroupMember.ended_at: func.now()})
+                    .execution_options(synchronize_session=False)
+                )
                 await db.session.commit()
 
-        # Fix extra group memberships/ownerships for the role by ending the membership and potentially
-        # removing the user from the group
-        extra_group_users_for_role = set(active_group_users_for_role_ids) - set(active_role_group_members_ids)
-        if len(extra_group_users_for_role) > 0:
-            logger.info(
-                f"Role {active_role_group_map.role_group_id} has extra "
-                f"{'ownerships' if active_role_group_map.is_owner else 'memberships'} in group "
-                f"{active_role_group_map.group_id} for users {extra_group_users_for_role}"
-            )
-            if not dry_run:
-                # End all extra OktaUserGroupMembers the users not members of the role group
+        # End all roles associations where these groups were a member. If a group is a
+        # RoleGroup, keep the groups associated with the role: unmanaged roles can still
+        # be associated with groups.
+        async with _timed(summary.role_group_maps):
+            role_group_maps = (
                 await db.session.execute(
-                    update(OktaUserGroupMember)
-                    .where(
-                        or_(
-                            OktaUserGroupMember.ended_at.is_(None),
-                            OktaUserGroupMember.ended_at > func.now(),
-                        )
+                    select(RoleGroupMap.id, RoleGroupMap.group_id, RoleGroupMap.role_group_id, RoleGroupMap.is_owner)
+                    .where(RoleGroupMap.group_id.in_(batch), *active_role_group_maps())
+                    .order_by(RoleGroupMap.id)
+                )
+            ).all()
+            for row in role_group_maps:
+                report(
+                    UnmanagedGroupAccess(
+                        kind="role_group_map",
+                        id=row.id,
+                        group_id=row.group_id,
+                        role_group_id=row.role_group_id,
+                        is_owner=row.is_owner,
                     )
-                    .where(OktaUserGroupMember.role_group_map_id == active_role_group_map.id)
-                    .where(OktaUserGroupMember.user_id.in_(extra_group_users_for_role))
-                    .values({OktaUserGroupMember.ended_at: func.now()})
-                    .execution_options(synchronize_session="fetch")
+                )
+            summary.role_group_maps.count += len(role_group_maps)
+            if not dry_run and len(role_group_maps) > 0:
+                await db.session.execute(
+                    update(RoleGroupMap)
+                    .where(RoleGroupMap.id.in_([row.id for row in role_group_maps]))
+                    .values({RoleGroupMap.ended_at: func.now()})
+                    .execution_options(synchronize_session=False)
                 )
                 await db.session.commit()
 
-                # Check if there are other OktaUserGroupMembers for this user/group
-                # combination before removing membership, there can be multiple role groups
-                # which allow group access for this user
-                removed_users_with_other_access = (
-                    await db.session.scalars(
-                        select(OktaUserGroupMember)
-                        .where(
-                            or_(
-                                OktaUserGroupMember.ended_at.is_(None),
-                                OktaUserGroupMember.ended_at > func.now(),
-                            )
-                        )
-                        .where(OktaUserGroupMember.is_owner == active_role_group_map.is_owner)
-                        .where(OktaUserGroupMember.group_id == active_role_group_map.group_id)
-                        .where(OktaUserGroupMember.user_id.in_(extra_group_users_for_role))
+        # Reject all pending access requests for these groups
+        async with _timed(summary.access_requests):
+            obsolete_access_requests = (
+                await db.session.execute(
+                    select(AccessRequest.id, AccessRequest.requested_group_id, AccessRequest.requester_user_id)
+                    .where(AccessRequest.requested_group_id.in_(batch), *pending_access_requests())
+                    .order_by(AccessRequest.id)
+                )
+            ).all()
+            for row in obsolete_access_requests:
+                report(
+                    UnmanagedGroupAccess(
+                        kind="access_request", id=row.id, group_id=row.requested_group_id, user_id=row.requester_user_id
                     )
-                ).all()
-                removed_users_with_other_access_ids = [m.user_id for m in removed_users_with_other_access]
-                okta_users_to_remove_ids = set(extra_group_users_for_role) - set(removed_users_with_other_access_ids)
-                for user_id in okta_users_to_remove_ids:
-                    if not active_role_group_map.is_owner:
-                        # Remove user from okta group membership
-                        await okta.remove_user_from_group(active_role_group_map.group_id, user_id)
-                    else:
-                        # Remove user from okta group owners
-                        # https://help.okta.com/en-us/Content/Topics/identity-governance/group-owner.htm
-                        await okta.remove_owner_from_group(active_role_group_map.group_id, user_id)
+                )
+            if dry_run:
+                summary.access_requests.count += len(obsolete_access_requests)
+            elif len(obsolete_access_requests) > 0:
+                rejected = await RejectAccessRequests(
+                    access_requests=[row.id for row in obsolete_access_requests],
+                    rejection_reason=ACCESS_REQUEST_REJECTION_REASON,
+                ).execute()
+                summary.access_requests.count += len(rejected)
+
+        # Reject all pending role requests touching these groups, either as the
+        # requested target or as the requester role. Rare enough to reject one by one.
+        async with _timed(summary.role_requests):
+            obsolete_role_requests = (
+                await db.session.execute(
+                    select(
+                        RoleRequest.id,
+                        RoleRequest.requested_group_id,
+                        RoleRequest.requester_user_id,
+                        RoleRequest.requester_role_id,
+                    )
+                    .where(
+                        or_(RoleRequest.requested_group_id.in_(batch), RoleRequest.requester_role_id.in_(batch)),
+                        *pending_role_requests(),
+                    )
+                    .order_by(RoleRequest.id)
+                )
+            ).all()
+            for row in obsolete_role_requests:
+                report(
+                    UnmanagedGroupAccess(
+                        kind="role_request",
+                        id=row.id,
+                        group_id=row.requested_group_id,
+                        user_id=row.requester_user_id,
+                        role_group_id=row.requester_role_id,
+                    )
+                )
+            summary.role_requests.count += len(obsolete_role_requests)
+            if not dry_run:
+                for obsolete_role_request in obsolete_role_requests:
+                    await RejectRoleRequest(
+                        role_request=obsolete_role_request.id,
+                        rejection_reason=ROLE_REQUEST_REJECTION_REASON,
+                    ).execute()
+
+        logger.info(
+            f"{'Found' if dry_run else 'Fixed'} unmanaged groups {batch_start + 1}-{batch_start + len(batch)} "
+            f"of {len(unmanaged_group_ids)}"
+        )
+
+    return summary
+
+
+# Role group maps checked per pass of the integrity check
+_ROLE_GROUP_MAP_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True, slots=True)
+class RoleMembershipDiscrepancy:
+    """A group membership or ownership a role grants, out of step with the role's members.
+
+    ``missing``: the user is a member of the role but lacks the access it grants, which the
+    fix adds, ending at ``ended_at``. ``extra``: the user has access through the role but is
+    no longer a member of it, which the fix ends.
+    """
+
+    kind: Literal["missing", "extra"]
+    role_group_map_id: int
+    role_group_id: str
+    group_id: str
+    is_owner: bool
+    user_id: str
+    ended_at: datetime | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class RoleMembershipFixSummary:
+    missing: int = 0
+    extra: int = 0
+    failed_okta_writes: int = 0
+
+
+def _is_active(member: type[OktaUserGroupMember]) -> ColumnElement[bool]:
+    return or_(member.ended_at.is_(None), member.ended_at > func.now())
+
+
+def _log_role_membership_discrepancy(discrepancy: RoleMembershipDiscrepancy) -> None:
+    logger.info(
+        f"Role {discrepancy.role_group_id} "
+        f"{'is missing' if discrepancy.kind == 'missing' else 'has extra'} group "
+        f"{'ownership' if discrepancy.is_owner else 'membership'} in group "
+        f"{discrepancy.group_id} for user {discrepancy.user_id}"
+    )
+
+
+async def _iter_active_role_group_map_ids() -> AsyncIterator[list[int]]:
+    """Yield the ids of the active role group maps, in keyset-paginated batches."""
+    after: int | None = None
+    while True:
+        query = (
+            select(RoleGroupMap.id)
+            .where(or_(RoleGroupMap.ended_at.is_(None), RoleGroupMap.ended_at > func.now()))
+            .order_by(RoleGroupMap.id)
+            .limit(_ROLE_GROUP_MAP_BATCH_SIZE)
+        )
+        if after is not None:
+            query = query.where(RoleGroupMap.id > after)
+        role_group_map_ids = list((await db.session.scalars(query)).all())
+        if len(role_group_map_ids) > 0:
+            yield role_group_map_ids
+        if len(role_group_map_ids) < _ROLE_GROUP_MAP_BATCH_SIZE:
+            return
+        after = role_group_map_ids[-1]
+
+
+async def _find_missing_role_memberships(role_group_map_ids: list[int]) -> list[RoleMembershipDiscrepancy]:
+    """Members of the roles lacking the access the role group maps grant, in one anti-join"""
+    role_member = aliased(OktaUserGroupMember)
+    granted = aliased(OktaUserGroupMember)
+    rows = await db.session.execute(
+        select(
+            RoleGroupMap.id,
+            RoleGroupMap.role_group_id,
+            RoleGroupMap.group_id,
+            RoleGroupMap.is_owner,
+            RoleGroupMap.ended_at,
+            role_member.user_id,
+            role_member.ended_at,
+        )
+        .join(
+            role_member,
+            and_(
+                role_member.group_id == RoleGroupMap.role_group_id,
+                role_member.is_owner.is_(False),
+                _is_active(role_member),
+            ),
+        )
+        .where(RoleGroupMap.id.in_(role_group_map_ids))
+        .where(
+            ~exists().where(
+                granted.role_group_map_id == RoleGroupMap.id,
+                granted.user_id == role_member.user_id,
+                _is_active(granted),
+            )
+        )
+        .order_by(RoleGroupMap.id, role_member.user_id)
+    )
+    missing: dict[tuple[int, str], RoleMembershipDiscrepancy] = {}
+    for role_group_map_id, role_group_id, group_id, is_owner, map_ended_at, user_id, member_ended_at in rows:
+        # If both the role group map and the role group membership have an end date, the
+        # access the role grants ends at the earlier of the two
+        if map_ended_at is None:
+            ended_at = member_ended_at
+        elif member_ended_at is None:
+            ended_at = map_ended_at
+        else:
+            ended_at = min(map_ended_at, member_ended_at)
+        # A user with several memberships of the role keeps the access for the longest
+        previous = missing.get((role_group_map_id, user_id))
+        if previous is not None and (
+            previous.ended_at is None or (ended_at is not None and previous.ended_at >= ended_at)
+        ):
+            continue
+        missing[(role_group_map_id, user_id)] = RoleMembershipDiscrepancy(
+            kind="missing",
+            role_group_map_id=role_group_map_id,
+            role_group_id=role_group_id,
+            group_id=group_id,
+            is_owner=is_owner,
+            user_id=user_id,
+            ended_at=ended_at,
+        )
+    return list(missing.values())
+
+
+async def _find_extra_role_memberships(
+    role_group_map_ids: list[int],
+) -> list[tuple[RoleMembershipDiscrepancy, list[int]]]:
+    """Access granted by the role group maps to users no longer members of the role, in one
+    anti-join, with the ids of the memberships that grant it"""
+    role_member = aliased(OktaUserGroupMember)
+    granted = aliased(OktaUserGroupMember)
+    rows = await db.session.execute(
+        select(
+            granted.id,
+            RoleGroupMap.id,
+            RoleGroupMap.role_group_id,
+            RoleGroupMap.group_id,
+            RoleGroupMap.is_owner,
+            granted.user_id,
+        )
+        .join(RoleGroupMap, RoleGroupMap.id == granted.role_group_map_id)
+        .where(RoleGroupMap.id.in_(role_group_map_ids))
+        .where(_is_active(granted))
+        .where(
+            ~exists().where(
+                role_member.group_id == RoleGroupMap.role_group_id,
+                role_member.user_id == granted.user_id,
+                role_member.is_owner.is_(False),
+                _is_active(role_member),
+            )
+        )
+        .order_by(RoleGroupMap.id, granted.user_id)
+    )
+    extra: dict[tuple[int, str], tuple[RoleMembershipDiscrepancy, list[int]]] = {}
+    for membership_id, role_group_map_id, role_group_id, group_id, is_owner, user_id in rows:
+        extra.setdefault(
+            (role_group_map_id, user_id),
+            (
+                RoleMembershipDiscrepancy(
+                    kind="extra",
+                    role_group_map_id=role_group_map_id,
+                    role_group_id=role_group_id,
+                    group_id=group_id,
+                    is_owner=is_owner,
+                    user_id=user_id,
+                ),
+                [],
+            ),
+        )[1].append(membership_id)
+    return list(extra.values())
+
+
+async def _write_okta(calls: Collection[tuple[str, str, str]], concurrency: int) -> set[tuple[str, str, str]]:
+    """Make each ``okta.<call>(group_id, user_id)`` call, keeping up to ``concurrency`` of them in flight.
+
+    A failure is logged and the call returned rather than raised, so one bad call
+    doesn't abort the rest. Network I/O only: these workers never touch ``db.session``
+    (the concurrency rule in ``api/extensions.py``).
+    """
+    remaining = iter(calls)
+    failed: set[tuple[str, str, str]] = set()
+
+    async def _worker() -> None:
+        for call, group_id, user_id in remaining:
+            try:
+                await getattr(okta, call)(group_id, user_id)
+            except Exception:
+                logger.warning(f"Okta {call} failed for user {user_id} in group {group_id}", exc_info=True)
+                failed.add((call, group_id, user_id))
+
+    workers = [asyncio.ensure_future(_worker()) for _ in range(min(concurrency, len(calls)))]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        # Stop the remaining calls if the run is cancelled
+        for worker in workers:
+            worker.cancel()
+    return failed
+
+
+async def _add_missing_role_memberships(missing: list[RoleMembershipDiscrepancy], okta_write_concurrency: int) -> int:
+    """Add the missing access to Okta, then to the DB where Okta accepted it. Returns the failed Okta writes."""
+    calls = [
+        (
+            # https://help.okta.com/en-us/Content/Topics/identity-governance/group-owner.htm
+            "add_owner_to_group" if discrepancy.is_owner else "add_user_to_group",
+            discrepancy.group_id,
+            discrepancy.user_id,
+        )
+        for discrepancy in missing
+    ]
+    # Several roles can grant a user the same access; it takes one Okta call
+    failed = await _write_okta(set(calls), okta_write_concurrency)
+    db.session.add_all(
+        [
+            OktaUserGroupMember(
+                user_id=discrepancy.user_id,
+                group_id=discrepancy.group_id,
+                is_owner=discrepancy.is_owner,
+                role_group_map_id=discrepancy.role_group_map_id,
+                ended_at=discrepancy.ended_at,
+            )
+            for discrepancy, call in zip(missing, calls)
+            if call not in failed
+        ]
+    )
+    await db.session.commit()
+    return len(failed)
+
+
+async def _end_extra_role_memberships(
+    extra: list[tuple[RoleMembershipDiscrepancy, list[int]]], okta_write_concurrency: int
+) -> int:
+    """End the extra access in the DB, then remove it from Okta for the users with no other
+    grant of the same access. Returns the failed Okta writes."""
+    await db.session.execute(
+        update(OktaUserGroupMember)
+        .where(
+            OktaUserGroupMember.id.in_(
+                [membership_id for _, membership_ids in extra for membership_id in membership_ids]
+            )
+        )
+        .where(_is_active(OktaUserGroupMember))
+        .values({OktaUserGroupMember.ended_at: func.now()})
+        .execution_options(synchronize_session="fetch")
+    )
+    await db.session.commit()
+
+    # A user can have the same access directly or through other roles; keep that in Okta
+    ended = {(discrepancy.group_id, discrepancy.user_id, discrepancy.is_owner) for discrepancy, _ in extra}
+    still_granted = set(
+        (
+            await db.session.execute(
+                select(OktaUserGroupMember.group_id, OktaUserGroupMember.user_id, OktaUserGroupMember.is_owner)
+                .where(OktaUserGroupMember.group_id.in_({group_id for group_id, _, _ in ended}))
+                .where(OktaUserGroupMember.user_id.in_({user_id for _, user_id, _ in ended}))
+                .where(_is_active(OktaUserGroupMember))
+            )
+        ).tuples()
+    )
+    calls = [
+        (
+            # https://help.okta.com/en-us/Content/Topics/identity-governance/group-owner.htm
+            "remove_owner_from_group" if is_owner else "remove_user_from_group",
+            group_id,
+            user_id,
+        )
+        for group_id, user_id, is_owner in sorted(ended - still_granted)
+    ]
+    return len(await _write_okta(calls, okta_write_concurrency))
+
+
+async def verify_and_fix_role_memberships(
+    dry_run: bool = False,
+    *,
+    okta_write_concurrency: int = 10,
+    report: Callable[[RoleMembershipDiscrepancy], None] = _log_role_membership_discrepancy,
+) -> RoleMembershipFixSummary:
+    """Find the role-granted group memberships and ownerships out of step with the roles'
+    members, and fix them unless ``dry_run``.
+
+    Checks the active role group maps a batch at a time, with a couple of anti-join
+    queries per batch, and hands each discrepancy to ``report`` as soon as its batch is
+    checked. Each batch is then fixed before the next is checked: the Okta calls are
+    made concurrently, up to ``okta_write_concurrency`` at a time, and the DB changes in
+    bulk.
+    """
+    missing_count = 0
+    extra_count = 0
+    failed_okta_writes = 0
+    async for role_group_map_ids in _iter_active_role_group_map_ids():
+        missing = await _find_missing_role_memberships(role_group_map_ids)
+        extra = await _find_extra_role_memberships(role_group_map_ids)
+        for discrepancy in chain(missing, (discrepancy for discrepancy, _ in extra)):
+            report(discrepancy)
+        missing_count += len(missing)
+        extra_count += len(extra)
+        if dry_run:
+            continue
+
+        if len(missing) > 0:
+            failed_okta_writes += await _add_missing_role_memberships(missing, okta_write_concurrency)
+        if len(extra) > 0:
+            failed_okta_writes += await _end_extra_role_memberships(extra, okta_write_concurrency)
+
+    return RoleMembershipFixSummary(missing=missing_count, extra=extra_count, failed_okta_writes=failed_okta_writes)
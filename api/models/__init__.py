@@ -5,6 +5,7 @@ from api.models.core_models import (
     AppGroup,
     AppTagMap,
     GroupRequest,
+    OktaEventHookEvent,
     OktaGroup,
     OktaGroupTagMap,
     OktaUser,
@@ -12,6 +13,10 @@ from api.models.core_models import (
     RoleGroup,
     RoleGroupMap,
     RoleRequest,
+    SyncLedgerEntry,
+    SyncRun,
+    SyncRunGroup,
+    SyncState,
     Tag,
 )
 
@@ -22,6 +27,7 @@ __all__ = [
     "AppGroup",
     "AppTagMap",
     "GroupRequest",
+    "OktaEventHookEvent",
     "OktaGroup",
     "OktaGroupTagMap",
     "OktaUser",
@@ -29,5 +35,9 @@ __all__ = [
     "RoleGroup",
     "RoleGroupMap",
     "RoleRequest",
+    "SyncLedgerEntry",
+    "SyncRun",
+    "SyncRunGroup",
+    "SyncState",
     "Tag",
 ]
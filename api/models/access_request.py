@@ -1,8 +1,19 @@
-from typing import List, Set
+from collections.abc import Collection
+from typing import Set
 
-from api.models.app_group import get_access_owners, get_app_managers
-from api.models.core_models import AccessRequest, AppGroup, GroupRequest, OktaUser, RoleRequest
-from api.models.okta_group import get_group_managers
+from sqlalchemy import ColumnElement, func, or_, select
+
+from api.extensions import db
+from api.models.app_group import get_access_owners
+from api.models.core_models import (
+    AccessRequest,
+    AppGroup,
+    GroupRequest,
+    OktaGroup,
+    OktaUser,
+    OktaUserGroupMember,
+    RoleRequest,
+)
 
 
 async def get_all_possible_request_approvers(
@@ -12,24 +23,78 @@ async def get_all_possible_request_approvers(
     # to ensure that even if the resolved set of approvers changes
     # we still are able to mark the request as resolved for any users
     # that were notified of the request.
-    group_owners: List[OktaUser] = []
-    app_managers: List[OktaUser] = []
 
     # AccessRequest / RoleRequest have `requested_group_id` + `requested_group`;
     # GroupRequest doesn't (it tracks a *requested* group as separate name/type
     # fields, since the group hasn't been created yet). Branch on the type so
     # mypy narrows the union accurately.
     if isinstance(access_request, (AccessRequest, RoleRequest)):
-        group_owners = await get_group_managers(access_request.requested_group_id)
-        if isinstance(access_request.requested_group, AppGroup):
-            app_managers = await get_app_managers(access_request.requested_group.app_id)
-    elif (
-        isinstance(access_request, GroupRequest)
-        and access_request.requested_group_type == "app_group"
-        and access_request.requested_app_id is not None
+        approvers_by_group_id = await get_all_possible_request_approvers_by_group_id([access_request.requested_group])
+        return approvers_by_group_id[access_request.requested_group.id]
+
+    app_managers: Set[OktaUser] = set()
+    if access_request.requested_group_type == "app_group" and access_request.requested_app_id is not None:
+        app_managers = (await _app_managers_by_app_id({access_request.requested_app_id})).get(
+            access_request.requested_app_id, set()
+        )
+
+    access_app_owners = await get_access_owners()
+
+    return set(access_app_owners) | app_managers
+
+
+def _is_active() -> ColumnElement[bool]:
+    return or_(OktaUserGroupMember.ended_at.is_(None), OktaUserGroupMember.ended_at > func.now())
+
+
+async def _group_owners_by_group_id(group_ids: Collection[str]) -> dict[str, Set[OktaUser]]:
+    """The owners of each of the groups, who can manage its members"""
+    owners_by_group_id: dict[str, Set[OktaUser]] = {}
+    for group_id, owner in await db.session.execute(
+        select(OktaUserGroupMember.group_id, OktaUser)
+        .join(OktaUser, OktaUser.id == OktaUserGroupMember.user_id)
+        .where(OktaUserGroupMember.group_id.in_(group_ids))
+        .where(OktaUserGroupMember.is_owner.is_(True))
+        .where(_is_active())
+    ):
+        owners_by_group_id.setdefault(group_id, set()).add(owner)
+    return owners_by_group_id
+
+
+async def _app_managers_by_app_id(app_ids: Collection[str]) -> dict[str, Set[OktaUser]]:
+    """The owners of each of the apps' owner groups, who can manage the members of the app's groups"""
+    managers_by_app_id: dict[str, Set[OktaUser]] = {}
+    for app_id, manager in await db.session.execute(
+        select(AppGroup.app_id, OktaUser)
+        .join(OktaUserGroupMember, OktaUserGroupMember.group_id == AppGroup.id)
+        .join(OktaUser, OktaUser.id == OktaUserGroupMember.user_id)
+        .where(OktaGroup.deleted_at.is_(None))
+        .where(AppGroup.app_id.in_(app_ids))
+        .where(AppGroup.is_owner.is_(True))
+        .where(OktaUserGroupMember.is_owner.is_(True))
+        .where(_is_active())
     ):
-        app_managers = await get_app_managers(access_request.requested_app_id)
+        managers_by_app_id.setdefault(app_id, set()).add(manager)
+    return managers_by_app_id
+
+
+async def get_all_possible_request_approvers_by_group_id(groups: Collection[OktaGroup]) -> dict[str, Set[OktaUser]]:
+    """`get_all_possible_request_approvers` for access or role requests to any of the groups, by group id
+
+    Resolves the approvers of every group in a few queries, rather than a few per request.
+    """
+    if len(groups) == 0:
+        return {}
 
+    group_owners_by_group_id = await _group_owners_by_group_id({group.id for group in groups})
+    app_ids = {group.app_id for group in groups if isinstance(group, AppGroup)}
+    app_managers_by_app_id = await _app_managers_by_app_id(app_ids) if len(app_ids) > 0 else {}
     access_app_owners = await get_access_owners()
 
-    return set(group_owners + access_app_owners + app_managers)
+    approvers_by_group_id: dict[str, Set[OktaUser]] = {}
+    for group in groups:
+        approvers = set(access_app_owners) | group_owners_by_group_id.get(group.id, set())
+        if isinstance(group, AppGroup):
+            approvers |= app_managers_by_app_id.get(group.app_id, set())
+        approvers_by_group_id[group.id] = approvers
+    return approvers_by_group_id
@@ -1,6 +1,8 @@
+from collections.abc import Collection
 from typing import List
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import and_, func, literal, or_, select, union_all
+from sqlalchemy.orm import aliased
 
 from api.extensions import db
 from api.models.core_models import App, AppGroup, OktaGroup, OktaUser, OktaUserGroupMember
@@ -74,3 +76,80 @@ async def get_access_owners() -> List[OktaUser]:
 
 def app_owners_group_description(app_name: str) -> str:
     return f"Owners of the {app_name} application"
+
+
+async def get_group_managers_with_fallbacks(group_ids: Collection[str]) -> dict[str, List[OktaUser]]:
+    """Returns the users that can manage each group's members, for every group in one query
+
+    That's the group's owners, or else for an app group its app's managers, or
+    else the access super admins, as `get_group_managers`, `get_app_managers`
+    and `get_access_owners` would return them one group at a time. Groups with
+    none of these are left out.
+    """
+    if len(group_ids) == 0:
+        return {}
+
+    active = or_(OktaUserGroupMember.ended_at.is_(None), OktaUserGroupMember.ended_at > func.now())
+    app_group = aliased(AppGroup, flat=True)
+    owner_app_group = aliased(AppGroup, flat=True)
+    candidates = union_all(
+        # The group's owners
+        select(OktaUserGroupMember.group_id, OktaUserGroupMember.user_id, literal(0).label("tier"))
+        .where(OktaUserGroupMember.group_id.in_(group_ids))
+        .where(OktaUserGroupMember.is_owner.is_(True))
+        .where(active),
+        # The owners of the owner groups of an app group's app
+        select(app_group.id, OktaUserGroupMember.user_id, literal(1))
+        .select_from(app_group)
+        .join(
+            owner_app_group,
+            and_(
+                owner_app_group.app_id == app_group.app_id,
+                owner_app_group.is_owner.is_(True),
+                owner_app_group.deleted_at.is_(None),
+            ),
+        )
+        .join(OktaUserGroupMember, OktaUserGroupMember.group_id == owner_app_group.id)
+        .where(app_group.id.in_(group_ids))
+        .where(OktaUserGroupMember.is_owner.is_(True))
+        .where(active),
+        # The members of the Access app's owner groups
+        select(OktaGroup.id, OktaUserGroupMember.user_id, literal(2))
+        .select_from(OktaGroup)
+        .join(
+            App,
+            and_(App.name == App.ACCESS_APP_RESERVED_NAME, App.deleted_at.is_(None)),
+        )
+        .join(
+            owner_app_group,
+            and_(
+                owner_app_group.app_id == App.id,
+                owner_app_group.is_owner.is_(True),
+                owner_app_group.deleted_at.is_(None),
+            ),
+        )
+        .join(OktaUserGroupMember, OktaUserGroupMember.group_id == owner_app_group.id)
+        .where(OktaGroup.id.in_(group_ids))
+        .where(OktaUserGroupMember.is_owner.is_(False))
+        .where(active),
+    ).subquery()
+
+    # Keep each group's candidates from the first tier that has any
+    ranked = select(
+        candidates.c.group_id,
+        candidates.c.user_id,
+        candidates.c.tier,
+        func.min(candidates.c.tier).over(partition_by=candidates.c.group_id).label("first_tier"),
+    ).subquery()
+    managers = (
+        select(ranked.c.group_id, ranked.c.user_id).where(ranked.c.tier == ranked.c.first_tier).distinct().subquery()
+    )
+
+    managers_by_group_id: dict[str, List[OktaUser]] = {}
+    for group_id, user in await db.session.execute(
+        select(managers.c.group_id, OktaUser)
+        .join(OktaUser, OktaUser.id == managers.c.user_id)
+        .order_by(managers.c.group_id, OktaUser.id)
+    ):
+        managers_by_group_id.setdefault(group_id, []).append(user)
+    return managers_by_group_id
@@ -7,13 +7,16 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     Enum,
+    Float,
     ForeignKey,
     Index,
     Integer,
     JSON,
     TypeDecorator,
     Unicode,
+    event,
     func,
+    inspect,
     text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
@@ -164,6 +167,18 @@ class OktaUserGroupMember(Base):
 
 
 class OktaUser(Base):
+    # Columns the syncer writes from the Okta user
+    OKTA_SYNCED_COLUMNS = (
+        "id",
+        "deleted_at",
+        "email",
+        "first_name",
+        "last_name",
+        "display_name",
+        "profile",
+        "employee_number",
+    )
+
     id: Mapped[str] = mapped_column(Unicode(50), primary_key=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(NaiveUTCDateTime(), nullable=False, default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
@@ -210,6 +225,11 @@ class OktaUser(Base):
         server_default="{}",
     )
 
+    # Hash of the values last synced from Okta (see OKTA_SYNCED_COLUMNS), so the
+    # syncer can skip users that did not change. Cleared whenever one of those
+    # columns is changed outside the syncer.
+    okta_profile_hash: Mapped[Optional[str]] = mapped_column(Unicode(64))
+
     manager: Mapped["OktaUser"] = relationship(
         "OktaUser",
         back_populates="reports",
@@ -314,6 +334,9 @@ class OktaUser(Base):
 
 class OktaGroup(Base):
     __tablename__ = "okta_group"
+    # Columns the syncer writes from the Okta group
+    OKTA_SYNCED_COLUMNS = ("name", "description", "is_managed", "externally_managed_data")
+
     id: Mapped[str] = mapped_column(Unicode(50), primary_key=True, nullable=False)
     type: Mapped[str] = mapped_column(Unicode(50), nullable=False)
     created_at: Mapped[datetime] = mapped_column(NaiveUTCDateTime(), nullable=False, default=func.now())
@@ -347,6 +370,17 @@ class OktaGroup(Base):
         server_default="{}",
     )
 
+    # Hash of the values last synced from Okta (see OKTA_SYNCED_COLUMNS), so the
+    # syncer can skip groups that did not change. Cleared whenever one of those
+    # columns is changed outside the syncer.
+    okta_profile_hash: Mapped[Optional[str]] = mapped_column(Unicode(64))
+
+    # Okta's lastMembershipUpdated for the group as of its last successful
+    # membership reconcile, and when that reconcile started. The syncer skips
+    # fetching the members of a group neither Okta nor Access changed since.
+    okta_last_membership_updated: Mapped[Optional[datetime]] = mapped_column(NaiveUTCDateTime())
+    memberships_synced_at: Mapped[Optional[datetime]] = mapped_column(NaiveUTCDateTime())
+
     # See more details on specifying alternative join conditions for relationships at
     # https://docs.sqlalchemy.org/en/14/orm/join_conditions.html#specifying-alternate-join-conditions
     all_user_memberships_and_ownerships: Mapped[List[OktaUserGroupMember]] = relationship(
@@ -503,6 +537,19 @@ class OktaGroup(Base):
     }
 
 
+@event.listens_for(OktaUser, "before_update")
+@event.listens_for(OktaGroup, "before_update", propagate=True)
+def _clear_okta_profile_hash(mapper: Any, connection: Any, target: OktaUser | OktaGroup) -> None:
+    # A synced column changed outside the syncer (e.g. DeleteUser setting
+    # deleted_at) no longer matches the stored hash, so clear it and let the next
+    # sync rewrite the row from Okta. The syncer sets the hash in the same flush.
+    state = inspect(target)
+    if state.attrs.okta_profile_hash.history.has_changes():
+        return
+    if any(state.attrs[column].history.has_changes() for column in target.OKTA_SYNCED_COLUMNS):
+        target.okta_profile_hash = None
+
+
 class RoleGroupMap(Base):
     # See https://stackoverflow.com/a/60840921
     id: Mapped[int] = mapped_column(
@@ -1326,3 +1373,98 @@ class AppTagMap(Base):
         lazy="raise_on_sql",
         innerjoin=True,
     )
+
+
+class SyncState(Base):
+    """Progress the `access sync` CronJob carries from one run to the next, one row per sync stage."""
+
+    name: Mapped[str] = mapped_column(Unicode(50), primary_key=True)
+    # Start of the last successful run; the next incremental run asks Okta for
+    # changes after this point.
+    watermark: Mapped[Optional[datetime]] = mapped_column(NaiveUTCDateTime())
+    # Start of the last successful full (non-incremental) run.
+    last_full_sync_at: Mapped[Optional[datetime]] = mapped_column(NaiveUTCDateTime())
+    updated_at: Mapped[datetime] = mapped_column(
+        NaiveUTCDateTime(), nullable=False, default=func.now(), onupdate=func.now()
+    )
+
+
+class SyncRun(Base):
+    """A membership sync pass in progress, checkpointed so a run killed partway through can be resumed.
+
+    The row is deleted once the pass finishes; one left behind marks a run that
+    stopped early.
+    """
+
+    # The ``SyncState`` name of the stage, e.g. "group_memberships" or "group_memberships:0/4"
+    stage: Mapped[str] = mapped_column(Unicode(50), primary_key=True)
+    # When the run took its Okta group snapshot. A resumed run keeps it, so the
+    # stage's watermark still covers the groups reconciled before the restart.
+    snapshot_at: Mapped[datetime] = mapped_column(NaiveUTCDateTime(), nullable=False)
+    full: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    groups_total: Mapped[int] = mapped_column(Integer, nullable=False)
+    groups_completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        NaiveUTCDateTime(), nullable=False, default=func.now(), onupdate=func.now()
+    )
+
+
+class SyncRunGroup(Base):
+    """A group the ``SyncRun`` of ``stage`` has finished reconciling, committed with the group's reconcile."""
+
+    stage: Mapped[str] = mapped_column(Unicode(50), ForeignKey("sync_run.stage"), primary_key=True)
+    group_id: Mapped[str] = mapped_column(Unicode(50), primary_key=True)
+
+
+class SyncLedgerEntry(Base):
+    """One stage of an ``access sync`` run and what it did, kept as the history of recent runs."""
+
+    __table_args__ = (Index("idx_sync_ledger_entry_started_at", "started_at"),)
+
+    # See https://stackoverflow.com/a/60840921
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        autoincrement=True,
+        primary_key=True,
+    )
+    # Shared by the stages of one ``access sync`` invocation
+    run_id: Mapped[str] = mapped_column(Unicode(36), nullable=False)
+    # The ``access sync --stage`` name, e.g. "users" or "memberships", suffixed with the shard if any
+    stage: Mapped[str] = mapped_column(Unicode(50), nullable=False)
+    started_at: Mapped[datetime] = mapped_column(NaiveUTCDateTime(), nullable=False)
+    duration_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    succeeded: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    # Okta API requests made, by SDK client method, e.g. {"list_group_users": 120}
+    okta_calls: Mapped[Dict[str, int]] = mapped_column(JSON().with_variant(JSONB, "postgresql"), nullable=False)
+    rows_inserted: Mapped[int] = mapped_column(Integer, nullable=False)
+    rows_updated: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Rows the stage ended, e.g. ended memberships and deleted users and groups
+    rows_ended: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Groups left for the next run after a transient Okta error
+    groups_skipped: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Most Okta fetches the stage kept in flight at once; 0 for a stage that doesn't prefetch
+    peak_fetch_window: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class OktaEventHookEvent(Base):
+    """An Okta event delivered to the event hook, queued until the group or user it changed is reconciled.
+
+    Keyed by Okta's event uuid, so an event Okta delivers more than once is
+    queued once. The row is deleted once the event is applied.
+    """
+
+    __table_args__ = (Index("idx_okta_event_hook_event_received_at", "received_at"),)
+
+    id: Mapped[str] = mapped_column(Unicode(50), primary_key=True)
+    # The Okta event type, e.g. "group.user_membership.add"
+    event_type: Mapped[str] = mapped_column(Unicode(255), nullable=False)
+    # The group and the user the event targets, whichever it has
+    group_id: Mapped[Optional[str]] = mapped_column(Unicode(50))
+    user_id: Mapped[Optional[str]] = mapped_column(Unicode(50))
+    published_at: Mapped[Optional[datetime]] = mapped_column(NaiveUTCDateTime())
+    received_at: Mapped[datetime] = mapped_column(NaiveUTCDateTime(), nullable=False, default=func.now())
+    # Set by the process applying the event. A claim is taken over once it is
+    # older than the claim timeout, which is also how a failed event is retried.
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(NaiveUTCDateTime())
+    claimed_by: Mapped[Optional[str]] = mapped_column(Unicode(36))
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
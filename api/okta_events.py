@@ -0,0 +1,245 @@
+"""Near-real-time sync from Okta event hooks.
+
+Okta delivers the events of an event hook to ``/api/okta-event-hooks`` (see
+``api.routers.okta_event_hooks``), which queues the group membership, group
+lifecycle and user lifecycle events as ``OktaEventHookEvent`` rows and applies
+them once it has responded. Applying the queue reconciles just the groups and
+users the events name, with ``api.syncer.sync_group`` / ``sync_user``, so a
+change made directly in Okta reaches Access within seconds instead of at the
+next ``access sync``. ``access sync-okta-events`` applies whatever is left
+queued, e.g. the events whose reconcile failed.
+"""
+
+import logging
+import time
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from okta.models.group_rule import GroupRule as OktaGroupRuleType
+from sqlalchemy import Row, delete, exists, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased
+
+from api.config import settings
+from api.extensions import _session_scope, db
+from api.models import OktaEventHookEvent, OktaUser
+from api.schemas import OktaEvent
+from api.services import okta
+from api.services.okta_request_budget import RequestPriority, okta_request_priority
+from api.services.okta_service import ManagedGroupIndex
+from api.syncer import sync_group, sync_user
+
+logger = logging.getLogger(__name__)
+
+# The Okta event types worth queueing: those that change a group's memberships,
+# a group or a user
+QUEUED_EVENT_TYPE_PREFIXES = ("group.user_membership.", "group.lifecycle.", "user.lifecycle.")
+
+# Events are claimed, and their groups and users reconciled, this many at a time
+_APPLY_BATCH_SIZE = 200
+# A claim older than this is taken over, as its process presumably died. An
+# event whose reconcile failed keeps its claim, so it's retried after this long.
+_CLAIM_TIMEOUT = timedelta(minutes=10)
+# The Postgres advisory lock serializing claims, so each claim sees the groups
+# the others hold (SQLite serializes writes anyway)
+_CLAIM_LOCK_KEY = 0x6F6B7461
+# An event whose reconcile failed this many times is dropped, leaving its
+# group or user to the next `access sync`
+_MAX_ATTEMPTS = 5
+
+# The active Okta group rules as last listed, with the time.monotonic() they
+# were listed at. Shared by every apply in this process; see `_managed_group_index`.
+_cached_group_rules: tuple[float, dict[str, list[OktaGroupRuleType]]] | None = None
+
+
+async def _managed_group_index() -> ManagedGroupIndex:
+    """A managed-group index for one apply of the queue.
+
+    Okta's group rules are listed at most once per
+    ``OKTA_EVENT_HOOK_GROUP_RULES_TTL_SECONDS``, rather than once per delivery,
+    as every listing is charged to the Okta budget the web tier shares. The
+    index itself is built afresh, as it memoizes each group's managed state.
+    """
+    global _cached_group_rules
+
+    now = time.monotonic()
+    if _cached_group_rules is None or now - _cached_group_rules[0] >= settings.OKTA_EVENT_HOOK_GROUP_RULES_TTL_SECONDS:
+        _cached_group_rules = (now, await okta.list_groups_with_active_rules())
+    return ManagedGroupIndex(_cached_group_rules[1])
+
+
+def _queued_event_values(event: OktaEvent) -> dict[str, object] | None:
+    """The ``OktaEventHookEvent`` column values for ``event``, or ``None`` if it isn't worth queueing."""
+    if not event.event_type.startswith(QUEUED_EVENT_TYPE_PREFIXES):
+        return None
+    targets = event.target or []
+    group_id = next((target.id for target in targets if target.type == "UserGroup"), None)
+    user_id = next((target.id for target in targets if target.type == "User"), None)
+    if group_id is None and user_id is None:
+        return None
+    return {
+        "id": event.uuid,
+        "event_type": event.event_type,
+        "group_id": group_id,
+        "user_id": user_id,
+        "published_at": event.published,
+        "received_at": datetime.now(timezone.utc),
+        "attempts": 0,
+    }
+
+
+async def queue_okta_events(events: list[OktaEvent]) -> int:
+    """Queue the events that change a group's memberships, a group or a user, returning how many were queued.
+
+    An event already queued (Okta delivers at least once) is left as it is.
+    """
+    rows = [values for values in map(_queued_event_values, events) if values is not None]
+    if len(rows) > 0:
+        insert = postgresql_insert if db.session.get_bind().dialect.name == "postgresql" else sqlite_insert
+        await db.session.execute(
+            insert(OktaEventHookEvent).values(rows).on_conflict_do_nothing(index_elements=[OktaEventHookEvent.id])
+        )
+    await db.session.commit()
+    return len(rows)
+
+
+async def _claim_okta_events(limit: int) -> Sequence[Row[tuple[str, str, Optional[str], Optional[str], int]]]:
+    """Claim up to ``limit`` of the oldest unclaimed events for this process, and return them.
+
+    An event whose group another claim holds is left queued, so that two
+    deliveries never reconcile the same group at once. The holder claims it
+    once done with the group, as it keeps claiming until the queue is empty.
+
+    Returned as plain column values rather than ORM instances, which a failed
+    reconcile's rollback would expire.
+    """
+    claimed_by = str(uuid.uuid4())
+    now = datetime.now(timezone.utc)
+    claimable = or_(OktaEventHookEvent.claimed_at.is_(None), OktaEventHookEvent.claimed_at < now - _CLAIM_TIMEOUT)
+    held = aliased(OktaEventHookEvent)
+    group_held = exists().where(held.group_id == OktaEventHookEvent.group_id, held.claimed_at >= now - _CLAIM_TIMEOUT)
+    if db.session.get_bind().dialect.name == "postgresql":
+        # Released when the claim commits
+        await db.session.execute(select(func.pg_advisory_xact_lock(_CLAIM_LOCK_KEY)))
+    await db.session.execute(
+        update(OktaEventHookEvent)
+        .where(
+            OktaEventHookEvent.id.in_(
+                select(OktaEventHookEvent.id)
+                .where(claimable, ~group_held)
+                .order_by(OktaEventHookEvent.received_at)
+                .limit(limit)
+            ),
+            # Checked again against the row, so a concurrent claim wins outright
+            claimable,
+        )
+        .values(claimed_at=now, claimed_by=claimed_by, attempts=OktaEventHookEvent.attempts + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await db.session.commit()
+    return (
+        await db.session.execute(
+            select(
+                OktaEventHookEvent.id,
+                OktaEventHookEvent.event_type,
+                OktaEventHookEvent.group_id,
+                OktaEventHookEvent.user_id,
+                OktaEventHookEvent.attempts,
+            )
+            .where(OktaEventHookEvent.claimed_by == claimed_by)
+            .order_by(OktaEventHookEvent.received_at)
+        )
+    ).all()
+
+
+async def sync_okta_events(*, sync_groups_authoritatively: bool, sync_group_memberships_authoritatively: bool) -> int:
+    """Apply the queued Okta events, reconciling each group and user they name once, until the queue is empty.
+
+    The users are synced before the groups, so a group's reconcile finds a
+    member Okta has only just created; a membership event's user is synced
+    only when it isn't in the DB yet. Returns how many events were applied.
+    """
+    applied = 0
+    managed_groups: ManagedGroupIndex | None = None
+    user_type_to_user_attrs_to_titles: dict[str | None, dict[str, str]] = {}
+    while len(events := await _claim_okta_events(_APPLY_BATCH_SIZE)) > 0:
+        # An event naming only a user changed the user; one naming a group
+        # changed the group or its memberships
+        user_ids = {event.user_id for event in events if event.user_id is not None and event.group_id is None}
+        group_ids = {event.group_id for event in events if event.group_id is not None}
+        member_ids = {event.user_id for event in events if event.user_id is not None and event.group_id is not None}
+        if len(member_ids) > 0:
+            known_member_ids = set(
+                (await db.session.scalars(select(OktaUser.id).where(OktaUser.id.in_(member_ids)))).all()
+            )
+            user_ids |= member_ids - known_member_ids
+
+        failed_user_ids: set[str] = set()
+        for user_id in sorted(user_ids):
+            try:
+                await sync_user(user_id, user_type_to_user_attrs_to_titles)
+            except Exception:
+                logger.exception(f"Failed to sync user {user_id} for an Okta event, will retry.")
+                await db.session.rollback()
+                failed_user_ids.add(user_id)
+
+        failed_group_ids: set[str] = set()
+        if len(group_ids) > 0 and managed_groups is None:
+            managed_groups = await _managed_group_index()
+        for group_id in sorted(group_ids):
+            try:
+                await sync_group(
+                    group_id,
+                    sync_groups_authoritatively=sync_groups_authoritatively,
+                    sync_group_memberships_authoritatively=sync_group_memberships_authoritatively,
+                    managed_groups=managed_groups,
+                )
+            except Exception:
+                logger.exception(f"Failed to sync group {group_id} for an Okta event, will retry.")
+                await db.session.rollback()
+                failed_group_ids.add(group_id)
+
+        done_event_ids = []
+        for event in events:
+            if event.user_id not in failed_user_ids and event.group_id not in failed_group_ids:
+                done_event_ids.append(event.id)
+                applied += 1
+            elif event.attempts >= _MAX_ATTEMPTS:
+                logger.error(
+                    f"Dropping Okta event {event.id} ({event.event_type}) after {event.attempts} failed attempts, "
+                    "leaving it to the next sync."
+                )
+                done_event_ids.append(event.id)
+        await db.session.execute(
+            delete(OktaEventHookEvent)
+            .where(OktaEventHookEvent.id.in_(done_event_ids))
+            .execution_options(synchronize_session=False)
+        )
+        await db.session.commit()
+
+    if applied > 0:
+        logger.info(f"Applied {applied} Okta events.")
+    return applied
+
+
+async def apply_queued_okta_events() -> None:
+    """Apply the queued Okta events on a session of this task's own, for running after a response."""
+    token = _session_scope.set(f"okta-events-{uuid.uuid4().hex}")
+    try:
+        # Applying the queue is batch work, like `access sync-okta-events`: it
+        # yields the shared Okta request budget to the web tier
+        with okta_request_priority(RequestPriority.BATCH):
+            await sync_okta_events(
+                sync_groups_authoritatively=settings.OKTA_EVENT_HOOK_SYNC_GROUPS_AUTHORITATIVELY,
+                sync_group_memberships_authoritatively=settings.OKTA_EVENT_HOOK_SYNC_GROUP_MEMBERSHIPS_AUTHORITATIVELY,
+            )
+    except Exception:
+        # Whatever is left queued is applied by the next delivery or
+        # `access sync-okta-events`
+        logger.exception("Failed to apply the queued Okta events.")
+    finally:
+        await db.remove()
+        _session_scope.reset(token)
@@ -1,6 +1,6 @@
 from api.operations.approve_access_request import ApproveAccessRequest
 from api.operations.create_access_request import CreateAccessRequest
-from api.operations.reject_access_request import RejectAccessRequest
+from api.operations.reject_access_request import RejectAccessRequest, RejectAccessRequests
 from api.operations.approve_group_request import ApproveGroupRequest
 from api.operations.create_group_request import CreateGroupRequest
 from api.operations.reject_group_request import RejectGroupRequest
@@ -28,6 +28,7 @@ __all__ = [
     "CreateAccessRequest",
     "ApproveAccessRequest",
     "RejectAccessRequest",
+    "RejectAccessRequests",
     "CreateGroupRequest",
     "ApproveGroupRequest",
     "RejectGroupRequest",
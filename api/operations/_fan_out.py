@@ -134,7 +134,7 @@ def prepare_notification_task(
     *,
     detach: Iterable[Any] = (),
     **kwargs: Any,
-) -> "asyncio.Task[None]":
+) -> "asyncio.Task[bool]":
     """Expunge the hook payload (when deferring) and spawn `send_notification`
     as a task, returning it **without draining**.
 
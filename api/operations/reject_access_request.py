@@ -1,17 +1,27 @@
+import asyncio
+from collections.abc import Iterable
+from itertools import chain
 from typing import Optional
 
 import logging
 
 from api.context import get_request_context
-from sqlalchemy import func, nullsfirst, select
-from sqlalchemy.orm import joinedload, selectin_polymorphic
+from sqlalchemy import func, nullsfirst, select, update
+from sqlalchemy.orm import joinedload, selectin_polymorphic, with_polymorphic
 
 from api.exceptions import ConflictError
 from api.extensions import db
 from api.models import AccessRequest, AccessRequestStatus, AppGroup, OktaGroup, OktaUser, RoleGroup
-from api.models.access_request import get_all_possible_request_approvers
-from api.operations._fan_out import defer_notification
-from api.plugins import NotificationHook
+from api.models.access_request import (
+    get_all_possible_request_approvers,
+    get_all_possible_request_approvers_by_group_id,
+)
+from api.operations._fan_out import (
+    defer_notification,
+    defer_or_drain_fan_out,
+    detach_for_deferred_fan_out,
+)
+from api.plugins import NotificationHook, send_notifications
 from api.schemas import AuditLogSchema, EventType
 
 
@@ -121,3 +131,152 @@ class RejectAccessRequest:
             )
 
         return access_request
+
+
+class RejectAccessRequests:
+    """Reject many pending access requests at once, e.g. every request the syncer expires.
+
+    The set-based counterpart of `RejectAccessRequest`, with no rejecter: the requests
+    are rejected in chunked UPDATEs, audit logged one line per request, and their
+    requesters notified once every chunk is committed, with at most
+    ``notification_concurrency`` notifications in flight. A request
+    that is no longer pending by the time its chunk is rejected is skipped rather than
+    raising a conflict.
+    """
+
+    CHUNK_SIZE = 500
+
+    def __init__(
+        self,
+        *,
+        access_requests: Iterable[AccessRequest | str],
+        rejection_reason: str = "",
+        notify: bool = True,
+        notify_requester: bool = True,
+        notification_concurrency: int = 10,
+    ):
+        self.access_request_ids = list(
+            dict.fromkeys(
+                access_request if isinstance(access_request, str) else access_request.id
+                for access_request in access_requests
+            )
+        )
+
+        self.rejection_reason = rejection_reason
+        self.notify = notify
+        self.notify_requester = notify_requester
+        self.notification_concurrency = notification_concurrency
+
+    async def execute(self) -> list[AccessRequest]:
+        all_group_types = with_polymorphic(OktaGroup, [AppGroup, RoleGroup], flat=True)
+        audit_logger = logging.getLogger("access.audit")
+        audit_log_schema = AuditLogSchema(exclude=["request.approval_ending_at"])
+        _ctx = get_request_context()
+
+        rejected: list[AccessRequest] = []
+        for chunk_start in range(0, len(self.access_request_ids), self.CHUNK_SIZE):
+            chunk = self.access_request_ids[chunk_start : chunk_start + self.CHUNK_SIZE]
+
+            # Lock the chunk's pending rows so the rejection can't race a concurrent
+            # approve/reject of one of them. No-op on SQLite.
+            pending_ids = (
+                await db.session.scalars(
+                    select(AccessRequest.id)
+                    .where(AccessRequest.id.in_(chunk))
+                    .where(AccessRequest.status == AccessRequestStatus.PENDING)
+                    .where(AccessRequest.resolved_at.is_(None))
+                    .with_for_update()
+                )
+            ).all()
+            if len(pending_ids) == 0:
+                await db.session.commit()
+                continue
+            await db.session.execute(
+                update(AccessRequest)
+                .where(AccessRequest.id.in_(pending_ids))
+                .values(
+                    status=AccessRequestStatus.REJECTED,
+                    resolved_at=func.now(),
+                    resolver_user_id=None,
+                    resolution_reason=self.rejection_reason,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.session.commit()
+
+            # Reload the rejected requests with everything the audit log and the
+            # notification hooks read; populate_existing refreshes any the caller loaded
+            access_requests = (
+                await db.session.scalars(
+                    select(AccessRequest)
+                    .options(
+                        joinedload(AccessRequest.requester),
+                        joinedload(AccessRequest.requested_group.of_type(all_group_types)).joinedload(
+                            all_group_types.AppGroup.app
+                        ),
+                    )
+                    .where(AccessRequest.id.in_(pending_ids))
+                    .execution_options(populate_existing=True)
+                )
+            ).all()
+
+            # Audit logging
+            for access_request in access_requests:
+                audit_logger.info(
+                    audit_log_schema.dumps(
+                        {
+                            "event_type": EventType.access_reject,
+                            "user_agent": _ctx.user_agent if _ctx else None,
+                            "ip": _ctx.ip if _ctx else None,
+                            "current_user_id": None,
+                            "current_user_email": None,
+                            "group": access_request.requested_group,
+                            "request": access_request,
+                            "requester": access_request.requester,
+                        }
+                    )
+                )
+            rejected.extend(access_requests)
+
+        if self.notify and len(rejected) > 0:
+            # Resolve every request's approvers before spawning any task: the tasks
+            # must only perform network I/O, never db.session access.
+            approvers_by_group_id = await get_all_possible_request_approvers_by_group_id(
+                list(
+                    {
+                        access_request.requested_group_id: access_request.requested_group for access_request in rejected
+                    }.values()
+                )
+            )
+            notifications = [
+                {
+                    "access_request": access_request,
+                    "group": access_request.requested_group,
+                    "requester": access_request.requester,
+                    "approvers": approvers_by_group_id[access_request.requested_group_id],
+                    "notify_requester": self.notify_requester,
+                }
+                for access_request in rejected
+            ]
+            detach_for_deferred_fan_out(
+                db.session,
+                chain(
+                    chain.from_iterable(
+                        (access_request, access_request.requested_group, access_request.requester)
+                        for access_request in rejected
+                    ),
+                    chain.from_iterable(approvers_by_group_id.values()),
+                ),
+            )
+            # One task keeping at most notification_concurrency notifications in
+            # flight, rather than a task per request all at once
+            notification_task = asyncio.create_task(
+                send_notifications(
+                    NotificationHook.ACCESS_REQUEST_COMPLETED,
+                    notifications,
+                    concurrency=self.notification_concurrency,
+                )
+            )
+            await defer_or_drain_fan_out([notification_task], f"RejectAccessRequests for {len(rejected)} requests")
+
+        return rejected
@@ -3,7 +3,7 @@ from typing import Optional
 
 from sqlalchemy.orm import selectin_polymorphic
 
-from sqlalchemy import func, or_, select, update
+from sqlalchemy import ColumnElement, func, or_, select, update
 from api.extensions import db
 from api.models import (
     AccessRequest,
@@ -21,6 +21,30 @@ from api.operations.reject_role_request import RejectRoleRequest
 
 logger = logging.getLogger(__name__)
 
+ACCESS_REQUEST_REJECTION_REASON = "Closed because the requested group is no longer managed by Access"
+ROLE_REQUEST_REJECTION_REASON = "Closed because a group in this role request is no longer managed by Access"
+
+
+# What an unmanaged group may no longer have, apart from which group it is. Shared with
+# the integrity check, which cleans up every unmanaged group at once.
+def active_role_memberships() -> list[ColumnElement[bool]]:
+    return [
+        or_(OktaUserGroupMember.ended_at.is_(None), OktaUserGroupMember.ended_at > func.now()),
+        OktaUserGroupMember.role_group_map_id.isnot(None),
+    ]
+
+
+def active_role_group_maps() -> list[ColumnElement[bool]]:
+    return [or_(RoleGroupMap.ended_at.is_(None), RoleGroupMap.ended_at > func.now())]
+
+
+def pending_access_requests() -> list[ColumnElement[bool]]:
+    return [AccessRequest.status == AccessRequestStatus.PENDING, AccessRequest.resolved_at.is_(None)]
+
+
+def pending_role_requests() -> list[ColumnElement[bool]]:
+    return [RoleRequest.status == AccessRequestStatus.PENDING, RoleRequest.resolved_at.is_(None)]
+
 
 # Run this operation when a group becomes unmanaged by Access
 class UnmanageGroup:
@@ -54,16 +78,8 @@ class UnmanageGroup:
         # TODO: End all direct ownerships of the group?
 
         # End all group memberships and ownerships via a role (not direct memberships or ownerships)
-        active_access_via_roles_query = (
-            select(OktaUserGroupMember)
-            .where(
-                or_(
-                    OktaUserGroupMember.ended_at.is_(None),
-                    OktaUserGroupMember.ended_at > func.now(),
-                )
-            )
-            .where(OktaUserGroupMember.group_id == group.id)
-            .where(OktaUserGroupMember.role_group_map_id.isnot(None))
+        active_access_via_roles_query = select(OktaUserGroupMember).where(
+            OktaUserGroupMember.group_id == group.id, *active_role_memberships()
         )
 
         for active_access_via_role in (await db.session.scalars(active_access_via_roles_query)).all():
@@ -76,24 +92,15 @@ class UnmanageGroup:
         if not dry_run:
             await db.session.execute(
                 update(OktaUserGroupMember)
-                .where(
-                    or_(
-                        OktaUserGroupMember.ended_at.is_(None),
-                        OktaUserGroupMember.ended_at > func.now(),
-                    )
-                )
-                .where(OktaUserGroupMember.group_id == group.id)
-                .where(OktaUserGroupMember.role_group_map_id.isnot(None))
+                .where(OktaUserGroupMember.group_id == group.id, *active_role_memberships())
                 .values({OktaUserGroupMember.ended_at: func.now()})
                 .execution_options(synchronize_session="fetch")
             )
             await db.session.commit()
 
         # End all roles associations where this group was a member
-        active_role_assignments_query = (
-            select(RoleGroupMap)
-            .where(or_(RoleGroupMap.ended_at.is_(None), RoleGroupMap.ended_at > func.now()))
-            .where(RoleGroupMap.group_id == group.id)
+        active_role_assignments_query = select(RoleGroupMap).where(
+            RoleGroupMap.group_id == group.id, *active_role_group_maps()
         )
 
         for active_role_assignment in (await db.session.scalars(active_role_assignments_query)).all():
@@ -106,8 +113,7 @@ class UnmanageGroup:
         if not dry_run:
             await db.session.execute(
                 update(RoleGroupMap)
-                .where(or_(RoleGroupMap.ended_at.is_(None), RoleGroupMap.ended_at > func.now()))
-                .where(RoleGroupMap.group_id == group.id)
+                .where(RoleGroupMap.group_id == group.id, *active_role_group_maps())
                 .values({RoleGroupMap.ended_at: func.now()})
                 .execution_options(synchronize_session="fetch")
             )
@@ -119,10 +125,7 @@ class UnmanageGroup:
         # Reject all pending access requests for this group
         obsolete_access_requests = (
             await db.session.scalars(
-                select(AccessRequest)
-                .where(AccessRequest.requested_group_id == group.id)
-                .where(AccessRequest.status == AccessRequestStatus.PENDING)
-                .where(AccessRequest.resolved_at.is_(None))
+                select(AccessRequest).where(AccessRequest.requested_group_id == group.id, *pending_access_requests())
             )
         ).all()
         for obsolete_access_request in obsolete_access_requests:
@@ -132,7 +135,7 @@ class UnmanageGroup:
             if not dry_run:
                 await RejectAccessRequest(
                     access_request=obsolete_access_request,
-                    rejection_reason="Closed because the requested group is no longer managed by Access",
+                    rejection_reason=ACCESS_REQUEST_REJECTION_REASON,
                     current_user_id=current_user_id,
                 ).execute()
 
@@ -147,8 +150,7 @@ class UnmanageGroup:
                         RoleRequest.requester_role_id == group.id,
                     )
                 )
-                .where(RoleRequest.status == AccessRequestStatus.PENDING)
-                .where(RoleRequest.resolved_at.is_(None))
+                .where(*pending_role_requests())
             )
         ).all()
         for obsolete_role_request in obsolete_role_requests:
@@ -156,6 +158,6 @@ class UnmanageGroup:
             if not dry_run:
                 await RejectRoleRequest(
                     role_request=obsolete_role_request,
-                    rejection_reason="Closed because a group in this role request is no longer managed by Access",
+                    rejection_reason=ROLE_REQUEST_REJECTION_REASON,
                     current_user_id=current_user_id,
                 ).execute()
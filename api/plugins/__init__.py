@@ -27,7 +27,13 @@ from api.plugins.conditional_access import (
     get_conditional_access_hook,
 )
 from api.plugins.metrics_reporter import get_metrics_reporter_hook
-from api.plugins.notifications import NotificationHook, get_notification_hook, send_notification
+from api.plugins.notifications import (
+    NotificationDispatchSummary,
+    NotificationHook,
+    get_notification_hook,
+    send_notification,
+    send_notifications,
+)
 
 app_group_lifecycle_hook_impl = pluggy.HookimplMarker("access_app_group_lifecycle")
 conditional_access_hook_impl = pluggy.HookimplMarker("access_conditional_access")
@@ -76,9 +82,11 @@ __all__ = [
     "evaluate_conditional_access",
     "conditional_access_hook_impl",
     # Notifications Plugin
+    "NotificationDispatchSummary",
     "NotificationHook",
     "get_notification_hook",
     "send_notification",
+    "send_notifications",
     "notification_hook_impl",
     # Metrics Reporter Plugin
     "get_metrics_reporter_hook",
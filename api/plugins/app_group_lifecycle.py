@@ -795,7 +795,7 @@ class AppGroupLifecycleContext:
             )
         if not matches:
             return None
-        return matches[0].group.id
+        return matches[0].id
 
 
 class AppGroupLifecyclePluginSpec:
@@ -1,5 +1,9 @@
+import asyncio
 import datetime
 import logging
+import time
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
 from enum import StrEnum
 from typing import Any, Dict, Optional
 
@@ -87,7 +91,9 @@ class NotificationPluginSpec:
     — open an issue.
 
     (The `access_expiring_*` hooks are the exception: they fire from the syncer
-    CronJob, not an HTTP request, and run inline on its session.)
+    CronJob, not an HTTP request, on objects still attached to its session. They
+    are dispatched concurrently, several recipients at a time, so the same rule
+    holds: read only what the job already loaded, never trigger a query.)
     """
 
     @hookspec
@@ -179,9 +185,9 @@ class NotificationPluginSpec:
         """Notify the requester that their group request has been processed."""
 
 
-async def send_notification(hook: NotificationHook, /, **kwargs: Any) -> None:
+async def send_notification(hook: NotificationHook, /, **kwargs: Any) -> bool:
     """Fire an async notification hook, swallow plugin errors, and record a
-    "sent" counter when every implementation succeeded.
+    "sent" counter when every implementation succeeded. Returns whether they all did.
 
     This is the async replacement for the old ``@hookimpl(wrapper=True)``
     wrappers: pluggy cannot wrap coroutines, so exception handling and the
@@ -203,9 +209,62 @@ async def send_notification(hook: NotificationHook, /, **kwargs: Any) -> None:
     )
     if exceptions:
         # Failures are already logged; don't record a "sent" for a partial fire.
-        return
+        return False
     metric, tags = _SENT_METRICS[hook]
     await _record_sent(metric, tags)
+    return True
+
+
+@dataclass(frozen=True, slots=True)
+class NotificationDispatchSummary:
+    """What became of a batch of notifications sent by `send_notifications`."""
+
+    sent: int = 0
+    failed: int = 0
+    duration_seconds: float = 0.0
+
+
+async def send_notifications(
+    hook: NotificationHook, notifications: Sequence[Mapping[str, Any]], *, concurrency: int
+) -> NotificationDispatchSummary:
+    """Send a batch of notifications, keeping up to ``concurrency`` of them in flight.
+
+    Each item of ``notifications`` holds the keyword arguments of one
+    `send_notification` call, i.e. one recipient. Used by the batch jobs (the
+    expiring-access notifications) that would otherwise wait on each plugin's
+    network round trip in turn. A failed notification is counted and logged,
+    never raised, so one recipient can't hold up the others. The senders do
+    network I/O only (the concurrency rule in ``api/extensions.py``): load
+    everything the hook reads before calling this.
+    """
+    started = time.monotonic()
+    if len(notifications) == 0:
+        return NotificationDispatchSummary()
+    remaining = iter(notifications)
+    sent = 0
+    failed = 0
+
+    async def _sender() -> None:
+        nonlocal sent, failed
+        for kwargs in remaining:
+            try:
+                succeeded = await send_notification(hook, **kwargs)
+            except Exception:
+                logger.exception("Failed to send %s notification", hook)
+                succeeded = False
+            if succeeded:
+                sent += 1
+            else:
+                failed += 1
+
+    senders = [asyncio.ensure_future(_sender()) for _ in range(min(concurrency, len(notifications)))]
+    try:
+        await asyncio.gather(*senders)
+    finally:
+        # Stop the remaining sends if the job is cancelled
+        for sender in senders:
+            sender.cancel()
+    return NotificationDispatchSummary(sent=sent, failed=failed, duration_seconds=time.monotonic() - started)
 
 
 def get_notification_hook() -> pluggy.HookRelay:
@@ -8,6 +8,7 @@ DELETE /api/groups/{group_id}
 GET    /api/groups/{group_id}/members
 PUT    /api/groups/{group_id}/members
 GET    /api/groups/{group_id}/audit         redirects to /api/audit/users
+POST   /api/groups/{group_id}/resync        access admins only
 """
 
 from __future__ import annotations
@@ -28,6 +29,7 @@ from api.auth.dependencies import CurrentUserId
 from api.auth.permissions import (
     is_access_admin,
     is_app_owner_group_owner,
+    require_access_admin,
 )
 from api.database import DbSession
 from api.models import App, AppGroup, OktaGroup, OktaUser, OktaUserGroupMember, RoleGroup
@@ -56,6 +58,8 @@ from api.schemas import (
     DeleteMessage,
     GroupDetail,
     GroupMembersSummary,
+    GroupResyncBody,
+    GroupResyncDiff,
     GroupSummary,
     OktaUserGroupMemberDetail,
     SearchGroupQuery,
@@ -67,6 +71,7 @@ from api.schemas.requests_schemas import (
     _AppGroupUpdateBody,
     _RoleGroupCreateBody,
 )
+from api.syncer import resolve_group_id, sync_group
 
 router = APIRouter(prefix="/api/groups", tags=["groups"], dependencies=[Depends(defer_fan_out)])
 
@@ -517,6 +522,28 @@ async def get_group_audit(group_id: str, request: Request, current_user_id: Curr
     return RedirectResponse(url=f"/api/audit/users?{urlencode(qp)}", status_code=307)
 
 
+@router.post("/{group_id}/resync", name="group_resync_by_id")
+async def resync_group(
+    group_id: str,
+    db: DbSession,
+    current_user_id: CurrentUserId,
+    body: GroupResyncBody | None = None,
+    _admin: str = Depends(require_access_admin),
+) -> GroupResyncDiff:
+    # Reconciles the one group against Okta as `access sync` would, for support
+    # to fix a group without waiting for (or running) an org-wide sync
+    resolved_group_id = await resolve_group_id(group_id)
+    if resolved_group_id is None:
+        raise HTTPException(404, "Not Found")
+    body = body or GroupResyncBody()
+    diff = await sync_group(
+        resolved_group_id,
+        sync_groups_authoritatively=body.sync_groups_authoritatively,
+        sync_group_memberships_authoritatively=body.sync_group_memberships_authoritatively,
+    )
+    return GroupResyncDiff.model_validate(diff)
+
+
 @router.get("/{group_id}/members", name="group_members_by_id")
 async def get_group_members(group_id: str, db: DbSession, current_user_id: CurrentUserId) -> GroupMembersSummary:
     group = (
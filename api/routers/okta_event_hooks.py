@@ -0,0 +1,53 @@
+"""Okta event hook router. Called by Okta, not by users: on the auth allowlist and
+authenticated instead by the shared secret Okta sends in the Authorization header
+(`OKTA_EVENT_HOOK_SECRET`). Left out of the OpenAPI schema, as no client of ours calls it.
+"""
+
+from __future__ import annotations
+
+import hmac
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException
+
+from api.config import settings
+from api.okta_events import apply_queued_okta_events, queue_okta_events
+from api.schemas import OktaEventHookPayload, OktaEventHookReceipt, OktaEventHookVerification
+
+
+def require_okta_event_hook_secret(authorization: Annotated[Optional[str], Header()] = None) -> None:
+    """404 while the event hook is disabled (no secret configured), 401 without the right secret."""
+    secret = settings.OKTA_EVENT_HOOK_SECRET
+    if not secret:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if authorization is None or not hmac.compare_digest(authorization.encode(), secret.encode()):
+        raise HTTPException(status_code=401, detail="Invalid Okta event hook credentials")
+
+
+router = APIRouter(
+    prefix="/api/okta-event-hooks",
+    tags=["okta-event-hooks"],
+    include_in_schema=False,
+    dependencies=[Depends(require_okta_event_hook_secret)],
+)
+
+
+@router.get("", name="verify_okta_event_hook")
+async def verify_okta_event_hook(
+    x_okta_verification_challenge: Annotated[str, Header()],
+) -> OktaEventHookVerification:
+    # Okta verifies the endpoint once, when the event hook is set up
+    return OktaEventHookVerification(verification=x_okta_verification_challenge)
+
+
+@router.post("", name="receive_okta_event_hook")
+async def receive_okta_event_hook(
+    payload: OktaEventHookPayload,
+    background_tasks: BackgroundTasks,
+) -> OktaEventHookReceipt:
+    # Okta gives up on a delivery that takes more than a few seconds, so only
+    # queue the events here and reconcile once the response is sent
+    queued = await queue_okta_events(payload.data.events)
+    if queued > 0:
+        background_tasks.add_task(apply_queued_okta_events)
+    return OktaEventHookReceipt(queued=queued)
@@ -0,0 +1,26 @@
+"""Sync runs router. Read-only history of the `access sync` stages, for access admins."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+from fastapi_pagination.ext.sqlalchemy import apaginate
+from sqlalchemy import select
+
+from api.auth.dependencies import CurrentUserId
+from api.auth.permissions import require_access_admin
+from api.database import DbSession
+from api.models import SyncLedgerEntry
+from api.pagination import Page, validated
+from api.schemas import SyncLedgerEntryDetail
+
+router = APIRouter(prefix="/api/sync-runs", tags=["sync-runs"])
+
+
+@router.get("", name="sync_runs")
+async def list_sync_runs(
+    db: DbSession,
+    current_user_id: CurrentUserId,
+    _admin: str = Depends(require_access_admin),
+) -> Page[SyncLedgerEntryDetail]:
+    stmt = select(SyncLedgerEntry).order_by(SyncLedgerEntry.started_at.desc(), SyncLedgerEntry.id.desc())
+    return await apaginate(db, stmt, transformer=validated(SyncLedgerEntryDetail))
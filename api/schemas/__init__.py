@@ -54,6 +54,13 @@ from api.schemas.plugin_schemas import (  # noqa: F401
     PluginInfo,
     PluginStatusProp,
 )
+from api.schemas.okta_event_hooks import (  # noqa: F401
+    OktaEvent,
+    OktaEventHookPayload,
+    OktaEventHookReceipt,
+    OktaEventHookVerification,
+    OktaEventTarget,
+)
 from api.schemas.pagination import (  # noqa: F401
     AuditOrderBy,
     SearchAccessRequestQuery,
@@ -90,3 +97,4 @@ from api.schemas.requests_schemas import (  # noqa: F401
     UpdateGroupBody,
     UpdateTagBody,
 )
+from api.schemas.sync_runs import GroupResyncBody, GroupResyncDiff, SyncLedgerEntryDetail  # noqa: F401
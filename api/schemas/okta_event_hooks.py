@@ -0,0 +1,44 @@
+"""Okta's event hook payloads, as delivered to `/api/okta-event-hooks`.
+
+Only the fields Access reads are declared; Okta's others are ignored. See
+https://developer.okta.com/docs/concepts/event-hooks/ for the full shape.
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from api.schemas.datetimes import FlexibleDatetime
+
+
+class OktaEventTarget(BaseModel):
+    id: str
+    # e.g. "User" or "UserGroup"
+    type: str
+
+
+class OktaEvent(BaseModel):
+    uuid: str
+    event_type: str = Field(alias="eventType")
+    published: Optional[FlexibleDatetime] = None
+    target: Optional[list[OktaEventTarget]] = None
+
+
+class OktaEventHookData(BaseModel):
+    events: list[OktaEvent]
+
+
+class OktaEventHookPayload(BaseModel):
+    data: OktaEventHookData
+
+
+class OktaEventHookVerification(BaseModel):
+    """The answer to Okta's one-time verification request, echoing its challenge."""
+
+    verification: str
+
+
+class OktaEventHookReceipt(BaseModel):
+    """How many of a delivery's events were queued; the others change nothing Access syncs."""
+
+    queued: int
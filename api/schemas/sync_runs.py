@@ -0,0 +1,45 @@
+from pydantic import BaseModel, ConfigDict
+
+from api.schemas.datetimes import FlexibleDatetime
+
+
+class SyncLedgerEntryDetail(BaseModel):
+    """One stage of an ``access sync`` run, as recorded in the sync ledger."""
+
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    run_id: str
+    stage: str
+    started_at: FlexibleDatetime
+    duration_seconds: float
+    succeeded: bool
+    okta_calls: dict[str, int]
+    rows_inserted: int
+    rows_updated: int
+    rows_ended: int
+    groups_skipped: int
+    peak_fetch_window: int
+
+
+class GroupResyncBody(BaseModel):
+    """Whether ``POST /api/groups/{id}/resync`` acts as the authority, as the ``access sync`` flags do."""
+
+    sync_groups_authoritatively: bool = False
+    sync_group_memberships_authoritatively: bool = False
+
+
+class GroupResyncDiff(BaseModel):
+    """What ``POST /api/groups/{id}/resync`` changed, by user id, in Access and in Okta."""
+
+    model_config = ConfigDict(from_attributes=True)
+    group_id: str
+    group_changed: bool
+    group_deleted: bool
+    members_added: list[str]
+    members_removed: list[str]
+    owners_added: list[str]
+    owners_removed: list[str]
+    okta_members_added: list[str]
+    okta_members_removed: list[str]
+    okta_owners_added: list[str]
+    okta_owners_removed: list[str]
@@ -0,0 +1,176 @@
+"""Okta request budget shared by every Access process on a host.
+
+The web workers, ``access sync`` and ``access sync-app-groups`` all spend the
+same Okta org rate-limit buckets, each unaware of the others. ``OktaRequestBudget``
+is a token bucket per Okta endpoint family kept in a small SQLite file, so every
+process that points at the same file draws from the same budget. Every proxied
+Okta call (see ``_WrapperClient``) takes one token before it is sent, waiting
+for the bucket to refill when it is empty.
+
+Interactive requests (a person waiting on a web request) get priority over
+batch work (the CLI jobs): batch requests leave the last
+``interactive_reserve`` fraction of each bucket untouched, so the syncer backs
+off as the bucket drains and the web tier can still get through. The priority
+of the current context is set with ``okta_request_priority``; the CLI sets
+``RequestPriority.BATCH`` for every command.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from enum import StrEnum
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class RequestPriority(StrEnum):
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+_request_priority: contextvars.ContextVar[RequestPriority] = contextvars.ContextVar(
+    "okta_request_priority", default=RequestPriority.INTERACTIVE
+)
+
+
+@contextmanager
+def okta_request_priority(priority: RequestPriority) -> Iterator[None]:
+    """Run the Okta requests made inside the block at ``priority``."""
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def current_request_priority() -> RequestPriority:
+    return _request_priority.get()
+
+
+# (substring of the SDK method name, endpoint family), first match wins. The
+# families follow Okta's rate-limit buckets closely enough that one busy family
+# (e.g. group membership listing during a sync) does not starve the others.
+_ENDPOINT_FAMILIES = (
+    ("group_rule", "group_rules"),
+    ("group_push_mapping", "apps"),
+    ("group_owner", "group_owners"),
+    ("group_users", "group_members"),
+    ("user_to_group", "group_members"),
+    ("user_from_group", "group_members"),
+    ("group", "groups"),
+    ("user", "users"),
+)
+
+
+def endpoint_family(method_name: str) -> str:
+    """The budget bucket an Okta SDK client method draws from."""
+    for fragment, family in _ENDPOINT_FAMILIES:
+        if fragment in method_name:
+            return family
+    return "other"
+
+
+class OktaRequestBudget:
+    """A token bucket per endpoint family, stored in a SQLite file shared between processes.
+
+    Args:
+        path: The SQLite file. Every process on the host that should share the
+            budget must use the same path.
+        rate: Tokens (requests) added to each bucket per second.
+        burst: Bucket capacity, i.e. the most requests a family can make at once
+            after being idle.
+        interactive_reserve: Fraction of each bucket that batch requests leave
+            for interactive ones.
+
+    Raises:
+        ValueError: If ``rate`` isn't positive, ``burst`` is below 1, or the
+            reserve leaves batch requests less than one token of the bucket
+            (they would wait forever).
+    """
+
+    # How long a process waits on another's write lock before giving up on the
+    # budget for that request.
+    _LOCK_TIMEOUT_SECONDS = 5.0
+
+    def __init__(self, path: str, *, rate: float, burst: int, interactive_reserve: float) -> None:
+        if rate <= 0:
+            raise ValueError(f"Okta request budget rate must be positive, got {rate}")
+        if burst < 1:
+            raise ValueError(f"Okta request budget burst must be at least 1, got {burst}")
+        if interactive_reserve < 0 or burst * interactive_reserve + 1 > burst:
+            raise ValueError(
+                f"Okta request budget interactive reserve {interactive_reserve} must be at least 0 "
+                f"and leave batch requests at least one of the {burst} requests of the burst"
+            )
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self.interactive_reserve = interactive_reserve
+        connection = self._connect()
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS okta_request_budget "
+                "(family TEXT PRIMARY KEY, tokens REAL NOT NULL, refilled_at REAL NOT NULL)"
+            )
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # A short-lived connection per call: sqlite3 connections can't be shared
+        # across the threads ``acquire`` runs on.
+        return sqlite3.connect(self.path, timeout=self._LOCK_TIMEOUT_SECONDS, isolation_level=None)
+
+    def _try_take(self, family: str, priority: RequestPriority) -> float:
+        """Take a token from ``family``'s bucket if one is available to ``priority``.
+
+        Returns 0 when a token was taken, otherwise how many seconds until one
+        should be.
+        """
+        floor = self.burst * self.interactive_reserve if priority == RequestPriority.BATCH else 0.0
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = connection.execute(
+                "SELECT tokens, refilled_at FROM okta_request_budget WHERE family = ?", (family,)
+            ).fetchone()
+            tokens = float(self.burst) if row is None else min(self.burst, row[0] + (now - row[1]) * self.rate)
+            wait = 0.0
+            if tokens - 1 >= floor:
+                tokens -= 1
+            else:
+                wait = (floor + 1 - tokens) / self.rate
+            connection.execute(
+                "INSERT INTO okta_request_budget (family, tokens, refilled_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (family) DO UPDATE SET tokens = excluded.tokens, refilled_at = excluded.refilled_at",
+                (family, tokens, now),
+            )
+            connection.execute("COMMIT")
+            return wait
+        finally:
+            connection.close()
+
+    async def acquire(self, family: str, priority: RequestPriority | None = None) -> None:
+        """Wait until a token for ``family`` is available at ``priority`` (default: the context's), then take it.
+
+        The budget is best effort: if the store can't be read (a locked or
+        unwritable file), the request goes ahead rather than failing.
+        """
+        if priority is None:
+            priority = current_request_priority()
+        while True:
+            try:
+                wait = await asyncio.to_thread(self._try_take, family, priority)
+            except sqlite3.Error:
+                logger.warning("Okta request budget unavailable, sending request without it", exc_info=True)
+                return
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
 import functools
+import hashlib
 import inspect
 import json
 import logging
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional
 
 from okta.client import Client as OktaClient
 from okta.models.add_group_request import AddGroupRequest
@@ -20,12 +23,14 @@ from okta.models.group_rule import GroupRule as OktaGroupRuleType
 from okta.models.okta_user_group_profile import OktaUserGroupProfile
 from okta.models.update_group_push_mapping_request import UpdateGroupPushMappingRequest
 from okta.models.user import User as OktaUserType
+from okta.models.user_profile import UserProfile
 from okta.models.user_schema import UserSchema as OktaUserSchemaType
 from okta.models.user_schema_attribute import UserSchemaAttribute
 from okta.pagination import PaginationHelper
 
 from api.config import OKTA_GROUP_PROFILE_CUSTOM_ATTR
 from api.models import OktaGroup, OktaUser
+from api.services.okta_request_budget import OktaRequestBudget, endpoint_family
 
 REQUEST_TIMEOUT = 30
 # HTTP statuses the SDK reports as errors that we treat as transient: a caller
@@ -99,6 +104,78 @@ class OktaResourceNotFoundError(Exception):
     """
 
 
+@dataclass(frozen=True)
+class RateLimitStatus:
+    """Okta's rate-limit headers from one response, for the bucket the request counted against."""
+
+    # X-Rate-Limit-Limit: requests allowed per window
+    limit: int
+    # X-Rate-Limit-Remaining: requests left in the current window
+    remaining: int
+    # X-Rate-Limit-Reset: when the current window resets, in UTC epoch seconds
+    reset: int
+
+    @staticmethod
+    def from_headers(headers: Any) -> Optional[RateLimitStatus]:
+        if not headers:
+            return None
+        lowered = {str(k).lower(): v for k, v in headers.items()}
+        try:
+            return RateLimitStatus(
+                limit=int(lowered["x-rate-limit-limit"]),
+                remaining=int(lowered["x-rate-limit-remaining"]),
+                reset=int(lowered["x-rate-limit-reset"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+# Called with the rate-limit headers of every page ``_paginate`` reads in the
+# current context. A ContextVar rather than an attribute so that each task of a
+# concurrent fan-out (which runs in its own copy of the context) reports only
+# its own responses. See ``observe_rate_limits``.
+_rate_limit_listener: contextvars.ContextVar[Optional[Callable[[RateLimitStatus], None]]] = contextvars.ContextVar(
+    "okta_rate_limit_listener", default=None
+)
+
+
+@contextmanager
+def observe_rate_limits(listener: Callable[[RateLimitStatus], None]) -> Iterator[None]:
+    """Call ``listener`` with the rate-limit status of each Okta list page read inside the block."""
+    token = _rate_limit_listener.set(listener)
+    try:
+        yield
+    finally:
+        _rate_limit_listener.reset(token)
+
+
+def _report_rate_limit(headers: Any) -> None:
+    listener = _rate_limit_listener.get()
+    if listener is None:
+        return
+    status = RateLimitStatus.from_headers(headers)
+    if status is not None:
+        listener(status)
+
+
+# Called with the SDK client method name of every Okta request made in the
+# current context, including each page of a listing and each retry. A ContextVar
+# for the same reason as ``_rate_limit_listener``. See ``observe_okta_calls``.
+_okta_call_listener: contextvars.ContextVar[Optional[Callable[[str], None]]] = contextvars.ContextVar(
+    "okta_call_listener", default=None
+)
+
+
+@contextmanager
+def observe_okta_calls(listener: Callable[[str], None]) -> Iterator[None]:
+    """Call ``listener`` with the SDK client method name of each Okta request made inside the block."""
+    token = _okta_call_listener.set(listener)
+    try:
+        yield
+    finally:
+        _okta_call_listener.reset(token)
+
+
 # On a gateway failure that yields no response object, the SDK returns
 # ``(None, None, error)`` from the request executor, then dereferences
 # ``response.status`` before checking the error on its list/get endpoints. That
@@ -180,11 +257,14 @@ class _WrapperClient:
     ``OktaTransientError``. Applying the mapping here — rather than at each call
     site — makes it uniform and impossible to forget when a new facade method is
     added. Non-coroutine attributes (e.g. ``get_request_executor``) pass through
-    unchanged.
+    unchanged. When a request budget is configured, each attempt first takes a
+    token from its endpoint family's bucket (see ``okta_request_budget``), and
+    is reported to the ``observe_okta_calls`` listener, if any.
     """
 
-    def __init__(self, client: OktaClient) -> None:
+    def __init__(self, client: OktaClient, budget: Optional[OktaRequestBudget] = None) -> None:
         self._client = client
+        self._budget = budget
 
     def __getattr__(self, name: str) -> Any:
         attr = getattr(self._client, name)
@@ -199,6 +279,11 @@ class _WrapperClient:
             # within the run. A 429/5xx or timeout is surfaced immediately: the
             # SDK already spent its budget, so re-issuing only amplifies load.
             for attempt in range(OKTA_TRANSIENT_RETRIES + 1):
+                if self._budget is not None:
+                    await self._budget.acquire(endpoint_family(name))
+                listener = _okta_call_listener.get()
+                if listener is not None:
+                    listener(name)
                 try:
                     return await OktaService._call(attr(*args, **kwargs))
                 except OktaTransientError as exc:
@@ -215,7 +300,11 @@ class OktaService:
     def __init__(self) -> None:
         self.okta_domain: Optional[str] = None
         self.okta_api_token: Optional[str] = None
+        self.org_url: Optional[str] = None
         self.use_group_owners_api = False
+        # Shared with the other Access processes on the host; ``None`` when
+        # unconfigured, which leaves requests unthrottled.
+        self.request_budget: Optional[OktaRequestBudget] = None
         # A server-loop-scoped client for connection pooling (see
         # ``start_pooled_client``). ``None`` on CLI/test loops, where each call
         # builds its own client instead.
@@ -223,14 +312,21 @@ class OktaService:
         self._pooled_loop: Optional[asyncio.AbstractEventLoop] = None
 
     def initialize(
-        self, okta_domain: Optional[str], okta_api_token: Optional[str], use_group_owners_api: bool = False
+        self,
+        okta_domain: Optional[str],
+        okta_api_token: Optional[str],
+        use_group_owners_api: bool = False,
+        request_budget: Optional[OktaRequestBudget] = None,
+        org_url: Optional[str] = None,
     ) -> None:
         # Ignore an okta domain and api token when testing
         if okta_domain is None or okta_api_token is None:
             return
         self.okta_domain = okta_domain
         self.okta_api_token = okta_api_token
+        self.org_url = org_url or f"https://{okta_domain}"
         self.use_group_owners_api = use_group_owners_api
+        self.request_budget = request_budget
 
     def _build_client(self) -> OktaClient:
         # The SDK owns retries and timeouts: it retries 429s (honoring the
@@ -239,7 +335,7 @@ class OktaService:
         # timeout plus a cumulative deadline across those retries.
         return OktaClient(
             {
-                "orgUrl": f"https://{self.okta_domain}",
+                "orgUrl": self.org_url,
                 "token": self.okta_api_token,
                 "requestTimeout": REQUEST_TIMEOUT,
             }
@@ -260,12 +356,12 @@ class OktaService:
         """
         running_loop = asyncio.get_running_loop()
         if self._pooled_client is not None and self._pooled_loop is running_loop:
-            yield _WrapperClient(self._pooled_client)
+            yield _WrapperClient(self._pooled_client, self.request_budget)
             return
 
         client = self._build_client()
         async with client:
-            yield _WrapperClient(client)
+            yield _WrapperClient(client, self.request_budget)
 
     async def start_pooled_client(self) -> None:
         """Create a process-wide Okta client bound to the current event loop.
@@ -327,21 +423,22 @@ class OktaService:
             raise OktaResourceNotFoundError(str(error))
         return result
 
-    async def _paginate(self, list_method: Callable[..., Any], *args: Any, **kwargs: Any) -> list[Any]:
-        """Drain a cursor-paginated Okta list endpoint into a single list.
+    async def _iter_pages(self, list_method: Callable[..., Any], *args: Any, **kwargs: Any) -> AsyncIterator[list[Any]]:
+        """Yield the pages of a cursor-paginated Okta list endpoint, one list per page.
 
         Each call returns one page plus an ``ApiResponse`` whose ``Link`` header
         carries the ``after`` cursor for the next page. ``*args`` carries any
         positional argument the endpoint requires (e.g. the group id for group
-        listings).
+        listings). The next page is requested before a page is yielded, so it
+        downloads while the caller processes the current one; at most two pages
+        are held at once.
 
         A 404 — the resource being listed is gone — is already surfaced as
         ``OktaResourceNotFoundError`` by ``_call``, so it never reaches the check
         below; every other error keeps raising the generic ``Exception``.
         """
-        results: list[Any] = []
-        after: Optional[str] = None
-        while True:
+
+        async def _fetch_page(after: Optional[str]) -> tuple[list[Any], Optional[str]]:
             # ``list_method`` is a proxied client method, so it already routes
             # through ``_call``.
             result = await list_method(*args, limit=LIST_PAGE_LIMIT, after=after, **kwargs)
@@ -350,11 +447,27 @@ class OktaService:
             if error is not None:
                 raise Exception(error)
             assert page is not None and response is not None
-            results.extend(page)
-            after = PaginationHelper.extract_next_cursor(response.headers)
-            if not after:
-                break
-        return results
+            _report_rate_limit(response.headers)
+            return page, PaginationHelper.extract_next_cursor(response.headers)
+
+        next_page = asyncio.ensure_future(_fetch_page(None))
+        try:
+            while True:
+                page, after = await next_page
+                if after:
+                    next_page = asyncio.ensure_future(_fetch_page(after))
+                yield page
+                if not after:
+                    return
+        finally:
+            # Drop the read-ahead if the caller stops early
+            if not next_page.done():
+                next_page.cancel()
+                await asyncio.gather(next_page, return_exceptions=True)
+
+    async def _paginate(self, list_method: Callable[..., Any], *args: Any, **kwargs: Any) -> list[Any]:
+        """Drain a cursor-paginated Okta list endpoint into a single list (see ``_iter_pages``)."""
+        return [item async for page in self._iter_pages(list_method, *args, **kwargs) for item in page]
 
     async def get_user(self, userId: str) -> User:
         async with self._okta_client() as client:
@@ -367,9 +480,12 @@ class OktaService:
 
         return User(user)
 
-    async def get_user_schema(self, userTypeId: str) -> UserSchema:
+    async def get_user_schema(self, userTypeId: Optional[str]) -> UserSchema:
         async with self._okta_client() as client:
-            userType, user_type_resp, error = await client.get_user_type(userTypeId)
+            # A user without a type has the org's default user type
+            userType, user_type_resp, error = await client.get_user_type(
+                userTypeId if userTypeId is not None else "default"
+            )
 
             if error is not None:
                 raise Exception(error)
@@ -388,11 +504,23 @@ class OktaService:
 
         return UserSchema(schema)
 
-    async def list_users(self) -> list[User]:
+    async def list_users(self, *, query_params: Optional[dict[str, str]] = None) -> list[User]:
+        # ``query_params`` keys (``filter``, ``search``) map directly onto the
+        # ``list_users`` keyword arguments, e.g. a ``lastUpdated gt`` filter.
+        if query_params is None:
+            query_params = {}
         async with self._okta_client() as client:
-            users = await self._paginate(client.list_users)
+            users = await self._paginate(client.list_users, **query_params)
+
+        return [CompactUser(user) for user in users]
 
-        return list(map(lambda user: User(user), users))
+    async def iter_users(self, *, query_params: Optional[dict[str, str]] = None) -> AsyncIterator[list[User]]:
+        """Like ``list_users``, but yield the users a page at a time."""
+        if query_params is None:
+            query_params = {}
+        async with self._okta_client() as client:
+            async for page in self._iter_pages(client.list_users, **query_params):
+                yield [CompactUser(user) for user in page]
 
     async def create_group(self, name: str, description: str) -> Group:
         async with self._okta_client() as client:
@@ -504,7 +632,13 @@ class OktaService:
         async with self._okta_client() as client:
             groups = await self._paginate(client.list_groups, **query_params)
 
-        return list(map(lambda group: Group(group), groups))
+        return [CompactGroup(group) for group in groups]
+
+    async def iter_groups(self, *, query_params: dict[str, str] = DEFAULT_QUERY_PARAMS) -> AsyncIterator[list[Group]]:
+        """Like ``list_groups``, but yield the groups a page at a time."""
+        async with self._okta_client() as client:
+            async for page in self._iter_pages(client.list_groups, **query_params):
+                yield [CompactGroup(group) for group in page]
 
     async def list_groups_with_active_rules(self) -> dict[str, list[OktaGroupRuleType]]:
         group_rules = await self.list_group_rules()
@@ -518,7 +652,9 @@ class OktaService:
                     group_ids_with_group_rules.setdefault(id, []).append(group_rule)
         return group_ids_with_group_rules
 
-    async def list_group_rules(self, *, query_params: dict[str, str] = {}) -> list[OktaGroupRuleType]:
+    async def list_group_rules(self, *, query_params: Optional[dict[str, str]] = None) -> list[OktaGroupRuleType]:
+        if query_params is None:
+            query_params = {}
         async with self._okta_client() as client:
             group_rules = await self._paginate(client.list_group_rules, **query_params)
 
@@ -528,7 +664,13 @@ class OktaService:
         async with self._okta_client() as client:
             users = await self._paginate(client.list_group_users, groupId)
 
-        return list(map(lambda user: User(user), users))
+        return [CompactUser(user) for user in users]
+
+    async def iter_group_users(self, groupId: str) -> AsyncIterator[list[User]]:
+        """Like ``list_users_for_group``, but yield the members a page at a time."""
+        async with self._okta_client() as client:
+            async for page in self._iter_pages(client.list_group_users, groupId):
+                yield [CompactUser(user) for user in page]
 
     async def delete_group(self, groupId: str) -> None:
         async with self._okta_client() as client:
@@ -686,45 +828,149 @@ class OktaService:
 
 # Wrapper class for the Okta API user model
 class User:
+    __slots__ = ("user",)
+
     def __init__(self, user: OktaUserType):
         self.user = user
 
     def __getattr__(self, name: str) -> Any:
         return getattr(self.user, name)
 
+    @property
+    def type_id(self) -> Optional[str]:
+        user: Any = self.user
+        return user.type.id if user.type is not None else None
+
     def update_okta_user(self, okta_user: OktaUser, user_attrs_to_titles: dict[str, str]) -> OktaUser:
         # The SDK types every user/profile field as Optional; this bridge reads
         # them loosely.
-        user: Any = self.user
+        user: Any = self
         if okta_user.id is None:
             okta_user.id = user.id
         if okta_user.created_at is None:
             okta_user.created_at = user.created
         if okta_user.updated_at is None:
             okta_user.updated_at = user.last_updated
-        okta_user.deleted_at = self.get_deleted_at()
-        okta_user.email = user.profile.login
-        okta_user.first_name = user.profile.first_name
-        okta_user.last_name = user.profile.last_name
-        okta_user.display_name = user.profile.display_name
-        okta_user.profile = self._convert_profile_keys_to_titles(user_attrs_to_titles)
-        okta_user.employee_number = user.profile.employee_number
+        okta_values = self.okta_user_values(user_attrs_to_titles)
+        for column, value in okta_values.items():
+            setattr(okta_user, column, value)
+        okta_user.okta_profile_hash = okta_values_hash(okta_values)
         return okta_user
 
-    def _convert_profile_keys_to_titles(self, user_attrs_to_titles: dict[str, str]) -> dict[str, str]:
+    def okta_user_values(self, user_attrs_to_titles: dict[str, str]) -> dict[str, Any]:
+        """The ``okta_user`` column values Okta is the source of truth for, keyed by column name."""
+        user: Any = self
+        return {
+            "id": user.id,
+            "deleted_at": self.get_deleted_at(),
+            "email": user.profile.login,
+            "first_name": user.profile.first_name,
+            "last_name": user.profile.last_name,
+            "display_name": user.profile.display_name,
+            "profile": self._convert_profile_keys_to_titles(user_attrs_to_titles),
+            "employee_number": user.profile.employee_number,
+        }
+
+    def _profile_data(self) -> dict[str, Any]:
         # ``UserProfile`` is a Pydantic model. Dump the standard fields under
         # their camelCase aliases (to match the schema title map) and fold in
         # any custom attributes carried in ``additional_properties``.
         profile: Any = self.user.profile
         profile_data = profile.model_dump(by_alias=True, exclude={"additional_properties"})
         profile_data.update(profile.additional_properties or {})
-        return dict(((user_attrs_to_titles.get(k, k), v) for (k, v) in profile_data.items()))
+        return profile_data
+
+    def _convert_profile_keys_to_titles(self, user_attrs_to_titles: dict[str, str]) -> dict[str, str]:
+        return dict(((user_attrs_to_titles.get(k, k), v) for (k, v) in self._profile_data().items()))
 
     def get_deleted_at(self) -> Optional[datetime]:
-        user: Any = self.user
+        user: Any = self
         return user.status_changed if user.status in ("SUSPENDED", "DEPROVISIONED") else None
 
 
+# The camelCase keys of the standard ``UserProfile`` fields, in the order
+# ``model_dump`` lists them
+_USER_PROFILE_KEYS = tuple(
+    field.alias or name for name, field in UserProfile.model_fields.items() if name != "additional_properties"
+)
+
+
+class CompactUserProfile:
+    """The profile of a ``CompactUser``: its non-null standard fields and its custom attributes."""
+
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: dict[str, Any]):
+        self.fields = fields
+
+    @property
+    def login(self) -> Optional[str]:
+        return self.fields.get("login")
+
+    @property
+    def first_name(self) -> Optional[str]:
+        return self.fields.get("firstName")
+
+    @property
+    def last_name(self) -> Optional[str]:
+        return self.fields.get("lastName")
+
+    @property
+    def display_name(self) -> Optional[str]:
+        return self.fields.get("displayName")
+
+    @property
+    def employee_number(self) -> Optional[str]:
+        return self.fields.get("employeeNumber")
+
+    @property
+    def manager_id(self) -> Optional[str]:
+        return self.fields.get("managerId")
+
+
+class CompactUser(User):
+    """A ``User`` holding only the fields the syncer reads, decoded from a listed Okta user.
+
+    The SDK model (its nested models, credentials and links) isn't kept, so an
+    org-wide listing holds a few small objects and one profile dict per user.
+    """
+
+    __slots__ = ("id", "status", "type_id", "created", "last_updated", "status_changed", "profile")
+
+    id: str
+    status: Any
+    type_id: Optional[str]
+    created: Optional[datetime]
+    last_updated: Optional[datetime]
+    status_changed: Optional[datetime]
+    profile: CompactUserProfile
+
+    def __init__(self, user: OktaUserType):
+        okta_user: Any = user
+        self.id = okta_user.id
+        self.status = okta_user.status
+        self.type_id = okta_user.type.id if okta_user.type is not None else None
+        self.created = okta_user.created
+        self.last_updated = okta_user.last_updated
+        self.status_changed = okta_user.status_changed
+        profile = okta_user.profile
+        fields = {
+            key: value
+            for key, value in profile.model_dump(by_alias=True, exclude={"additional_properties"}).items()
+            if value is not None
+        }
+        fields.update(profile.additional_properties or {})
+        self.profile = CompactUserProfile(fields)
+
+    def __getattr__(self, name: str) -> Any:
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def _profile_data(self) -> dict[str, Any]:
+        profile_data: dict[str, Any] = dict.fromkeys(_USER_PROFILE_KEYS)
+        profile_data.update(self.profile.fields)
+        return profile_data
+
+
 # Wrapper class for the Okta API user schema model
 class UserSchema:
     def __init__(self, schema: OktaUserSchemaType):
@@ -762,6 +1008,8 @@ class UserSchema:
 
 
 class Group:
+    __slots__ = ("group",)
+
     def __init__(self, group: OktaGroupType):
         self.group = group
 
@@ -771,25 +1019,96 @@ class Group:
     def update_okta_group(
         self, okta_group: OktaGroup, group_ids_with_group_rules: dict[str, list[OktaGroupRuleType]]
     ) -> OktaGroup:
+        group: Any = self
         if okta_group.id is None:
-            okta_group.id = self.group.id
+            okta_group.id = group.id
         if okta_group.created_at is None:
-            okta_group.created_at = self.group.created
+            okta_group.created_at = group.created
         if okta_group.updated_at is None:
-            okta_group.updated_at = self.group.last_updated
+            okta_group.updated_at = group.last_updated
+
+        okta_values = self.okta_group_values(group_ids_with_group_rules)
+        for column, value in okta_values.items():
+            setattr(okta_group, column, value)
+        okta_group.okta_profile_hash = okta_values_hash(okta_values)
+
+        return okta_group
 
-        profile: Any = _group_profile(self.group)
-        okta_group.name = profile.name
-        okta_group.description = profile.description if profile.description is not None else ""
+    def okta_group_values(self, group_ids_with_group_rules: dict[str, list[OktaGroupRuleType]]) -> dict[str, Any]:
+        """The ``okta_group`` column values Okta is the source of truth for, keyed by column name.
 
-        okta_group.is_managed = is_managed_group(self, group_ids_with_group_rules)
+        ``externally_managed_data`` is only included for a group with group rules.
+        """
+        group: Any = self
+        profile: Any = _group_profile(group)
+        okta_values = {
+            "name": profile.name,
+            "description": profile.description if profile.description is not None else "",
+            "is_managed": is_managed_group(self, group_ids_with_group_rules),
+        }
 
         # Get externally managed group data
-        if self.group.id in group_ids_with_group_rules:
-            rules: list[Any] = group_ids_with_group_rules[self.group.id]
-            okta_group.externally_managed_data = {rule.name: rule.conditions.expression.value for rule in rules}
+        if group.id in group_ids_with_group_rules:
+            rules: list[Any] = group_ids_with_group_rules[group.id]
+            okta_values["externally_managed_data"] = {rule.name: rule.conditions.expression.value for rule in rules}
 
-        return okta_group
+        return okta_values
+
+
+class CompactGroupProfile:
+    """The profile of a ``CompactGroup``, standard fields and custom attributes alike."""
+
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: dict[str, Any]):
+        self.fields = fields
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.fields.get("name")
+
+    @property
+    def description(self) -> Optional[str]:
+        return self.fields.get("description")
+
+    def to_dict(self) -> dict[str, Any]:
+        return self.fields
+
+
+class CompactGroup(Group):
+    """A ``Group`` holding only the fields the syncer reads, decoded from a listed Okta group."""
+
+    __slots__ = ("id", "type", "created", "last_updated", "last_membership_updated", "profile")
+
+    id: str
+    type: Any
+    created: Optional[datetime]
+    last_updated: Optional[datetime]
+    last_membership_updated: Optional[datetime]
+    profile: Optional[CompactGroupProfile]
+
+    def __init__(self, group: OktaGroupType):
+        okta_group: Any = group
+        self.id = okta_group.id
+        self.type = okta_group.type
+        self.created = okta_group.created
+        self.last_updated = okta_group.last_updated
+        self.last_membership_updated = okta_group.last_membership_updated
+        profile = _group_profile(okta_group)
+        self.profile = CompactGroupProfile(profile.to_dict()) if profile is not None else None
+
+    def __getattr__(self, name: str) -> Any:
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+
+def okta_values_hash(okta_values: dict[str, Any]) -> str:
+    """A stable hash of the column values synced from an Okta user or group.
+
+    Stored as ``okta_profile_hash`` so the syncer can tell a row is already up to
+    date without comparing (or even loading) the columns themselves.
+    """
+    serialized = json.dumps(okta_values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
 
 
 def _group_profile(group: Any) -> Any:
@@ -831,3 +1150,24 @@ def is_managed_group(
 
     # By default, the group should be of type OKTA_GROUP and should not have any group rules to be managed
     return (group.type == "OKTA_GROUP") and (group.id not in group_ids_with_group_rules)
+
+
+class ManagedGroupIndex:
+    """Which groups are managed by Access, for one sync run.
+
+    Built once per run from the active group rules, so every sync stage of the
+    run shares one group rule listing. Each group is evaluated once, by id.
+    """
+
+    __slots__ = ("group_rules", "_by_group_id")
+
+    def __init__(self, group_rules: dict[str, list[OktaGroupRuleType]]):
+        # The active group rules keyed by the group id they assign users to, as
+        # returned by ``OktaService.list_groups_with_active_rules``
+        self.group_rules = group_rules
+        self._by_group_id: dict[str, bool] = {}
+
+    def is_managed(self, group: Group) -> bool:
+        if group.id not in self._by_group_id:
+            self._by_group_id[group.id] = is_managed_group(group, self.group_rules)
+        return self._by_group_id[group.id]
@@ -1,10 +1,19 @@
 import asyncio
+import hashlib
 import logging
-from collections import defaultdict
-from collections.abc import AsyncIterator, Awaitable, Callable
+import time
+from collections import Counter, defaultdict
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable, Collection, Mapping
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta, timezone
+from itertools import chain
+from typing import Any, TypeVar
 
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import and_, delete, func, nullsfirst, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from api.config import settings
 from sqlalchemy.orm import (
     aliased,
@@ -13,9 +22,8 @@ from sqlalchemy.orm import (
     with_polymorphic,
 )
 
-from okta.models.group_rule import GroupRule as OktaGroupRuleType
 
-from api.extensions import db
+from api.extensions import _session_scope, db
 from api.models import (
     AccessRequest,
     AccessRequestStatus,
@@ -26,66 +34,342 @@ from api.models import (
     OktaUserGroupMember,
     RoleGroup,
     RoleGroupMap,
+    SyncLedgerEntry,
+    SyncRun,
+    SyncRunGroup,
+    SyncState,
 )
-from api.models.app_group import get_access_owners, get_app_managers
-from api.models.okta_group import get_group_managers
+from api.models.app_group import get_group_managers_with_fallbacks
 from api.operations import (
     DeleteGroup,
     DeleteUser,
     ModifyGroupUsers,
-    RejectAccessRequest,
+    RejectAccessRequests,
     UnmanageGroup,
 )
-from api.plugins import NotificationHook, send_notification
+from api.plugins import NotificationDispatchSummary, NotificationHook, send_notifications
+from api.plugins._async_dispatch import run_hooks_to_completion
+from api.plugins.metrics_reporter import get_metrics_reporter_hook
 from api.services import okta
 from api.services.okta_service import (
     Group,
     OktaResourceNotFoundError,
     OktaTransientError,
+    RateLimitStatus,
     User,
-    is_managed_group,
+    ManagedGroupIndex,
+    observe_okta_calls,
+    observe_rate_limits,
+    okta_values_hash,
 )
 
 logger = logging.getLogger(__name__)
 
-# Okta group rules keyed by the group id they assign users to, as returned by
-# ``okta.list_groups_with_active_rules`` and consumed by ``is_managed_group``.
-_GroupRulesByGroupId = dict[str, list[OktaGroupRuleType]]
+# What ``_prefetch_group_okta_lists`` fetches per group, e.g. its Okta members
+_FetchedT = TypeVar("_FetchedT")
+
+# The Okta fetch window shrinks when a list page comes back with less than this
+# fraction of its rate-limit bucket remaining. See ``_AdaptiveFetchWindow``.
+_RATE_LIMIT_LOW_FRACTION = 0.2
+
+# ``SyncState`` rows of the user and group membership syncs.
+USERS_SYNC_STATE = "users"
+GROUP_MEMBERSHIPS_SYNC_STATE = "group_memberships"
+# ``SyncRun`` stage of the combined membership and ownership pass
+GROUP_MEMBERSHIPS_AND_OWNERSHIPS_SYNC_RUN = "group_memberships_and_ownerships"
+
+# An incremental user sync re-reads changes from this long before the saved
+# watermark. The watermark is taken from our clock but compared against Okta's,
+# and a user modified while the previous run was paginating may have landed on
+# a page that was already read; re-syncing a few users twice is harmless.
+_INCREMENTAL_USER_SYNC_OVERLAP = timedelta(minutes=5)
+
+# Rows per INSERT ... ON CONFLICT statement, keeping the bind parameter count
+# (rows x columns) well under both Postgres' and SQLite's limits.
+_UPSERT_CHUNK_SIZE = 500
+
+# Memberships written per ModifyGroupUsers call or Okta write batch, and DB
+# member ids read per query, by the streaming reconcile of large groups.
+_STREAMING_RECONCILE_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class GroupShard:
+    """One of ``count`` disjoint slices of the Okta groups, for running the per-group syncs in parallel processes.
+
+    A group belongs to the shard ``index`` its id hashes to. The hash is stable
+    across processes and runs (unlike ``hash()``), so ``access sync --shard i/n``
+    for every ``i`` in ``0..n-1`` covers each group exactly once.
+    """
+
+    index: int
+    count: int
+
+    def __post_init__(self) -> None:
+        if self.count < 1 or not 0 <= self.index < self.count:
+            raise ValueError(f"Invalid shard {self.index}/{self.count}: expected 0 <= index < count")
+
+    @classmethod
+    def parse(cls, value: str) -> "GroupShard":
+        """Parse ``"i/n"``, e.g. ``"0/4"`` for the first of four shards."""
+        index, sep, count = value.partition("/")
+        if not sep or not index.strip().isdigit() or not count.strip().isdigit():
+            raise ValueError(f"Invalid shard {value!r}: expected INDEX/COUNT, e.g. 0/4")
+        return cls(int(index), int(count))
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def includes(self, group_id: str) -> bool:
+        digest = hashlib.sha256(group_id.encode()).digest()
+        return int.from_bytes(digest[:8], "big") % self.count == self.index
+
+    def filter(self, groups: list[Group]) -> list[Group]:
+        return [group for group in groups if self.includes(group.id)]
+
+
+class _AdaptiveFetchWindow:
+    """AIMD controller for how many Okta fetches ``_prefetch_group_okta_lists`` keeps in flight.
+
+    Starts at ``maximum`` (the configured ``--group-fetch-concurrency``). Each
+    list page read with comfortable rate-limit headroom grows the window by
+    ``1/size``, i.e. by about one fetch per window's worth of pages, back up to
+    ``maximum``. The window halves, down to a single fetch, when Okta signals
+    pressure: a page whose ``X-Rate-Limit-Remaining`` dropped below
+    ``_RATE_LIMIT_LOW_FRACTION`` of the limit, or a fetch that failed with
+    ``OktaTransientError`` (a 429 that outlived the SDK's retries, or a timeout).
+    A low reading halves the window once per rate-limit window (identified by its
+    ``X-Rate-Limit-Reset``), so the burst of low readings from the fetches
+    already in flight doesn't collapse it straight to 1.
+    """
+
+    def __init__(self, maximum: int) -> None:
+        self.maximum = maximum
+        self._size = float(maximum)
+        self._halved_for_reset: int | None = None
+        # Reasons for the decreases since the caller last drained this list
+        self.throttle_events: list[str] = []
+
+    @property
+    def size(self) -> int:
+        return max(1, int(self._size))
+
+    def observe(self, status: RateLimitStatus) -> None:
+        if status.remaining < status.limit * _RATE_LIMIT_LOW_FRACTION:
+            if status.reset != self._halved_for_reset:
+                self._halved_for_reset = status.reset
+                self._halve("rate_limit")
+        else:
+            self._size = min(float(self.maximum), self._size + 1 / self._size)
+
+    def observe_transient_error(self) -> None:
+        self._halve("transient_error")
+
+    def _halve(self, reason: str) -> None:
+        self._size = max(1.0, self._size / 2)
+        self.throttle_events.append(reason)
+
+
+async def _record_metric(kind: str, metric_name: str, value: float, tags: dict[str, str] | None = None) -> None:
+    """Best-effort emit through the metrics_reporter ``record_<kind>`` hook; never fails the sync."""
+    try:
+        coros = getattr(get_metrics_reporter_hook(), f"record_{kind}")(metric_name=metric_name, value=value, tags=tags)
+    except Exception:
+        logger.exception("Failed to record %s metric", metric_name)
+        return
+    await run_hooks_to_completion(coros, context=f"metrics record_{kind} {metric_name}")
+
+
+@dataclass(slots=True)
+class SyncStageStats:
+    """What one stage of an ``access sync`` run did, tallied by ``record_sync_stage``."""
+
+    # Okta requests by SDK client method
+    okta_calls: Counter[str] = field(default_factory=Counter)
+    rows_inserted: int = 0
+    rows_updated: int = 0
+    rows_ended: int = 0
+    groups_skipped: int = 0
+    peak_fetch_window: int = 0
+
+    def count_okta_call(self, method: str) -> None:
+        self.okta_calls[method] += 1
+
+
+# The stats of the sync stage running in the current context. Tasks the stage
+# starts (prefetches, reconcile lanes) inherit it and add to the same tally.
+_sync_stage_stats: ContextVar[SyncStageStats | None] = ContextVar("sync_stage_stats", default=None)
+
+
+def _count_sync_stage_rows(*, inserted: int = 0, updated: int = 0, ended: int = 0) -> None:
+    """Add the rows a sync writer inserted, updated or ended to the running stage's ``SyncStageStats``, if any."""
+    stats = _sync_stage_stats.get()
+    if stats is not None:
+        stats.rows_inserted += inserted
+        stats.rows_updated += updated
+        stats.rows_ended += ended
+
+
+@asynccontextmanager
+async def record_sync_stage(run_id: str, stage: str) -> AsyncIterator[SyncStageStats]:
+    """Record one stage of an ``access sync`` run in the sync ledger and report what it did as metrics.
+
+    Inside the block, the stage's Okta requests, the rows its writers insert,
+    update and end (see ``_count_sync_stage_rows``), the groups it skips on a transient Okta error and the most Okta
+    fetches it keeps in flight are tallied in the yielded ``SyncStageStats``. On
+    exit, whether or not the stage succeeded, a ``SyncLedgerEntry`` is committed
+    and each tally is emitted through the metrics_reporter hook, tagged with the
+    stage. Recording is best-effort and never fails the sync.
+    """
+    stats = SyncStageStats()
+    started_at = datetime.now(timezone.utc)
+    started = time.monotonic()
+    succeeded = False
+    token = _sync_stage_stats.set(stats)
+    try:
+        with observe_okta_calls(stats.count_okta_call):
+            yield stats
+        succeeded = True
+    finally:
+        _sync_stage_stats.reset(token)
+        duration_seconds = time.monotonic() - started
+        await _record_sync_ledger_entry(run_id, stage, started_at, duration_seconds, succeeded, stats)
+        await _report_sync_stage(stage, duration_seconds, succeeded, stats)
+
+
+async def _record_sync_ledger_entry(
+    run_id: str, stage: str, started_at: datetime, duration_seconds: float, succeeded: bool, stats: SyncStageStats
+) -> None:
+    try:
+        if not succeeded:
+            # Drop whatever the failed stage left uncommitted
+            await db.session.rollback()
+        db.session.add(
+            SyncLedgerEntry(
+                run_id=run_id,
+                stage=stage,
+                started_at=started_at,
+                duration_seconds=duration_seconds,
+                succeeded=succeeded,
+                okta_calls=dict(stats.okta_calls),
+                rows_inserted=stats.rows_inserted,
+                rows_updated=stats.rows_updated,
+                rows_ended=stats.rows_ended,
+                groups_skipped=stats.groups_skipped,
+                peak_fetch_window=stats.peak_fetch_window,
+            )
+        )
+        await db.session.commit()
+    except Exception:
+        logger.exception(f"Failed to record the {stage} sync stage in the sync ledger")
+        await db.session.rollback()
+
+
+async def _report_sync_stage(stage: str, duration_seconds: float, succeeded: bool, stats: SyncStageStats) -> None:
+    logger.info(
+        f"Sync stage {stage} {'finished' if succeeded else 'failed'} in {duration_seconds:.1f}s: "
+        f"{stats.okta_calls.total()} Okta calls, {stats.rows_inserted} rows inserted, {stats.rows_updated} updated, "
+        f"{stats.rows_ended} ended, {stats.groups_skipped} groups skipped"
+    )
+    tags = {"stage": stage}
+    await _record_metric(
+        "gauge", "syncer.stage.duration_seconds", duration_seconds, {**tags, "succeeded": str(succeeded).lower()}
+    )
+    for method, calls in sorted(stats.okta_calls.items()):
+        await _record_metric("counter", "syncer.stage.okta_calls", calls, {**tags, "endpoint": method})
+    for change, rows in (
+        ("inserted", stats.rows_inserted),
+        ("updated", stats.rows_updated),
+        ("ended", stats.rows_ended),
+    ):
+        await _record_metric("counter", "syncer.stage.rows", rows, {**tags, "change": change})
+    await _record_metric("counter", "syncer.stage.groups_skipped", stats.groups_skipped, tags)
+    if stats.peak_fetch_window > 0:
+        await _record_metric("gauge", "syncer.stage.peak_fetch_window", stats.peak_fetch_window, tags)
 
 
 async def _prefetch_group_okta_lists(
     groups: list[Group],
-    fetch: Callable[[str], Awaitable[list[User]]],
+    fetch: Callable[[str], Awaitable[_FetchedT]],
     concurrency: int,
-) -> AsyncIterator[tuple[Group, list[User] | Exception]]:
+    sizes: Mapping[str, int] | None = None,
+) -> AsyncIterator[tuple[Group, _FetchedT | Exception]]:
     """Yield ``(group, okta_list)`` pairs, keeping up to ``concurrency`` Okta fetches in flight.
 
-    A bounded sliding window: ``concurrency`` fetches are started up front, and each
-    time one finishes its result is yielded and a fetch for the next group is
-    started to refill the window. This overlaps the Okta round trips with the
+    A bounded sliding window: fetches are started up to the window size, and
+    each time one finishes its result is yielded and fetches for the next groups
+    are started to refill the window. This overlaps the Okta round trips with the
     caller's (sequential) DB reconciliation and keeps each fetch independent, so a
     slow group does not hold up the others, while bounding both the load on Okta's
     rate limits and the peak memory held (at most ``concurrency`` in-flight lists).
     Pairs are yielded in completion order; each group is reconciled independently,
     so order does not matter.
 
+    The window size adapts between 1 and ``concurrency`` to Okta's rate-limit
+    headers and transient failures (see ``_AdaptiveFetchWindow``); its size and
+    each throttle event are reported through the metrics_reporter hook.
+
+    With ``sizes`` (the expected length of each group's list, by group id), the
+    groups with the longest lists are fetched first, so the few slowest fetches
+    overlap all the others rather than running alone at the end of the pass.
+    Once every fetch finished, the time they took is compared against their
+    critical path, the shortest time the window could have fetched them in:
+    the longest single fetch, or all the fetches spread evenly over
+    ``concurrency`` slots, whichever is longer.
+
     A failing fetch yields its exception as the paired value, so the caller
     inspects each value and skips the failures without the failure affecting the
     other groups. These fetch coroutines do network I/O only and must never touch
     ``db.session`` (the concurrency rule in ``api/extensions.py``); the caller
     reconciles each yielded pair against the DB on its own sequential code path.
     """
+    if sizes:
+        groups = sorted(groups, key=lambda group: sizes.get(group.id, 0), reverse=True)
     remaining = iter(groups)
-    in_flight: dict[asyncio.Task[list[User]], Group] = {}
-
-    def _start_next() -> None:
-        group = next(remaining, None)
-        if group is not None:
-            in_flight[asyncio.ensure_future(fetch(group.id))] = group
+    in_flight: dict[asyncio.Task[_FetchedT], Group] = {}
+    window = _AdaptiveFetchWindow(concurrency)
+    reported_size: int | None = None
+    loop = asyncio.get_running_loop()
+    started_at = loop.time()
+    finished_at = started_at
+    fetch_seconds: dict[str, float] = {}
+    stage_stats = _sync_stage_stats.get()
+
+    async def _fetch(group_id: str) -> _FetchedT:
+        nonlocal finished_at
+        # Each fetch runs in its own task, with its own copy of the context, so
+        # the listener sees only this fetch's pages.
+        fetch_started_at = loop.time()
+        try:
+            with observe_rate_limits(window.observe):
+                return await fetch(group_id)
+        finally:
+            finished_at = loop.time()
+            fetch_seconds[group_id] = finished_at - fetch_started_at
+
+    def _fill_window() -> None:
+        while len(in_flight) < window.size:
+            group = next(remaining, None)
+            if group is None:
+                return
+            in_flight[asyncio.ensure_future(_fetch(group.id))] = group
+            if stage_stats is not None:
+                stage_stats.peak_fetch_window = max(stage_stats.peak_fetch_window, len(in_flight))
+
+    async def _report_window() -> None:
+        nonlocal reported_size
+        for reason in window.throttle_events:
+            await _record_metric("counter", "syncer.okta_fetch.throttled", 1, {"reason": reason})
+        if window.throttle_events:
+            logger.info(f"Okta fetch window shrunk to {window.size} ({', '.join(window.throttle_events)})")
+        window.throttle_events.clear()
+        if window.size != reported_size:
+            reported_size = window.size
+            await _record_metric("gauge", "syncer.okta_fetch.window_size", reported_size)
 
     try:
-        for _ in range(concurrency):
-            _start_next()
+        _fill_window()
+        await _report_window()
 
         while in_flight:
             done, _ = await asyncio.wait(set(in_flight), return_when=asyncio.FIRST_COMPLETED)
@@ -96,13 +380,19 @@ async def _prefetch_group_okta_lists(
                     # skip just this group; a CancelledError (shutdown) is not an
                     # Exception, so it propagates and stops the run rather than
                     # being swallowed.
-                    result: list[User] | Exception = task.result()
+                    result: _FetchedT | Exception = task.result()
                 except Exception as exc:
                     result = exc
-                # Refill the window before yielding so the replacement fetch
-                # overlaps the caller's reconciliation of this result.
-                _start_next()
+                if isinstance(result, OktaTransientError):
+                    window.observe_transient_error()
+                # Refill the window before yielding so the replacement fetches
+                # overlap the caller's reconciliation of this result.
+                _fill_window()
+                await _report_window()
                 yield group, result
+
+        if fetch_seconds:
+            await _report_critical_path(fetch_seconds, concurrency, finished_at - started_at)
     finally:
         # Cancel any still-in-flight fetches if the caller stops early.
         for task in in_flight:
@@ -111,41 +401,337 @@ async def _prefetch_group_okta_lists(
             await asyncio.gather(*in_flight, return_exceptions=True)
 
 
-async def sync_users() -> None:
-    logger.info("User sync starting")
+async def _report_critical_path(fetch_seconds: dict[str, float], concurrency: int, actual_seconds: float) -> None:
+    """Log and record how long a prefetch's Okta fetches took against their critical path."""
+    longest_group_id, longest_seconds = max(fetch_seconds.items(), key=lambda item: item[1])
+    expected_seconds = max(longest_seconds, sum(fetch_seconds.values()) / concurrency)
+    logger.info(
+        f"Fetched {len(fetch_seconds)} groups from Okta in {actual_seconds:.1f}s against a critical path of "
+        f"{expected_seconds:.1f}s (longest fetch: group {longest_group_id}, {longest_seconds:.1f}s)"
+    )
+    await _record_metric("gauge", "syncer.okta_fetch.critical_path_seconds", expected_seconds, {"path": "expected"})
+    await _record_metric("gauge", "syncer.okta_fetch.critical_path_seconds", actual_seconds, {"path": "actual"})
 
-    # Get all users from okta
-    users = await okta.list_users()
-    user_type_to_user_attrs_to_titles = {}
 
-    # Hydrate all users into sql alchemy context at once
-    # to avoid a roundtrip for each user
-    _ = (await db.session.scalars(select(OktaUser))).all()
+def _supports_concurrent_sessions() -> bool:
+    return db.session.get_bind().dialect.name != "sqlite"
 
-    for user in users:
-        logger.info(f"Syncing user {user.id}")
 
-        if user.type.id not in user_type_to_user_attrs_to_titles:
-            user_type_to_user_attrs_to_titles[user.type.id] = (
-                await okta.get_user_schema(user.type.id)
+async def _reconcile_in_lanes(
+    pairs: AsyncIterator[tuple[Group, _FetchedT | Exception]],
+    reconcile: Callable[[Group, _FetchedT | Exception], Awaitable[None]],
+    lanes: int,
+) -> None:
+    """Hand each prefetched ``(group, okta_list)`` pair to ``reconcile``, on up to ``lanes`` DB sessions at once.
+
+    With a single lane, ``reconcile`` runs on the caller's ``db.session``, one
+    group after the other. With more, each lane is a task with its own session
+    scope, and so its own ``db.session`` and connection, taking the next pair
+    from a queue as soon as it committed (or rolled back) its last group.
+    ``reconcile`` commits each group on its own, so a group failing in one lane
+    doesn't affect the groups of the others.
+
+    SQLite shares its one connection between sessions (and only has one writer
+    anyway), so the lanes need Postgres.
+    """
+    if lanes > 1 and not _supports_concurrent_sessions():
+        logger.warning(f"Reconciling groups in one lane rather than {lanes}, as SQLite allows only one writer")
+        lanes = 1
+    if lanes <= 1:
+        async for group, fetched in pairs:
+            await reconcile(group, fetched)
+        return
+
+    queue: asyncio.Queue[tuple[Group, _FetchedT | Exception] | None] = asyncio.Queue(maxsize=lanes)
+    scope = _session_scope.get()
+
+    async def _lane(index: int) -> None:
+        # Setting the scope in the lane's task only changes its own copy of
+        # the context, so this lane alone uses the session of this scope
+        _session_scope.set(f"{scope}:reconcile-lane-{index}")
+        try:
+            while (pair := await queue.get()) is not None:
+                await reconcile(*pair)
+        finally:
+            await db.remove()
+
+    lane_tasks = [asyncio.ensure_future(_lane(index)) for index in range(lanes)]
+    try:
+        async for pair in pairs:
+            put = asyncio.ensure_future(queue.put(pair))
+            await asyncio.wait([put, *lane_tasks], return_when=asyncio.FIRST_COMPLETED)
+            if not put.done():
+                # A lane stopped before being told to, so it failed
+                put.cancel()
+                for task in lane_tasks:
+                    if task.done():
+                        task.result()
+        for _ in lane_tasks:
+            await queue.put(None)
+        await asyncio.gather(*lane_tasks)
+    finally:
+        for task in lane_tasks:
+            task.cancel()
+        await asyncio.gather(*lane_tasks, return_exceptions=True)
+
+
+@dataclass(slots=True)
+class GroupSyncDiff:
+    """What a targeted ``sync_group`` changed, by user id, in the DB and in Okta."""
+
+    group_id: str
+    # The group was created, updated, resurrected or deleted
+    group_changed: bool = False
+    group_deleted: bool = False
+    members_added: list[str] = field(default_factory=list)
+    members_removed: list[str] = field(default_factory=list)
+    owners_added: list[str] = field(default_factory=list)
+    owners_removed: list[str] = field(default_factory=list)
+    # The corrective writes made to Okta when acting as the authority
+    okta_members_added: list[str] = field(default_factory=list)
+    okta_members_removed: list[str] = field(default_factory=list)
+    okta_owners_added: list[str] = field(default_factory=list)
+    okta_owners_removed: list[str] = field(default_factory=list)
+
+
+# The diff of the ``sync_group`` running in the current context, if any
+_group_sync_diff: ContextVar[GroupSyncDiff | None] = ContextVar("group_sync_diff", default=None)
+
+# The ``GroupSyncDiff`` field each corrective Okta write is recorded in
+_OKTA_WRITE_DIFF_FIELDS = {
+    "add_user_to_group": "okta_members_added",
+    "remove_user_from_group": "okta_members_removed",
+    "add_owner_to_group": "okta_owners_added",
+    "remove_owner_from_group": "okta_owners_removed",
+}
+
+# How each DB change recorded in a ``GroupSyncDiff`` counts in ``SyncStageStats``
+_DB_CHANGE_ROW_KINDS = {
+    "members_added": "inserted",
+    "members_removed": "ended",
+    "owners_added": "inserted",
+    "owners_removed": "ended",
+}
+
+
+def _record_group_sync_change(change: str, user_ids: Collection[str]) -> None:
+    """Add ``user_ids`` to the ``change`` field of the running ``sync_group``'s diff, if any,
+    and count the memberships or ownerships a DB change wrote in the running sync stage."""
+    if change in _DB_CHANGE_ROW_KINDS:
+        _count_sync_stage_rows(**{_DB_CHANGE_ROW_KINDS[change]: len(user_ids)})
+    diff = _group_sync_diff.get()
+    if diff is not None:
+        getattr(diff, change).extend(sorted(user_ids))
+
+
+async def _write_okta_group_users(
+    call: str,
+    group_id: str,
+    user_ids: Collection[str],
+    concurrency: int,
+) -> list[str]:
+    """Call ``okta.<call>(group_id, user_id)`` for every user, keeping up to ``concurrency`` calls in flight.
+
+    Used for the corrective Okta calls of an authoritative sync (``add_user_to_group``
+    and friends). Each call is independent: a failure is logged and its user id
+    returned rather than raised, so one bad user doesn't abort the rest of the
+    group. Like the prefetch, these workers do network I/O only and must never
+    touch ``db.session`` (the concurrency rule in ``api/extensions.py``).
+    """
+    if len(user_ids) == 0:
+        return []
+    write: Callable[[str, str], Awaitable[None]] = getattr(okta, call)
+    remaining = iter(user_ids)
+    failed_user_ids: list[str] = []
+
+    async def _worker() -> None:
+        for user_id in remaining:
+            try:
+                await write(group_id, user_id)
+            except Exception:
+                logger.warning(f"Okta {call} failed for user {user_id} in group {group_id}", exc_info=True)
+                failed_user_ids.append(user_id)
+
+    workers = [asyncio.ensure_future(_worker()) for _ in range(min(concurrency, len(user_ids)))]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        # Stop the remaining calls if the run is cancelled
+        for worker in workers:
+            worker.cancel()
+    _record_group_sync_change(_OKTA_WRITE_DIFF_FIELDS[call], set(user_ids) - set(failed_user_ids))
+    if len(failed_user_ids) > 0:
+        await _record_metric("counter", "syncer.okta_write.failed", len(failed_user_ids), {"call": call})
+    return failed_user_ids
+
+
+@dataclass(frozen=True, slots=True)
+class _ListedOktaUser:
+    """What ``sync_users`` keeps of each listed Okta user once its row is written."""
+
+    deleted: bool
+    employee_number: str | None
+    manager_employee_number: str | None
+    # The user's manager_id in the DB before this sync, None for a new user
+    db_manager_id: str | None
+
+
+def _as_utc(value: datetime) -> datetime:
+    # NaiveUTCDateTime columns read back naive; they are UTC by convention.
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _okta_timestamp(value: datetime) -> str:
+    # Okta filter expressions take timestamps as e.g. "2013-06-01T00:00:00.000Z".
+    return _as_utc(value).astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+async def _project_okta_users(user_ids: list[str]) -> dict[str, tuple[str | None, str | None]]:
+    """Map the given users to their ``(okta_profile_hash, manager_id)``."""
+    query = select(OktaUser.id, OktaUser.okta_profile_hash, OktaUser.manager_id).where(OktaUser.id.in_(user_ids))
+    return {
+        user_id: (okta_profile_hash, manager_id)
+        for user_id, okta_profile_hash, manager_id in (await db.session.execute(query)).tuples()
+    }
+
+
+async def _upsert_okta_users(rows: list[dict[str, Any]]) -> None:
+    """Insert or update ``okta_user`` rows in chunked ``INSERT ... ON CONFLICT DO UPDATE`` statements.
+
+    ``rows`` all carry the synced columns and ``okta_profile_hash``, plus
+    ``created_at``/``updated_at``, which are only written for new rows; an existing row keeps its ``created_at`` and
+    gets ``updated_at`` bumped to now. Postgres in production, SQLite in tests:
+    both support the same upsert syntax.
+    """
+    if len(rows) == 0:
+        return
+    insert = postgresql_insert if db.session.get_bind().dialect.name == "postgresql" else sqlite_insert
+    for chunk_start in range(0, len(rows), _UPSERT_CHUNK_SIZE):
+        statement = insert(OktaUser).values(rows[chunk_start : chunk_start + _UPSERT_CHUNK_SIZE])
+        statement = statement.on_conflict_do_update(
+            index_elements=[OktaUser.id],
+            set_={
+                **{column: statement.excluded[column] for column in OktaUser.OKTA_SYNCED_COLUMNS if column != "id"},
+                "okta_profile_hash": statement.excluded.okta_profile_hash,
+                "updated_at": func.now(),
+            },
+        )
+        await db.session.execute(statement)
+
+
+def _full_sync_due(state: SyncState | None, now: datetime, interval_seconds: int) -> bool:
+    if state is None or state.last_full_sync_at is None:
+        return True
+    return now - _as_utc(state.last_full_sync_at) >= timedelta(seconds=interval_seconds)
+
+
+def _record_sync_state(state: SyncState | None, name: str, started_at: datetime, full: bool) -> None:
+    if state is None:
+        state = SyncState(name=name)
+        db.session.add(state)
+    state.watermark = started_at
+    if full:
+        state.last_full_sync_at = started_at
+
+
+async def _resumable_sync_run(stage: str, now: datetime, full: bool | None) -> SyncRun | None:
+    """Return the interrupted ``SyncRun`` of ``stage`` if this run should resume it, discarding any other one.
+
+    A run is resumed when it started less than ``SYNC_RESUME_WINDOW_SECONDS``
+    ago and ``full`` doesn't ask for the other mode.
+    """
+    run = await db.session.get(SyncRun, stage)
+    if run is None:
+        return None
+    if (full is None or full == run.full) and now - _as_utc(run.snapshot_at) < timedelta(
+        seconds=settings.SYNC_RESUME_WINDOW_SECONDS
+    ):
+        return run
+    logger.info(f"Discarding the progress of the {stage} sync started at {run.snapshot_at}, starting over")
+    await _clear_sync_run(stage)
+    return None
+
+
+async def _clear_sync_run(stage: str) -> None:
+    await db.session.execute(delete(SyncRunGroup).where(SyncRunGroup.stage == stage))
+    await db.session.execute(delete(SyncRun).where(SyncRun.stage == stage))
+
+
+async def _checkpoint_sync_run(stage: str, group_id: str) -> None:
+    """Mark ``group_id`` done in the ``SyncRun`` of ``stage``; commit it along with the group's reconcile."""
+    db.session.add(SyncRunGroup(stage=stage, group_id=group_id))
+    await db.session.execute(
+        update(SyncRun)
+        .where(SyncRun.stage == stage)
+        .values(groups_completed=SyncRun.groups_completed + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _write_okta_users(
+    users: list[User],
+    user_type_to_user_attrs_to_titles: dict[str | None, dict[str, str]],
+    listed_users: dict[str, _ListedOktaUser],
+) -> tuple[int, int, int]:
+    """Upsert the users whose Okta values changed, recording each of ``users`` in ``listed_users``.
+
+    ``user_type_to_user_attrs_to_titles`` caches the user schema of each Okta
+    user type across calls. Returns how many users were written, how many of
+    those were created, and how many were skipped as unchanged.
+    """
+    # The column values Okta is the source of truth for, keyed by user id (so a
+    # user Okta returned twice on a page is written once).
+    okta_values_by_user_id: dict[str, dict[str, Any]] = {}
+    for user in users:
+        if user.type_id not in user_type_to_user_attrs_to_titles:
+            user_type_to_user_attrs_to_titles[user.type_id] = (
+                await okta.get_user_schema(user.type_id)
             ).user_attrs_to_titles()
 
-        user_attrs_to_titles = user_type_to_user_attrs_to_titles[user.type.id]
+        okta_values_by_user_id[user.id] = user.okta_user_values(user_type_to_user_attrs_to_titles[user.type_id])
 
-        db_user = await db.session.get(OktaUser, user.id)
+    # Diff the hash of the Okta values against the one stored on each row,
+    # projected rather than hydrating the rows into the session as ORM objects
+    db_hash_and_manager_by_user_id = await _project_okta_users(list(okta_values_by_user_id))
 
-        if db_user is None:
+    created_users = 0
+    skipped_users = 0
+    users_to_upsert = []
+    for user in users:
+        okta_values = okta_values_by_user_id.pop(user.id, None)
+        if okta_values is None:
+            continue
+        db_hash_and_manager = db_hash_and_manager_by_user_id.get(user.id)
+        listed_users[user.id] = _ListedOktaUser(
+            deleted=okta_values["deleted_at"] is not None,
+            employee_number=user.profile.employee_number,
+            manager_employee_number=user.profile.manager_id,
+            db_manager_id=db_hash_and_manager[1] if db_hash_and_manager is not None else None,
+        )
+        okta_values["okta_profile_hash"] = okta_values_hash(okta_values)
+        if db_hash_and_manager is None:
             logger.info(f"Creating user in DB {user.id}")
-            db.session.add(user.update_okta_user(OktaUser(), user_attrs_to_titles))
-
+            created_users += 1
+        elif db_hash_and_manager[0] == okta_values["okta_profile_hash"]:
+            skipped_users += 1
+            continue
         else:
-            # User was found. Let's update
-            user.update_okta_user(db_user, user_attrs_to_titles)
+            logger.info(f"Updating user in DB {user.id}")
+        # Only used when inserting; an update keeps the row's created_at
+        okta_values["created_at"] = user.created
+        okta_values["updated_at"] = user.last_updated
+        users_to_upsert.append(okta_values)
 
-    await db.session.commit()
+    await _upsert_okta_users(users_to_upsert)
+    return len(users_to_upsert), created_users, skipped_users
 
-    # Delete users and end all group memberships in the DB for users that are suspended/deactivated in Okta
-    deleted_user_ids = [u.id for u in filter(lambda u: u.get_deleted_at() is not None, users)]
+
+async def _delete_deactivated_okta_users(listed_users: dict[str, _ListedOktaUser]) -> int:
+    """Delete the listed users suspended/deactivated in Okta, ending all their group memberships in the DB.
+
+    Returns how many users were deleted.
+    """
+    deleted_user_ids = [user_id for user_id, user in listed_users.items() if user.deleted]
 
     users_to_delete = (
         await db.session.scalars(
@@ -156,19 +742,127 @@ async def sync_users() -> None:
     for db_user in users_to_delete:
         logger.info(f"Deleting user in DB {db_user.id} that was suspended/deactivated in Okta")
         await DeleteUser(user=db_user.id).execute()
+    _count_sync_stage_rows(ended=len(users_to_delete))
+    return len(users_to_delete)
 
-    # Delete users and end all group memberships in the DB for users that are deleted in Okta
-    active_user_ids = [u.id for u in filter(lambda u: u.get_deleted_at() is None, users)]
 
-    more_users_to_delete = (
-        await db.session.scalars(
-            select(OktaUser).where(OktaUser.id.not_in(active_user_ids)).where(OktaUser.deleted_at.is_(None))
+async def _update_okta_user_managers(listed_users: dict[str, _ListedOktaUser], full: bool) -> int:
+    """Sync the manager foreign keys of the listed users, as Okta only gives us employee numbers.
+
+    ``full`` says ``listed_users`` holds every Okta user; otherwise the
+    managers missing from it are looked up in the DB. Returns how many
+    managers changed.
+    """
+    manager_ids_by_employee_number: dict[str, str] = {}
+    if not full:
+        # A partial listing only holds the changed users, so look the
+        # managers up in the DB (already synced) and let the changed users
+        # override them. Active users are read last so they win an employee
+        # number shared with a deleted user.
+        manager_employee_numbers = {
+            user.manager_employee_number for user in listed_users.values() if user.manager_employee_number is not None
+        }
+        db_managers = await db.session.execute(
+            select(OktaUser.employee_number, OktaUser.id)
+            .where(OktaUser.employee_number.in_(manager_employee_numbers))
+            .order_by(OktaUser.deleted_at.is_(None))
         )
-    ).all()
+        manager_ids_by_employee_number.update(
+            (employee_number, id) for employee_number, id in db_managers.tuples() if employee_number is not None
+        )
+    manager_ids_by_employee_number.update(
+        (user.employee_number, user_id) for user_id, user in listed_users.items() if user.employee_number is not None
+    )
+
+    # Write only the manager ids that changed, as one executemany UPDATE by
+    # primary key. A user just created has no manager yet.
+    manager_updates: dict[str, str | None] = {}
+    for user_id, user in listed_users.items():
+        manager_id = manager_ids_by_employee_number.get(user.manager_employee_number)
+        if manager_id != user.db_manager_id:
+            manager_updates[user_id] = manager_id
+    if len(manager_updates) > 0:
+        logger.info(f"Updating the manager of {len(manager_updates)} users")
+        await db.session.execute(
+            update(OktaUser),
+            [{"id": user_id, "manager_id": manager_id} for user_id, manager_id in manager_updates.items()],
+        )
+        _count_sync_stage_rows(updated=len(manager_updates))
+    return len(manager_updates)
+
+
+async def sync_users(full: bool | None = None) -> None:
+    """Sync Okta users into the DB.
+
+    A full sync lists every user in the Okta org; it is the only mode that can
+    notice a user hard-deleted from Okta. An incremental sync only lists the
+    users whose Okta ``lastUpdated`` is past the watermark saved by the last
+    successful run, which also covers suspended and deprovisioned users since a
+    status change bumps ``lastUpdated``.
+
+    Args:
+        full: ``True`` forces a full sync and ``False`` an incremental one.
+            ``None`` runs a full sync when the last one is older than
+            ``SYNC_USERS_FULL_RECONCILE_INTERVAL_SECONDS`` and an incremental
+            one otherwise. An incremental sync without a saved watermark falls
+            back to a full sync.
+    """
+    started_at = datetime.now(timezone.utc)
+    state = await db.session.get(SyncState, USERS_SYNC_STATE)
+    if full is None:
+        full = _full_sync_due(state, started_at, settings.SYNC_USERS_FULL_RECONCILE_INTERVAL_SECONDS)
+    if state is None or state.watermark is None:
+        if not full:
+            logger.info("No user sync watermark saved yet, running a full user sync")
+        full = True
+
+    if full:
+        logger.info("User sync starting (full)")
+        # Get all users from okta
+        pages = okta.iter_users()
+    else:
+        assert state is not None and state.watermark is not None
+        since = _okta_timestamp(_as_utc(state.watermark) - _INCREMENTAL_USER_SYNC_OVERLAP)
+        logger.info(f"User sync starting (incremental, users updated in Okta after {since})")
+        pages = okta.iter_users(query_params={"filter": f'lastUpdated gt "{since}"'})
+    user_type_to_user_attrs_to_titles: dict[str | None, dict[str, str]] = {}
+
+    # Write each page as it arrives and keep only what the deletion and manager
+    # passes below need, so memory doesn't grow with the Okta user objects
+    listed_users: dict[str, _ListedOktaUser] = {}
+    written_users = 0
+    created_users = 0
+    skipped_users = 0
+    async for page in pages:
+        written, created, skipped = await _write_okta_users(page, user_type_to_user_attrs_to_titles, listed_users)
+        written_users += written
+        created_users += created
+        skipped_users += skipped
+
+    if not full:
+        logger.info(f"{len(listed_users)} users changed in Okta since the last user sync")
+    logger.info(f"Wrote {written_users} new or changed users to the DB, skipped {skipped_users} unchanged users")
+    _count_sync_stage_rows(inserted=created_users, updated=written_users - created_users)
+
+    await db.session.commit()
+
+    await _delete_deactivated_okta_users(listed_users)
+
+    # Delete users and end all group memberships in the DB for users that are deleted in Okta.
+    # Only a full listing can tell that a user is gone from Okta.
+    if full:
+        active_user_ids = [user_id for user_id, user in listed_users.items() if not user.deleted]
+
+        more_users_to_delete = (
+            await db.session.scalars(
+                select(OktaUser).where(OktaUser.id.not_in(active_user_ids)).where(OktaUser.deleted_at.is_(None))
+            )
+        ).all()
 
-    for db_user in more_users_to_delete:
-        logger.info(f"Deleting user in DB {db_user.id} that was deleted in Okta")
-        await DeleteUser(user=db_user.id, sync_to_okta=False).execute()
+        for db_user in more_users_to_delete:
+            logger.info(f"Deleting user in DB {db_user.id} that was deleted in Okta")
+            await DeleteUser(user=db_user.id, sync_to_okta=False).execute()
+        _count_sync_stage_rows(ended=len(more_users_to_delete))
 
     # End all active group memberships in the DB for users that were previously deleted
     db_deleted_users_with_access = (
@@ -182,71 +876,144 @@ async def sync_users() -> None:
     for user_id in set([u.user_id for u in db_deleted_users_with_access]):
         logger.info(f"Ending active group ownerships/memberships for deleted user in DB {user_id}")
         await DeleteUser(user=user_id).execute()
+    _count_sync_stage_rows(ended=len(db_deleted_users_with_access))
 
-    # Sync manager foreign keys, as Okta only gives us employee numbers
-    users_by_employee_number = {
-        user.profile.employee_number: user for user in filter(lambda u: u.profile.employee_number is not None, users)
-    }
-    for user in users:
-        db_user = await db.session.get(OktaUser, user.id)
-        if db_user is None:
-            # The user iteration just upserted this row, so a None here
-            # would only happen if Okta returned a duplicate id mid-iteration.
-            continue
-        manager = users_by_employee_number.get(user.profile.manager_id, None)
-        db_user.manager_id = getattr(manager, "id", None)
+    await _update_okta_user_managers(listed_users, full)
+
+    # Only advance the watermark once the run has succeeded, so a failed run is
+    # retried from the same point.
+    _record_sync_state(state, USERS_SYNC_STATE, started_at, full)
 
     await db.session.commit()
 
     logger.info("User sync finished.")
 
 
+@dataclass(frozen=True, slots=True)
+class UserSyncDiff:
+    """What a targeted ``sync_user`` changed in the DB."""
+
+    user_id: str
+    created: bool = False
+    updated: bool = False
+    deleted: bool = False
+    manager_updated: bool = False
+
+
+async def sync_user(
+    user_id: str, user_type_to_user_attrs_to_titles: dict[str | None, dict[str, str]] | None = None
+) -> UserSyncDiff:
+    """Sync one Okta user into the DB, as ``sync_users`` would, returning what changed.
+
+    Unlike an incremental ``sync_users``, this also notices a user hard-deleted
+    from Okta. ``user_id`` may also be the user's Okta login.
+    ``user_type_to_user_attrs_to_titles`` caches the user schema of each Okta
+    user type across calls.
+    """
+    try:
+        user = await okta.get_user(user_id)
+    except OktaResourceNotFoundError:
+        db_user = await db.session.get(OktaUser, user_id)
+        if db_user is None or db_user.deleted_at is not None:
+            return UserSyncDiff(user_id=user_id)
+        logger.info(f"Deleting user in DB {user_id} that was deleted in Okta")
+        await DeleteUser(user=user_id, sync_to_okta=False).execute()
+        await db.session.commit()
+        return UserSyncDiff(user_id=user_id, deleted=True)
+
+    listed_users: dict[str, _ListedOktaUser] = {}
+    written, created, _ = await _write_okta_users(
+        [user],
+        user_type_to_user_attrs_to_titles if user_type_to_user_attrs_to_titles is not None else {},
+        listed_users,
+    )
+    await db.session.commit()
+
+    deleted = await _delete_deactivated_okta_users(listed_users)
+    managers_updated = await _update_okta_user_managers(listed_users, full=False)
+    await db.session.commit()
+    return UserSyncDiff(
+        user_id=user.id,
+        created=created > 0,
+        updated=written > created,
+        deleted=deleted > 0,
+        manager_updated=managers_updated > 0,
+    )
+
+
+async def load_managed_group_index() -> ManagedGroupIndex:
+    """List the active Okta group rules once for a sync run."""
+    return ManagedGroupIndex(await okta.list_groups_with_active_rules())
+
+
+async def _sync_okta_group(group: Group, act_as_authority: bool, managed_groups: ManagedGroupIndex) -> bool:
+    """Sync one group listed by Okta into the DB, without committing.
+
+    Returns whether anything needed writing, i.e. ``False`` for a group
+    unchanged in Okta since the last sync.
+    """
+    db_group = await db.session.get(OktaGroup, group.id)
+
+    # Handle the case where the group is in okta but not in the DB.
+    if db_group is None:
+        if act_as_authority:
+            logger.info(f"A new group {group.id} was added directly through okta. Deleting.")
+            await okta.delete_group(group.id)
+        else:
+            logger.info(f"A new group {group.id} was added directly through okta. Adding to DB.")
+            db.session.add(group.update_okta_group(OktaGroup(), managed_groups.group_rules))
+            _count_sync_stage_rows(inserted=1)
+
+    # Handle the case where we've marked the group as deleted, but it still exists in okta
+    elif db_group.deleted_at:
+        if act_as_authority:
+            logger.info(f"Group {group.id} is marked as deleted, but still exists in okta. Deleting.")
+            await DeleteGroup(group=group.id).execute()
+            _count_sync_stage_rows(ended=1)
+        else:
+            logger.info(f"Group {group.id} is marked as deleted, but still exists in okta. Resurrecting.")
+            db_group.deleted_at = None
+            _count_sync_stage_rows(updated=1)
+
+    # Handle the cases where the group is active in both Okta and our DB.
+    else:
+        if not act_as_authority:
+            if db_group.okta_profile_hash == okta_values_hash(group.okta_group_values(managed_groups.group_rules)):
+                return False
+
+            was_previously_managed = db_group.is_managed
+            db_group = group.update_okta_group(db_group, managed_groups.group_rules)
+            _count_sync_stage_rows(updated=1)
+
+            if not db_group.is_managed and was_previously_managed:
+                await UnmanageGroup(group=db_group).execute()
+    return True
+
+
 async def sync_groups(
     act_as_authority: bool,
-    group_ids_with_group_rules: _GroupRulesByGroupId | None = None,
+    managed_groups: ManagedGroupIndex | None = None,
 ) -> None:
     logger.info("Group sync starting")
 
-    groups_in_okta = await okta.list_groups()
     db_group_ids = set((await db.session.scalars(select(OktaGroup.id).where(OktaGroup.deleted_at.is_(None)))).all())
 
-    if group_ids_with_group_rules is None:
-        group_ids_with_group_rules = await okta.list_groups_with_active_rules()
+    if managed_groups is None:
+        managed_groups = await load_managed_group_index()
 
-    for group in groups_in_okta:
-        logger.info(f"Syncing group {group.id}")
+    skipped_groups = 0
+    async for page in okta.iter_groups():
+        for group in page:
+            logger.info(f"Syncing group {group.id}")
 
-        # Remove found groups from deleted group ids
-        db_group_ids.discard(group.id)
+            # Remove found groups from deleted group ids
+            db_group_ids.discard(group.id)
 
-        db_group = await db.session.get(OktaGroup, group.id)
+            if not await _sync_okta_group(group, act_as_authority, managed_groups):
+                skipped_groups += 1
 
-        # Handle the case where the group is in okta but not in the DB.
-        if db_group is None:
-            if act_as_authority:
-                logger.info(f"A new group {group.id} was added directly through okta. Deleting.")
-                await okta.delete_group(group.id)
-            else:
-                logger.info(f"A new group {group.id} was added directly through okta. Adding to DB.")
-                db.session.add(group.update_okta_group(OktaGroup(), group_ids_with_group_rules))
-
-        # Handle the case where we've marked the group as deleted, but it still exists in okta
-        elif db_group.deleted_at:
-            if act_as_authority:
-                logger.info(f"Group {group.id} is marked as deleted, but still exists in okta. Deleting.")
-                await DeleteGroup(group=group.id).execute()
-            else:
-                logger.info(f"Group {group.id} is marked as deleted, but still exists in okta. Resurrecting.")
-                db_group.deleted_at = None
-
-        # Handle the cases where the group is active in both Okta and our DB.
-        else:
-            if not act_as_authority:
-                was_previously_managed = db_group.is_managed
-                db_group = group.update_okta_group(db_group, group_ids_with_group_rules)
-
-                if not db_group.is_managed and was_previously_managed:
-                    await UnmanageGroup(group=db_group).execute()
+    if skipped_groups > 0:
+        logger.info(f"Skipped {skipped_groups} groups unchanged in Okta since the last sync")
 
     # Any remaining group ids have been deleted from okta's side.
     if len(db_group_ids) > 0:
@@ -256,61 +1023,399 @@ async def sync_groups(
 
         for group_id in db_group_ids:
             await DeleteGroup(group=group_id, sync_to_okta=False).execute()
+        _count_sync_stage_rows(ended=len(db_group_ids))
 
     await db.session.commit()
     logger.info("Group sync finished.")
 
 
-async def sync_group_memberships(
-    act_as_authority: bool,
-    groups: list[Group] | None = None,
-    group_ids_with_group_rules: _GroupRulesByGroupId | None = None,
-    *,
-    concurrency: int,
-) -> None:
-    logger.info("Membership sync started.")
-    if groups is None:
-        groups = await okta.list_groups()
+async def _groups_with_membership_changes(groups: list[Group]) -> list[Group]:
+    """Filter ``groups`` down to the ones whose membership may have changed since their last reconcile.
 
-    # Hydrate all groups into sql alchemy context at once
-    # to avoid a roundtrip for each group
-    _ = (await db.session.scalars(select(with_polymorphic(OktaGroup, [AppGroup, RoleGroup])))).all()
+    A group is left out when Okta's ``lastMembershipUpdated`` still equals the
+    value recorded at its last successful reconcile and no membership of the
+    group was changed in Access, or has expired, since that reconcile started.
+    """
+    db_groups = await db.session.execute(
+        select(OktaGroup.id, OktaGroup.okta_last_membership_updated).where(
+            OktaGroup.okta_last_membership_updated.isnot(None)
+        )
+    )
+    last_membership_updated_by_group_id = {
+        group_id: _as_utc(last_membership_updated)
+        for group_id, last_membership_updated in db_groups.tuples()
+        if last_membership_updated is not None
+    }
 
-    if group_ids_with_group_rules is None:
-        group_ids_with_group_rules = await okta.list_groups_with_active_rules()
+    groups_changed_in_access = set(
+        (
+            await db.session.scalars(
+                select(OktaUserGroupMember.group_id)
+                .distinct()
+                .join(OktaGroup, OktaGroup.id == OktaUserGroupMember.group_id)
+                .where(
+                    OktaUserGroupMember.is_owner.is_(False),
+                    or_(
+                        OktaGroup.memberships_synced_at.is_(None),
+                        OktaUserGroupMember.updated_at > OktaGroup.memberships_synced_at,
+                        and_(
+                            OktaUserGroupMember.ended_at > OktaGroup.memberships_synced_at,
+                            OktaUserGroupMember.ended_at <= func.now(),
+                        ),
+                    ),
+                )
+            )
+        ).all()
+    )
+
+    def _changed(group: Group) -> bool:
+        last_membership_updated = last_membership_updated_by_group_id.get(group.id)
+        return (
+            group.last_membership_updated is None
+            or last_membership_updated is None
+            or _as_utc(group.last_membership_updated) != last_membership_updated
+            or group.id in groups_changed_in_access
+        )
 
-    async for group, members in _prefetch_group_okta_lists(groups, okta.list_users_for_group, concurrency):
-        if isinstance(members, OktaTransientError):
-            logger.warning(f"Transient Okta error listing members for group {group.id}, skipping.", exc_info=members)
-            continue
-        if isinstance(members, OktaResourceNotFoundError):
-            logger.warning(
-                f"Group {group.id} no longer exists in Okta (deleted after this run's group "
-                f"snapshot was taken), skipping membership sync."
+    return [group for group in groups if _changed(group)]
+
+
+def _count_skipped_group() -> None:
+    stats = _sync_stage_stats.get()
+    if stats is not None:
+        stats.groups_skipped += 1
+
+
+def _log_group_fetch_error(group: Group, error: Exception, listing: str, synced: str) -> None:
+    if isinstance(error, OktaTransientError):
+        logger.warning(f"Transient Okta error listing {listing} for group {group.id}, skipping.", exc_info=error)
+        _count_skipped_group()
+    elif isinstance(error, OktaResourceNotFoundError):
+        logger.warning(
+            f"Group {group.id} no longer exists in Okta (deleted after this run's group "
+            f"snapshot was taken), skipping {synced} sync."
+        )
+    else:
+        logger.error(f"Failed to list {listing} for group {group.id}, skipping.", exc_info=error)
+
+
+async def _reconcile_group_members(
+    group: Group,
+    members: list[User],
+    is_managed: bool,
+    act_authoritatively: bool,
+    write_concurrency: int,
+) -> list[str]:
+    """Reconcile one group's memberships against its Okta members, without committing.
+
+    Returns the users whose corrective Okta write failed.
+    """
+    logger.info(f"Fetched users list for group {group.id}")
+
+    db_all_group_members = {
+        row.id: row.user_id
+        for row in await db.session.execute(
+            select(
+                OktaUserGroupMember.user_id,
+                OktaUserGroupMember.id,
+            ).where(
+                OktaUserGroupMember.group_id == group.id,
+                OktaUserGroupMember.is_owner.is_(False),
+                or_(
+                    OktaUserGroupMember.ended_at.is_(None),
+                    OktaUserGroupMember.ended_at > func.now(),
+                ),
             )
-            continue
-        if isinstance(members, Exception):
-            logger.error(f"Failed to list members for group {group.id}, skipping.", exc_info=members)
-            continue
+        )
+    }
 
-        try:
-            is_managed = is_managed_group(group, group_ids_with_group_rules)
+    # Corrective Okta calls, made together once the group is diffed
+    members_to_remove_in_okta: list[str] = []
+    for member in members:
+        # User is a member in okta but not in the DB
+        if member.id not in db_all_group_members.values():
+            logger.info(f"User {member.id} is not in the group in our DB.")
 
-            act_authoritatively = act_as_authority and is_managed
+            if act_authoritatively:
+                members_to_remove_in_okta.append(member.id)
+            else:
+                reason = (
+                    "User in Okta group but not in Access group." if is_managed else "User added via Okta group rule."
+                )
+                await ModifyGroupUsers(
+                    group=group.id,
+                    members_to_add=[member.id],
+                    created_reason=reason,
+                ).execute()
+                _record_group_sync_change("members_added", [member.id])
+
+        # User is a member in okta and an entry exists in our DB
+        else:
+            db_all_group_members = {k: v for k, v in db_all_group_members.items() if v != member.id}
 
-            logger.info(f"Syncing group {group.id}. act_authoritatively: {act_authoritatively}")
+    failed_okta_writes = await _write_okta_group_users(
+        "remove_user_from_group", group.id, members_to_remove_in_okta, write_concurrency
+    )
+    logger.info("Members in Okta synced to DB.")
+
+    # All remaining values are memberships that are marked active in our DB
+    # But are not valid memberships in okta
+    if db_all_group_members:
+        logger.info(
+            f"Users were marked as members in the DB but not in okta. Updating. User IDs: {db_all_group_members}"
+        )
+
+        distinct_member_ids = set(db_all_group_members.values())
+        if act_authoritatively:
+            # Create in okta
+            failed_okta_writes += await _write_okta_group_users(
+                "add_user_to_group", group.id, distinct_member_ids, write_concurrency
+            )
+        else:
+            # Remove the direct group memberships to this group in our DB
+            # This will not affect group memberships that are via other group roles
+            await ModifyGroupUsers(group=group.id, members_to_remove=list(distinct_member_ids)).execute()
+            _record_group_sync_change("members_removed", distinct_member_ids)
+
+    if len(failed_okta_writes) > 0:
+        logger.warning(
+            f"{len(failed_okta_writes)} Okta membership writes failed for group {group.id}, "
+            f"will retry on the next sync. User IDs: {failed_okta_writes}"
+        )
+    else:
+        logger.info("Members in DB synced to Okta.")
+    return failed_okta_writes
+
+
+class _UnorderedOktaListing(Exception):
+    """Okta listed a group's members out of id order, so they can't be merged against the DB rows."""
+
+
+async def _active_member_counts(group_ids: set[str]) -> dict[str, int]:
+    """The number of users with an active membership of each of the ``group_ids`` in the DB, if any."""
+    if len(group_ids) == 0:
+        return {}
+    rows = await db.session.execute(
+        select(OktaUserGroupMember.group_id, func.count(func.distinct(OktaUserGroupMember.user_id)))
+        .where(
+            OktaUserGroupMember.group_id.in_(group_ids),
+            OktaUserGroupMember.is_owner.is_(False),
+            or_(OktaUserGroupMember.ended_at.is_(None), OktaUserGroupMember.ended_at > func.now()),
+        )
+        .group_by(OktaUserGroupMember.group_id)
+    )
+    return {group_id: count for group_id, count in rows.tuples()}
 
-            logger.info(f"Fetched users list for group {group.id}")
 
-            db_all_group_members = {
+async def _iter_db_group_member_ids(group_id: str) -> AsyncGenerator[str, None]:
+    """Yield the users with an active membership of the group in the DB, in byte-wise id order.
+
+    Reads them in keyset-paginated chunks rather than through one server-side
+    cursor, since the streaming reconcile commits (through ``ModifyGroupUsers``)
+    between chunks.
+    """
+    user_id_column: Any = OktaUserGroupMember.user_id
+    # Compare and order ids byte-wise, as Okta does, whatever the DB's default collation
+    if db.session.get_bind().dialect.name == "postgresql":
+        user_id_column = user_id_column.collate("C")
+    after: str | None = None
+    while True:
+        query = (
+            select(OktaUserGroupMember.user_id)
+            .distinct()
+            .where(
+                OktaUserGroupMember.group_id == group_id,
+                OktaUserGroupMember.is_owner.is_(False),
+                or_(OktaUserGroupMember.ended_at.is_(None), OktaUserGroupMember.ended_at > func.now()),
+            )
+            .order_by(user_id_column)
+            .limit(_STREAMING_RECONCILE_BATCH_SIZE)
+        )
+        if after is not None:
+            query = query.where(user_id_column > after)
+        user_ids = (await db.session.scalars(query)).all()
+        for user_id in user_ids:
+            yield user_id
+        if len(user_ids) < _STREAMING_RECONCILE_BATCH_SIZE:
+            return
+        after = user_ids[-1]
+
+
+async def _stream_reconcile_group_members(
+    group: Group,
+    is_managed: bool,
+    act_authoritatively: bool,
+    write_concurrency: int,
+) -> list[str]:
+    """Reconcile a large group's memberships by merging its Okta member pages against its DB members.
+
+    Okta lists members in id order (its ``after`` cursor is the last id), so
+    each page is merged against the DB member ids read in the same order,
+    without holding either side in full. Users in Okta but not in the DB are
+    written in batches as the merge goes. Users in the DB but not in Okta are
+    only collected (as ids) and written once the whole listing was read, as
+    only then is it certain Okta doesn't list them after all. Should Okta's
+    order ever not hold, the group falls back to ``_reconcile_group_members``.
+
+    Returns the users whose corrective Okta write failed.
+    """
+    logger.info(f"Streaming the members of large group {group.id}")
+    reason = "User in Okta group but not in Access group." if is_managed else "User added via Okta group rule."
+    okta_members_missing_in_db: list[str] = []
+    db_members_missing_in_okta: list[str] = []
+    failed_okta_writes: list[str] = []
+
+    async def _write_okta_members_missing_in_db() -> None:
+        if len(okta_members_missing_in_db) == 0:
+            return
+        logger.info(f"{len(okta_members_missing_in_db)} users are not in the group {group.id} in our DB.")
+        if act_authoritatively:
+            failed_okta_writes.extend(
+                await _write_okta_group_users(
+                    "remove_user_from_group", group.id, okta_members_missing_in_db, write_concurrency
+                )
+            )
+        else:
+            await ModifyGroupUsers(
+                group=group.id,
+                members_to_add=list(okta_members_missing_in_db),
+                created_reason=reason,
+            ).execute()
+            _record_group_sync_change("members_added", okta_members_missing_in_db)
+        okta_members_missing_in_db.clear()
+
+    db_member_ids = _iter_db_group_member_ids(group.id)
+    try:
+        db_member_id = await anext(db_member_ids, None)
+        previous_member_id: str | None = None
+        async for page in okta.iter_group_users(group.id):
+            for member in page:
+                if previous_member_id is not None and member.id <= previous_member_id:
+                    if member.id == previous_member_id:
+                        continue
+                    raise _UnorderedOktaListing(f"{member.id} listed after {previous_member_id}")
+                previous_member_id = member.id
+
+                while db_member_id is not None and db_member_id < member.id:
+                    db_members_missing_in_okta.append(db_member_id)
+                    db_member_id = await anext(db_member_ids, None)
+                if db_member_id == member.id:
+                    db_member_id = await anext(db_member_ids, None)
+                else:
+                    okta_members_missing_in_db.append(member.id)
+                    if len(okta_members_missing_in_db) >= _STREAMING_RECONCILE_BATCH_SIZE:
+                        await _write_okta_members_missing_in_db()
+        while db_member_id is not None:
+            db_members_missing_in_okta.append(db_member_id)
+            db_member_id = await anext(db_member_ids, None)
+    except _UnorderedOktaListing as e:
+        # The writes made so far only added Okta members missing from the DB,
+        # which holds whatever the order.
+        logger.warning(f"Okta listed the members of group {group.id} out of order ({e}), reconciling it in memory.")
+        return failed_okta_writes + await _reconcile_group_members(
+            group, await okta.list_users_for_group(group.id), is_managed, act_authoritatively, write_concurrency
+        )
+    finally:
+        await db_member_ids.aclose()
+    await _write_okta_members_missing_in_db()
+    logger.info("Members in Okta synced to DB.")
+
+    if len(db_members_missing_in_okta) > 0:
+        logger.info(
+            f"{len(db_members_missing_in_okta)} users were marked as members of group {group.id} in the DB "
+            f"but not in okta. Updating."
+        )
+    for batch_start in range(0, len(db_members_missing_in_okta), _STREAMING_RECONCILE_BATCH_SIZE):
+        batch = db_members_missing_in_okta[batch_start : batch_start + _STREAMING_RECONCILE_BATCH_SIZE]
+        if act_authoritatively:
+            failed_okta_writes += await _write_okta_group_users("add_user_to_group", group.id, batch, write_concurrency)
+        else:
+            # Remove the direct group memberships to this group in our DB
+            # This will not affect group memberships that are via other group roles
+            await ModifyGroupUsers(group=group.id, members_to_remove=batch).execute()
+            _record_group_sync_change("members_removed", batch)
+
+    if len(failed_okta_writes) > 0:
+        logger.warning(
+            f"{len(failed_okta_writes)} Okta membership writes failed for group {group.id}, "
+            f"will retry on the next sync. User IDs: {failed_okta_writes}"
+        )
+    else:
+        logger.info("Members in DB synced to Okta.")
+    return failed_okta_writes
+
+
+async def _record_group_memberships_synced(group: Group) -> None:
+    # Record what this reconcile saw in the same commit, so the next run
+    # can skip the group if nothing moves. The DB's now() is the start of
+    # this reconcile's transaction, on the same clock as the membership
+    # rows' updated_at. Leave updated_at alone: the group row itself did
+    # not change.
+    await db.session.execute(
+        update(OktaGroup)
+        .where(OktaGroup.id == group.id)
+        .values(
+            okta_last_membership_updated=group.last_membership_updated,
+            memberships_synced_at=func.now(),
+            updated_at=OktaGroup.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _reconcile_group_owners(
+    group: Group,
+    owners: list[User],
+    is_managed: bool,
+    act_authoritatively: bool,
+    write_concurrency: int,
+) -> list[str]:
+    """Reconcile one group's ownerships against its Okta owners, without committing.
+
+    Returns the users whose corrective Okta write failed.
+    """
+    db_all_group_owners = {
+        row.id: row.user_id
+        for row in await db.session.execute(
+            select(
+                OktaUserGroupMember.user_id,
+                OktaUserGroupMember.id,
+            ).where(
+                OktaUserGroupMember.group_id == group.id,
+                OktaUserGroupMember.is_owner.is_(True),
+                or_(
+                    OktaUserGroupMember.ended_at.is_(None),
+                    OktaUserGroupMember.ended_at > func.now(),
+                ),
+            )
+        )
+    }
+
+    # If the group ownership is managed by Access and there are no owners for it
+    # check to see if it's an AppGroup and if so, add the app owners as owners in Okta
+    if act_authoritatively and len(db_all_group_owners) == 0:
+        app_group = (
+            await db.session.scalars(
+                select(AppGroup)
+                .options(
+                    joinedload(AppGroup.app).options(selectinload(App.active_owner_app_groups)),
+                )
+                .where(AppGroup.deleted_at.is_(None))
+                .where(AppGroup.id == group.id)
+            )
+        ).first()
+
+        if app_group is not None and not app_group.is_owner:
+            app_owner_group_ids = [g.id for g in app_group.app.active_owner_app_groups]
+            db_all_group_owners = {
                 row.id: row.user_id
                 for row in await db.session.execute(
                     select(
                         OktaUserGroupMember.user_id,
                         OktaUserGroupMember.id,
                     ).where(
-                        OktaUserGroupMember.group_id == group.id,
-                        OktaUserGroupMember.is_owner.is_(False),
+                        OktaUserGroupMember.group_id.in_(app_owner_group_ids),
+                        OktaUserGroupMember.is_owner.is_(True),
                         or_(
                             OktaUserGroupMember.ended_at.is_(None),
                             OktaUserGroupMember.ended_at > func.now(),
@@ -319,240 +1424,423 @@ async def sync_group_memberships(
                 )
             }
 
-            for member in members:
-                # User is a member in okta but not in the DB
-                if member.id not in db_all_group_members.values():
-                    logger.info(f"User {member.id} is not in the group in our DB.")
-
-                    if act_authoritatively:
-                        await okta.remove_user_from_group(group.id, member.id)
-                    else:
-                        reason = (
-                            "User in Okta group but not in Access group."
-                            if is_managed
-                            else "User added via Okta group rule."
-                        )
-                        await ModifyGroupUsers(
-                            group=group.id,
-                            members_to_add=[member.id],
-                            created_reason=reason,
-                        ).execute()
-
-                # User is a member in okta and an entry exists in our DB
-                else:
-                    db_all_group_members = {k: v for k, v in db_all_group_members.items() if v != member.id}
-
-            logger.info("Members in Okta synced to DB.")
+    # Corrective Okta calls, made together once the group is diffed
+    owners_to_remove_in_okta: list[str] = []
+    for owner in owners:
+        # User is a owner in okta but not in the DB
+        if owner.id not in db_all_group_owners.values():
+            logger.info(f"User {owner.id} is not in the group in our DB.")
 
-            # All remaining values are memberships that are marked active in our DB
-            # But are not valid memberships in okta
-            if db_all_group_members:
-                logger.info(
-                    f"Users were marked as members in the DB but not in okta. Updating. User IDs: {db_all_group_members}"
+            if act_authoritatively:
+                owners_to_remove_in_okta.append(owner.id)
+            else:
+                reason = (
+                    "User in Okta group but not in Access group."
+                    if is_managed
+                    else "User was added via Okta group rule."
                 )
+                await ModifyGroupUsers(
+                    group=group.id,
+                    owners_to_add=[owner.id],
+                    created_reason=reason,
+                ).execute()
+                _record_group_sync_change("owners_added", [owner.id])
+
+        # User is a owner in okta and an entry exists in our DB
+        else:
+            db_all_group_owners = {k: v for k, v in db_all_group_owners.items() if v != owner.id}
+
+    failed_okta_writes = await _write_okta_group_users(
+        "remove_owner_from_group", group.id, owners_to_remove_in_okta, write_concurrency
+    )
+
+    # All remaining values are ownerships that are marked active in our DB
+    # But are not valid ownerships in okta
+    if db_all_group_owners:
+        logger.info(f"Users were marked as owners in the DB but not in okta. Updating. User IDs: {db_all_group_owners}")
+
+        distinct_owner_ids = set(db_all_group_owners.values())
+        if act_authoritatively:
+            # Create in okta
+            failed_okta_writes += await _write_okta_group_users(
+                "add_owner_to_group", group.id, distinct_owner_ids, write_concurrency
+            )
+        else:
+            # Remove the direct group ownerships to this group in our DB
+            # This will not affect group ownerships that are via other group roles
+            await ModifyGroupUsers(group=group.id, owners_to_remove=list(distinct_owner_ids)).execute()
+            _record_group_sync_change("owners_removed", distinct_owner_ids)
+
+    if len(failed_okta_writes) > 0:
+        logger.warning(
+            f"{len(failed_okta_writes)} Okta ownership writes failed for group {group.id}, "
+            f"will retry on the next sync. User IDs: {failed_okta_writes}"
+        )
+    return failed_okta_writes
 
-                distinct_member_ids = set(db_all_group_members.values())
-                if act_authoritatively:
-                    # Create in okta
-                    for member_id in distinct_member_ids:
-                        await okta.add_user_to_group(group.id, member_id)
-                else:
-                    # Remove the direct group memberships to this group in our DB
-                    # This will not affect group memberships that are via other group roles
-                    await ModifyGroupUsers(group=group.id, members_to_remove=list(distinct_member_ids)).execute()
 
-            logger.info("Members in DB synced to Okta.")
+async def _reconcile_group_okta_lists(
+    group: Group,
+    members: list[User] | None,
+    owners: list[User] | None,
+    *,
+    stream_members: bool,
+    is_managed: bool,
+    act_authoritatively: bool,
+    write_concurrency: int,
+) -> bool:
+    """Reconcile one group's memberships and ownerships against its Okta lists, without committing.
+
+    The memberships are reconciled against ``members``, or against the members
+    streamed from Okta with ``stream_members``, and skipped when neither is
+    given; the ownerships are skipped when ``owners`` is ``None``. Returns
+    whether every corrective Okta write succeeded.
+    """
+    failed_member_writes: list[str] = []
+    if stream_members or members is not None:
+        if members is None:
+            failed_member_writes = await _stream_reconcile_group_members(
+                group, is_managed, act_authoritatively, write_concurrency
+            )
+        else:
+            failed_member_writes = await _reconcile_group_members(
+                group, members, is_managed, act_authoritatively, write_concurrency
+            )
+        # Leave the group's sync markers alone after a failed write so
+        # the next run retries it
+        if len(failed_member_writes) == 0:
+            await _record_group_memberships_synced(group)
+    failed_owner_writes: list[str] = []
+    if owners is not None:
+        failed_owner_writes = await _reconcile_group_owners(
+            group, owners, is_managed, act_authoritatively, write_concurrency
+        )
+    return len(failed_member_writes) == 0 and len(failed_owner_writes) == 0
+
+
+async def sync_group_memberships(
+    act_as_authority: bool,
+    groups: list[Group] | None = None,
+    managed_groups: ManagedGroupIndex | None = None,
+    *,
+    concurrency: int,
+    write_concurrency: int = 10,
+    reconcile_lanes: int = 1,
+    full: bool | None = None,
+    shard: GroupShard | None = None,
+    include_ownerships: bool = False,
+) -> None:
+    """Reconcile group memberships between Okta and the DB.
+
+    Args:
+        write_concurrency: When acting as the authority, the maximum number of
+            corrective Okta calls made concurrently for a group.
+        reconcile_lanes: The number of groups reconciled against the DB at
+            once, each on its own session (see ``_reconcile_in_lanes``).
+        full: ``True`` fetches the Okta members of every group. ``False`` skips
+            the groups whose membership changed neither in Okta nor in Access
+            since their last successful reconcile. ``None`` runs a full pass when
+            the last one is older than
+            ``SYNC_GROUP_MEMBERSHIPS_FULL_RECONCILE_INTERVAL_SECONDS``.
+        shard: Only reconcile the groups in this shard. Each shard keeps its own
+            full-pass schedule.
+        include_ownerships: Also reconcile the ownerships of every group, as
+            ``sync_group_ownerships`` would, in this same pass. Each group's
+            members and owners are fetched together in the one prefetch window
+            and reconciled in one transaction.
+
+    Progress is checkpointed per group in ``SyncRun``/``SyncRunGroup``. A run
+    that was killed partway through is resumed by the next one started within
+    ``SYNC_RESUME_WINDOW_SECONDS``, in the same mode and from the same group
+    snapshot time, skipping the groups it already reconciled.
+    """
+    synced = "memberships and ownerships" if include_ownerships else "memberships"
+    stage = "Membership and ownership" if include_ownerships else "Membership"
+    logger.info(f"{stage} sync started." if shard is None else f"{stage} sync started for shard {shard}.")
+    if groups is None:
+        groups = await okta.list_groups()
+    state_name = GROUP_MEMBERSHIPS_SYNC_STATE
+    run_name = GROUP_MEMBERSHIPS_AND_OWNERSHIPS_SYNC_RUN if include_ownerships else GROUP_MEMBERSHIPS_SYNC_STATE
+    if shard is not None:
+        groups = shard.filter(groups)
+        state_name = f"{state_name}:{shard}"
+        run_name = f"{run_name}:{shard}"
+
+    started_at = datetime.now(timezone.utc)
+    state = await db.session.get(SyncState, state_name)
+    run = await _resumable_sync_run(run_name, started_at, full)
+    if run is not None:
+        full = run.full
+        started_at = _as_utc(run.snapshot_at)
+    elif full is None:
+        full = _full_sync_due(state, started_at, settings.SYNC_GROUP_MEMBERSHIPS_FULL_RECONCILE_INTERVAL_SECONDS)
+    member_groups = groups
+    if not full:
+        member_groups = await _groups_with_membership_changes(groups)
+        logger.info(
+            f"Skipping the members of {len(groups) - len(member_groups)} groups whose membership is unchanged "
+            f"since their last sync, syncing {len(member_groups)}"
+        )
+    # Ownerships aren't tracked for changes, so they need every group
+    member_group_ids = {group.id for group in member_groups}
+    member_counts = await _active_member_counts(member_group_ids)
+    # Large groups' members are streamed when the group is reconciled rather
+    # than listed up front by the prefetch
+    streamed_member_group_ids = {
+        group_id for group_id, count in member_counts.items() if count >= settings.SYNC_STREAMING_RECONCILE_MIN_MEMBERS
+    }
+    # Prefetch the members of the largest groups first
+    member_list_sizes = {
+        group_id: count for group_id, count in member_counts.items() if group_id not in streamed_member_group_ids
+    }
+    if not include_ownerships:
+        groups = member_groups
+
+    if run is not None:
+        completed_group_ids = set(
+            (await db.session.scalars(select(SyncRunGroup.group_id).where(SyncRunGroup.stage == run_name))).all()
+        )
+        logger.info(
+            f"Resuming the {stage.lower()} sync started at {started_at}, "
+            f"{len(completed_group_ids)} of {run.groups_total} groups already synced"
+        )
+        groups = [group for group in groups if group.id not in completed_group_ids]
+    else:
+        db.session.add(SyncRun(stage=run_name, snapshot_at=started_at, full=full, groups_total=len(groups)))
+    await db.session.commit()
+
+    if managed_groups is None:
+        managed_groups = await load_managed_group_index()
+
+    # Hydrate all groups into sql alchemy context at once
+    # to avoid a roundtrip for each group
+    _ = (await db.session.scalars(select(with_polymorphic(OktaGroup, [AppGroup, RoleGroup])))).all()
+
+    async def _fetch(group_id: str) -> tuple[list[User] | None, list[User] | None]:
+        fetch_members = group_id in member_group_ids and group_id not in streamed_member_group_ids
+        if not include_ownerships:
+            return (await okta.list_users_for_group(group_id) if fetch_members else None), None
+        if not fetch_members:
+            return None, await okta.list_owners_for_group(group_id)
+        # List both at once, so each group takes one slot of the window for
+        # about as long as its slower listing
+        members = asyncio.ensure_future(okta.list_users_for_group(group_id))
+        try:
+            owners = await okta.list_owners_for_group(group_id)
+        except BaseException:
+            members.cancel()
+            await asyncio.gather(members, return_exceptions=True)
+            raise
+        return await members, owners
+
+    async def _reconcile(group: Group, fetched: tuple[list[User] | None, list[User] | None] | Exception) -> None:
+        if isinstance(fetched, Exception):
+            if not include_ownerships:
+                listing = "members"
+            else:
+                listing = "members and owners" if group.id in member_group_ids else "owners"
+            _log_group_fetch_error(group, fetched, listing, stage.lower())
+            return
+        members, owners = fetched
+
+        try:
+            is_managed = managed_groups.is_managed(group)
+
+            act_authoritatively = act_as_authority and is_managed
+
+            logger.info(f"Syncing group {group.id}. act_authoritatively: {act_authoritatively}")
+
+            if await _reconcile_group_okta_lists(
+                group,
+                members,
+                owners,
+                stream_members=group.id in streamed_member_group_ids,
+                is_managed=is_managed,
+                act_authoritatively=act_authoritatively,
+                write_concurrency=write_concurrency,
+            ):
+                await _checkpoint_sync_run(run_name, group.id)
 
             await db.session.commit()
         except OktaTransientError:
-            logger.warning(f"Transient Okta error syncing memberships for group {group.id}, skipping.", exc_info=True)
+            logger.warning(f"Transient Okta error syncing {synced} for group {group.id}, skipping.", exc_info=True)
             await db.session.rollback()
-            continue
+            _count_skipped_group()
         except Exception:
-            logger.exception(f"Failed to sync memberships for group {group.id}, skipping.")
+            logger.exception(f"Failed to sync {synced} for group {group.id}, skipping.")
             await db.session.rollback()
-            continue
 
-    logger.info("Membership sync finished.")
+    await _reconcile_in_lanes(
+        _prefetch_group_okta_lists(groups, _fetch, concurrency, member_list_sizes), _reconcile, reconcile_lanes
+    )
+
+    # The pass is done: drop its checkpoints in the same commit that records it
+    await _clear_sync_run(run_name)
+    _record_sync_state(state, state_name, started_at, full)
+    await db.session.commit()
+
+    logger.info(f"{stage} sync finished.")
 
 
 async def sync_group_ownerships(
     act_as_authority: bool,
     groups: list[Group] | None = None,
-    group_ids_with_group_rules: _GroupRulesByGroupId | None = None,
+    managed_groups: ManagedGroupIndex | None = None,
     *,
     concurrency: int,
+    write_concurrency: int = 10,
+    reconcile_lanes: int = 1,
+    shard: GroupShard | None = None,
 ) -> None:
-    logger.info("Ownership sync started.")
+    logger.info("Ownership sync started." if shard is None else f"Ownership sync started for shard {shard}.")
     if groups is None:
         groups = await okta.list_groups()
+    if shard is not None:
+        groups = shard.filter(groups)
 
-    if group_ids_with_group_rules is None:
-        group_ids_with_group_rules = await okta.list_groups_with_active_rules()
+    if managed_groups is None:
+        managed_groups = await load_managed_group_index()
 
-    async for group, owners in _prefetch_group_okta_lists(groups, okta.list_owners_for_group, concurrency):
-        if isinstance(owners, OktaTransientError):
-            logger.warning(f"Transient Okta error listing owners for group {group.id}, skipping.", exc_info=owners)
-            continue
-        if isinstance(owners, OktaResourceNotFoundError):
-            logger.warning(
-                f"Group {group.id} no longer exists in Okta (deleted after this run's group "
-                f"snapshot was taken), skipping ownership sync."
-            )
-            continue
+    async def _reconcile(group: Group, owners: list[User] | Exception) -> None:
         if isinstance(owners, Exception):
-            logger.error(f"Failed to list owners for group {group.id}, skipping.", exc_info=owners)
-            continue
+            _log_group_fetch_error(group, owners, "owners", "ownership")
+            return
 
         try:
-            is_managed = is_managed_group(group, group_ids_with_group_rules)
+            is_managed = managed_groups.is_managed(group)
 
             act_authoritatively = act_as_authority and is_managed
 
             logger.info(f"Syncing group {group.id}. act_authoritatively: {act_authoritatively}")
 
-            db_all_group_owners = {
-                row.id: row.user_id
-                for row in await db.session.execute(
-                    select(
-                        OktaUserGroupMember.user_id,
-                        OktaUserGroupMember.id,
-                    ).where(
-                        OktaUserGroupMember.group_id == group.id,
-                        OktaUserGroupMember.is_owner.is_(True),
-                        or_(
-                            OktaUserGroupMember.ended_at.is_(None),
-                            OktaUserGroupMember.ended_at > func.now(),
-                        ),
-                    )
-                )
-            }
-
-            # If the group ownership is managed by Access and there are no owners for it
-            # check to see if it's an AppGroup and if so, add the app owners as owners in Okta
-            if act_authoritatively and len(db_all_group_owners) == 0:
-                app_group = (
-                    await db.session.scalars(
-                        select(AppGroup)
-                        .options(
-                            joinedload(AppGroup.app).options(selectinload(App.active_owner_app_groups)),
-                        )
-                        .where(AppGroup.deleted_at.is_(None))
-                        .where(AppGroup.id == group.id)
-                    )
-                ).first()
-
-                if app_group is not None and not app_group.is_owner:
-                    app_owner_group_ids = [g.id for g in app_group.app.active_owner_app_groups]
-                    db_all_group_owners = {
-                        row.id: row.user_id
-                        for row in await db.session.execute(
-                            select(
-                                OktaUserGroupMember.user_id,
-                                OktaUserGroupMember.id,
-                            ).where(
-                                OktaUserGroupMember.group_id.in_(app_owner_group_ids),
-                                OktaUserGroupMember.is_owner.is_(True),
-                                or_(
-                                    OktaUserGroupMember.ended_at.is_(None),
-                                    OktaUserGroupMember.ended_at > func.now(),
-                                ),
-                            )
-                        )
-                    }
-
-            for owner in owners:
-                # User is a owner in okta but not in the DB
-                if owner.id not in db_all_group_owners.values():
-                    logger.info(f"User {owner.id} is not in the group in our DB.")
-
-                    if act_authoritatively:
-                        await okta.remove_owner_from_group(group.id, owner.id)
-                    else:
-                        reason = (
-                            "User in Okta group but not in Access group."
-                            if is_managed
-                            else "User was added via Okta group rule."
-                        )
-                        await ModifyGroupUsers(
-                            group=group.id,
-                            owners_to_add=[owner.id],
-                            created_reason=reason,
-                        ).execute()
-
-                # User is a owner in okta and an entry exists in our DB
-                else:
-                    db_all_group_owners = {k: v for k, v in db_all_group_owners.items() if v != owner.id}
-
-            # All remaining values are ownerships that are marked active in our DB
-            # But are not valid ownerships in okta
-            if db_all_group_owners:
-                logger.info(
-                    f"Users were marked as owners in the DB but not in okta. Updating. User IDs: {db_all_group_owners}"
-                )
-
-                distinct_owner_ids = set(db_all_group_owners.values())
-                if act_authoritatively:
-                    # Create in okta
-                    for owner_id in distinct_owner_ids:
-                        await okta.add_owner_to_group(group.id, owner_id)
-                else:
-                    # Remove the direct group ownerships to this group in our DB
-                    # This will not affect group ownerships that are via other group roles
-                    await ModifyGroupUsers(group=group.id, owners_to_remove=list(distinct_owner_ids)).execute()
+            await _reconcile_group_owners(group, owners, is_managed, act_authoritatively, write_concurrency)
 
             await db.session.commit()
         except OktaTransientError:
             logger.warning(f"Transient Okta error syncing ownerships for group {group.id}, skipping.", exc_info=True)
             await db.session.rollback()
-            continue
+            _count_skipped_group()
         except Exception:
             logger.exception(f"Failed to sync ownerships for group {group.id}, skipping.")
             await db.session.rollback()
-            continue
+
+    await _reconcile_in_lanes(
+        _prefetch_group_okta_lists(groups, okta.list_owners_for_group, concurrency), _reconcile, reconcile_lanes
+    )
 
     logger.info("Ownership sync finished.")
 
 
+async def resolve_group_id(group_ref: str) -> str | None:
+    """The id of the group in the DB with ``group_ref`` as its id or name, if any.
+
+    An active group is preferred over a deleted one, then the most recently
+    deleted one.
+    """
+    return (
+        await db.session.scalars(
+            select(OktaGroup.id)
+            .where(or_(OktaGroup.id == group_ref, OktaGroup.name == group_ref))
+            .order_by(nullsfirst(OktaGroup.deleted_at.desc()))
+        )
+    ).first()
+
+
+async def sync_group(
+    group_id: str,
+    *,
+    sync_groups_authoritatively: bool = False,
+    sync_group_memberships_authoritatively: bool = False,
+    managed_groups: ManagedGroupIndex | None = None,
+    write_concurrency: int = 10,
+) -> GroupSyncDiff:
+    """Sync one Okta group, then its memberships and ownerships, with the DB, returning what changed.
+
+    Does for the one group what ``sync_groups`` and ``sync_group_memberships``
+    with ``include_ownerships`` do for every group, acting as the authority as
+    those would with ``act_as_authority`` set to the matching flag. Ownerships
+    are only synced with ``OKTA_USE_GROUP_OWNERS_API``, as in ``access sync``.
+    A group deleted from Okta is deleted locally.
+    """
+    if managed_groups is None:
+        managed_groups = await load_managed_group_index()
+
+    diff = GroupSyncDiff(group_id=group_id)
+    token = _group_sync_diff.set(diff)
+    try:
+        try:
+            group = await okta.get_group(group_id)
+        except OktaResourceNotFoundError:
+            db_group = await db.session.get(OktaGroup, group_id)
+            if db_group is not None and db_group.deleted_at is None:
+                logger.info(f"Group {group_id} exists locally but not in Okta. Deleting locally.")
+                await DeleteGroup(group=group_id, sync_to_okta=False).execute()
+                await db.session.commit()
+                diff.group_changed = diff.group_deleted = True
+            return diff
+
+        diff.group_changed = await _sync_okta_group(group, sync_groups_authoritatively, managed_groups)
+        await db.session.commit()
+        db_group = await db.session.get(OktaGroup, group_id)
+        if db_group is None or db_group.deleted_at is not None:
+            diff.group_deleted = diff.group_changed
+            return diff
+
+        is_managed = managed_groups.is_managed(group)
+        act_authoritatively = sync_group_memberships_authoritatively and is_managed
+        logger.info(f"Syncing group {group.id}. act_authoritatively: {act_authoritatively}")
+
+        member_count = (await _active_member_counts({group.id})).get(group.id, 0)
+        stream_members = member_count >= settings.SYNC_STREAMING_RECONCILE_MIN_MEMBERS
+        members = None if stream_members else await okta.list_users_for_group(group.id)
+        # Without the group owners API Okta lists no owners, which would read as
+        # every ownership having been removed in Okta
+        owners = await okta.list_owners_for_group(group.id) if settings.OKTA_USE_GROUP_OWNERS_API else None
+        await _reconcile_group_okta_lists(
+            group,
+            members,
+            owners,
+            stream_members=stream_members,
+            is_managed=is_managed,
+            act_authoritatively=act_authoritatively,
+            write_concurrency=write_concurrency,
+        )
+        await db.session.commit()
+        return diff
+    finally:
+        _group_sync_diff.reset(token)
+
+
 async def expire_access_requests() -> None:
     logger.info("Access request expiration started.")
     MAX_ACCESS_REQUEST_AGE_SECONDS = settings.MAX_ACCESS_REQUEST_AGE_SECONDS
 
-    older_than_max = (
+    # Requests older than the maximum age, or whose requested access would already have ended
+    expired_access_request_ids = (
         await db.session.scalars(
-            select(AccessRequest)
+            select(AccessRequest.id)
             .where(AccessRequest.status == AccessRequestStatus.PENDING)
             .where(AccessRequest.resolved_at.is_(None))
             .where(
-                AccessRequest.created_at
-                < datetime.now(timezone.utc) - timedelta(seconds=MAX_ACCESS_REQUEST_AGE_SECONDS)
+                or_(
+                    AccessRequest.created_at
+                    < datetime.now(timezone.utc) - timedelta(seconds=MAX_ACCESS_REQUEST_AGE_SECONDS),
+                    AccessRequest.request_ending_at < func.now(),
+                )
             )
+            .order_by(AccessRequest.created_at)
         )
     ).all()
-    for access_request in older_than_max:
-        await RejectAccessRequest(
-            access_request=access_request,
-            rejection_reason="Closed because the request expired",
-        ).execute()
+    expired = await RejectAccessRequests(
+        access_requests=expired_access_request_ids,
+        rejection_reason="Closed because the request expired",
+    ).execute()
+    _count_sync_stage_rows(updated=len(expired))
 
-    older_than_request = (
-        await db.session.scalars(
-            select(AccessRequest)
-            .where(AccessRequest.status == AccessRequestStatus.PENDING)
-            .where(AccessRequest.resolved_at.is_(None))
-            .where(AccessRequest.request_ending_at < func.now())
-        )
-    ).all()
-    for access_request in older_than_request:
-        await RejectAccessRequest(
-            access_request=access_request,
-            rejection_reason="Closed because the request expired",
-        ).execute()
+    logger.info(f"Access request expiration finished: {len(expired)} expired.")
 
-    logger.info("Access request expiration finished.")
 
-
-async def expiring_access_notifications_user() -> None:
+async def expiring_access_notifications_user(concurrency: int = 10) -> NotificationDispatchSummary:
     logger.info("Expiring access notifications for users started.")
 
     weekend_notif_tomorrow = False
@@ -629,39 +1917,48 @@ async def expiring_access_notifications_user() -> None:
     for membership in db_memberships_expiring_next_week:
         grouped_next_week.setdefault(membership.active_user, []).append(membership)
 
+    notifications: list[dict[str, Any]] = []
     for user in grouped_tomorrow:
         # If the user has access expiring both tomorrow and in a week, only send one message
         if user in grouped_next_week:
-            # Notification hooks are native async now: awaited directly on the event
-            # loop, so the ORM objects they read stay on this AsyncSession without any
-            # run_sync/worker-thread bridge.
-            await send_notification(
-                NotificationHook.ACCESS_EXPIRING_USER,
-                user=user,
-                expiration_datetime=None,
-                okta_user_group_members=grouped_tomorrow[user] + grouped_next_week[user],
+            notifications.append(
+                dict(
+                    user=user,
+                    expiration_datetime=None,
+                    okta_user_group_members=grouped_tomorrow[user] + grouped_next_week[user],
+                )
             )
         else:
-            await send_notification(
-                NotificationHook.ACCESS_EXPIRING_USER,
-                user=user,
-                expiration_datetime=None if weekend_notif_tomorrow else datetime.now() + timedelta(days=1),
-                okta_user_group_members=grouped_tomorrow[user],
+            notifications.append(
+                dict(
+                    user=user,
+                    expiration_datetime=None if weekend_notif_tomorrow else datetime.now() + timedelta(days=1),
+                    okta_user_group_members=grouped_tomorrow[user],
+                )
             )
 
     for user in grouped_next_week:
         if user not in grouped_tomorrow:
-            await send_notification(
-                NotificationHook.ACCESS_EXPIRING_USER,
-                user=user,
-                expiration_datetime=None if weekend_notif_week else datetime.now() + timedelta(weeks=1),
-                okta_user_group_members=grouped_next_week[user],
+            notifications.append(
+                dict(
+                    user=user,
+                    expiration_datetime=None if weekend_notif_week else datetime.now() + timedelta(weeks=1),
+                    okta_user_group_members=grouped_next_week[user],
+                )
             )
 
-    logger.info("Expiring access notifications for users finished.")
+    # Notification hooks are native async: awaited on the event loop, so the ORM
+    # objects they read stay on this AsyncSession without any run_sync/worker-thread
+    # bridge. Everything they read is loaded above, so they can be sent concurrently.
+    summary = await send_notifications(NotificationHook.ACCESS_EXPIRING_USER, notifications, concurrency=concurrency)
+    logger.info(
+        f"Expiring access notifications for users finished: {summary.sent} sent, {summary.failed} failed "
+        f"in {summary.duration_seconds:.1f}s."
+    )
+    return summary
 
 
-async def expiring_access_notifications_owner() -> None:
+async def expiring_access_notifications_owner(concurrency: int = 10) -> NotificationDispatchSummary:
     logger.info("Expiring access notifications for owners started.")
 
     day = date.today()
@@ -689,27 +1986,6 @@ async def expiring_access_notifications_owner() -> None:
         )
     ).all()
 
-    access_owners = await get_access_owners()
-
-    # Map of group owners -> list[OktaUserGroupMember]
-    owner_expiring_groups_this: defaultdict[OktaUser, list[OktaUserGroupMember]] = defaultdict(list)
-    for okta_user_group_member in db_memberships_expiring_this_week:
-        owners = await get_group_managers(okta_user_group_member.group_id)
-
-        if len(owners) == 0:
-            owners += (
-                (await get_app_managers(okta_user_group_member.group.app_id))
-                if type(okta_user_group_member.group) is AppGroup
-                else []
-            )
-
-        if len(owners) == 0:
-            owners = access_owners
-
-        for owner in owners:
-            if owner.id != okta_user_group_member.user_id:
-                owner_expiring_groups_this[owner].append(okta_user_group_member)
-
     one_week = date.today() + timedelta(weeks=1)
     two_weeks = one_week + timedelta(weeks=1)
 
@@ -729,63 +2005,9 @@ async def expiring_access_notifications_owner() -> None:
         )
     ).all()
 
-    # Map of group owners -> list[OktaUserGroupMember]
-    owner_expiring_groups_next: defaultdict[OktaUser, list[OktaUserGroupMember]] = defaultdict(list)
-    for okta_user_group_member in db_memberships_expiring_next_week:
-        owners = await get_group_managers(okta_user_group_member.group_id)
-
-        if len(owners) == 0:
-            owners += (
-                (await get_app_managers(okta_user_group_member.group.app_id))
-                if type(okta_user_group_member.group) is AppGroup
-                else []
-            )
-
-        if len(owners) == 0:
-            owners = access_owners
-
-        for owner in owners:
-            if owner.id != okta_user_group_member.user_id:
-                owner_expiring_groups_next[owner].append(okta_user_group_member)
-
-    for owner in owner_expiring_groups_this:
-        # If the owner has members with access expiring both this week and next week, only send one message
-        if owner in owner_expiring_groups_next:
-            # Notification hooks are native async now: awaited directly on the event
-            # loop, so the ORM objects they read stay on this AsyncSession without any
-            # run_sync/worker-thread bridge.
-            await send_notification(
-                NotificationHook.ACCESS_EXPIRING_OWNER,
-                owner=owner,
-                expiration_datetime=None,
-                group_user_associations=owner_expiring_groups_this[owner] + owner_expiring_groups_next[owner],
-                role_group_associations=None,
-            )
-        else:
-            await send_notification(
-                NotificationHook.ACCESS_EXPIRING_OWNER,
-                owner=owner,
-                expiration_datetime=datetime.now(),
-                group_user_associations=owner_expiring_groups_this[owner],
-                role_group_associations=None,
-            )
-
-    for owner in owner_expiring_groups_next:
-        if owner not in owner_expiring_groups_this:
-            await send_notification(
-                NotificationHook.ACCESS_EXPIRING_OWNER,
-                owner=owner,
-                expiration_datetime=datetime.now() + timedelta(weeks=1),
-                group_user_associations=owner_expiring_groups_next[owner],
-                role_group_associations=None,
-            )
-
     role_group_alias = aliased(RoleGroup)
 
     # Expiring roles
-    day = date.today()
-    next_week = day + timedelta(weeks=1)
-
     db_roles_expiring_this_week = (
         await db.session.scalars(
             select(RoleGroupMap)
@@ -801,25 +2023,6 @@ async def expiring_access_notifications_owner() -> None:
         )
     ).all()
 
-    # Map of group owners -> list[RoleGroupMap]
-    owner_expiring_roles_this: defaultdict[OktaUser, list[RoleGroupMap]] = defaultdict(list)
-    for role_group_map in db_roles_expiring_this_week:
-        owners = await get_group_managers(role_group_map.group_id)
-
-        if len(owners) == 0:
-            owners += (
-                (await get_app_managers(role_group_map.group.app_id)) if type(role_group_map.group) is AppGroup else []
-            )
-
-        if len(owners) == 0:
-            owners = access_owners
-
-        for owner in owners:
-            owner_expiring_roles_this[owner].append(role_group_map)
-
-    one_week = date.today() + timedelta(weeks=1)
-    two_weeks = one_week + timedelta(weeks=1)
-
     db_roles_expiring_next_week = (
         await db.session.scalars(
             select(RoleGroupMap)
@@ -835,59 +2038,123 @@ async def expiring_access_notifications_owner() -> None:
         )
     ).all()
 
-    # Map of group owners -> list[RoleGroupMap]
-    owner_expiring_roles_next: defaultdict[OktaUser, list[RoleGroupMap]] = defaultdict(list)
-    for role_group_map in db_roles_expiring_next_week:
-        owners = await get_group_managers(role_group_map.group_id)
+    # Resolve the owners of every group with expiring access at once, rather
+    # than with a few queries per expiring membership or role
+    managers_by_group_id = await get_group_managers_with_fallbacks(
+        {
+            access.group_id
+            for access in chain(
+                db_memberships_expiring_this_week,
+                db_memberships_expiring_next_week,
+                db_roles_expiring_this_week,
+                db_roles_expiring_next_week,
+            )
+        }
+    )
+
+    # Map of group owners -> list[OktaUserGroupMember]
+    owner_expiring_groups_this: defaultdict[OktaUser, list[OktaUserGroupMember]] = defaultdict(list)
+    for okta_user_group_member in db_memberships_expiring_this_week:
+        for owner in managers_by_group_id.get(okta_user_group_member.group_id, []):
+            if owner.id != okta_user_group_member.user_id:
+                owner_expiring_groups_this[owner].append(okta_user_group_member)
 
-        if len(owners) == 0:
-            owners += (
-                (await get_app_managers(role_group_map.group.app_id)) if type(role_group_map.group) is AppGroup else []
+    # Map of group owners -> list[OktaUserGroupMember]
+    owner_expiring_groups_next: defaultdict[OktaUser, list[OktaUserGroupMember]] = defaultdict(list)
+    for okta_user_group_member in db_memberships_expiring_next_week:
+        for owner in managers_by_group_id.get(okta_user_group_member.group_id, []):
+            if owner.id != okta_user_group_member.user_id:
+                owner_expiring_groups_next[owner].append(okta_user_group_member)
+
+    notifications: list[dict[str, Any]] = []
+    for owner in owner_expiring_groups_this:
+        # If the owner has members with access expiring both this week and next week, only send one message
+        if owner in owner_expiring_groups_next:
+            notifications.append(
+                dict(
+                    owner=owner,
+                    expiration_datetime=None,
+                    group_user_associations=owner_expiring_groups_this[owner] + owner_expiring_groups_next[owner],
+                    role_group_associations=None,
+                )
+            )
+        else:
+            notifications.append(
+                dict(
+                    owner=owner,
+                    expiration_datetime=datetime.now(),
+                    group_user_associations=owner_expiring_groups_this[owner],
+                    role_group_associations=None,
+                )
             )
 
-        if len(owners) == 0:
-            owners = access_owners
+    for owner in owner_expiring_groups_next:
+        if owner not in owner_expiring_groups_this:
+            notifications.append(
+                dict(
+                    owner=owner,
+                    expiration_datetime=datetime.now() + timedelta(weeks=1),
+                    group_user_associations=owner_expiring_groups_next[owner],
+                    role_group_associations=None,
+                )
+            )
+
+    # Map of group owners -> list[RoleGroupMap]
+    owner_expiring_roles_this: defaultdict[OktaUser, list[RoleGroupMap]] = defaultdict(list)
+    for role_group_map in db_roles_expiring_this_week:
+        for owner in managers_by_group_id.get(role_group_map.group_id, []):
+            owner_expiring_roles_this[owner].append(role_group_map)
 
-        for owner in owners:
+    # Map of group owners -> list[RoleGroupMap]
+    owner_expiring_roles_next: defaultdict[OktaUser, list[RoleGroupMap]] = defaultdict(list)
+    for role_group_map in db_roles_expiring_next_week:
+        for owner in managers_by_group_id.get(role_group_map.group_id, []):
             owner_expiring_roles_next[owner].append(role_group_map)
 
     for owner in owner_expiring_roles_this:
         # If the owner has members with access expiring both this week and next week, only send one message
         if owner in owner_expiring_roles_next:
-            await send_notification(
-                NotificationHook.ACCESS_EXPIRING_OWNER,
-                owner=owner,
-                expiration_datetime=None,
-                group_user_associations=None,
-                role_group_associations=owner_expiring_roles_this[owner] + owner_expiring_roles_next[owner],
+            notifications.append(
+                dict(
+                    owner=owner,
+                    expiration_datetime=None,
+                    group_user_associations=None,
+                    role_group_associations=owner_expiring_roles_this[owner] + owner_expiring_roles_next[owner],
+                )
             )
         else:
-            await send_notification(
-                NotificationHook.ACCESS_EXPIRING_OWNER,
-                owner=owner,
-                expiration_datetime=datetime.now(),
-                group_user_associations=None,
-                role_group_associations=owner_expiring_roles_this[owner],
+            notifications.append(
+                dict(
+                    owner=owner,
+                    expiration_datetime=datetime.now(),
+                    group_user_associations=None,
+                    role_group_associations=owner_expiring_roles_this[owner],
+                )
             )
 
     for owner in owner_expiring_roles_next:
         if owner not in owner_expiring_roles_this:
-            await send_notification(
-                NotificationHook.ACCESS_EXPIRING_OWNER,
-                owner=owner,
-                expiration_datetime=datetime.now() + timedelta(weeks=1),
-                group_user_associations=None,
-                role_group_associations=owner_expiring_roles_next[owner],
+            notifications.append(
+                dict(
+                    owner=owner,
+                    expiration_datetime=datetime.now() + timedelta(weeks=1),
+                    group_user_associations=None,
+                    role_group_associations=owner_expiring_roles_next[owner],
+                )
             )
 
-    logger.info("Expiring access notifications for owners finished.")
+    # Everything the hooks read is loaded above, so they can be sent concurrently
+    summary = await send_notifications(NotificationHook.ACCESS_EXPIRING_OWNER, notifications, concurrency=concurrency)
+    logger.info(
+        f"Expiring access notifications for owners finished: {summary.sent} sent, {summary.failed} failed "
+        f"in {summary.duration_seconds:.1f}s."
+    )
+    return summary
 
 
-async def expiring_access_notifications_role_owner() -> None:
+async def expiring_access_notifications_role_owner(concurrency: int = 10) -> NotificationDispatchSummary:
     logger.info("Expiring access notifications for role owners started.")
 
-    access_owners = await get_access_owners()
-
     all_group_types = with_polymorphic(OktaGroup, [AppGroup, RoleGroup], flat=True)
     role_group_alias = aliased(RoleGroup)
 
@@ -913,17 +2180,6 @@ async def expiring_access_notifications_role_owner() -> None:
         )
     ).all()
 
-    # Map of role owners -> list[RoleGroupMap]
-    role_owner_expiring_roles_tomorrow: defaultdict[OktaUser, list[RoleGroupMap]] = defaultdict(list)
-    for role_group_map in db_roles_expiring_tomorrow:
-        owners = await get_group_managers(role_group_map.role_group.id)
-
-        if len(owners) == 0:
-            owners = access_owners
-
-        for owner in owners:
-            role_owner_expiring_roles_tomorrow[owner].append(role_group_map)
-
     weekend_notif_week = False
     day = date.today() + timedelta(weeks=1)
     next_day = day + timedelta(days=1)
@@ -946,44 +2202,63 @@ async def expiring_access_notifications_role_owner() -> None:
         )
     ).all()
 
+    # Resolve the owners of every role with expiring access at once. A role
+    # group isn't an app group, so its owners fall back to the Access owners.
+    managers_by_role_group_id = await get_group_managers_with_fallbacks(
+        {
+            role_group_map.role_group_id
+            for role_group_map in chain(db_roles_expiring_tomorrow, db_roles_expiring_next_week)
+        }
+    )
+
+    # Map of role owners -> list[RoleGroupMap]
+    role_owner_expiring_roles_tomorrow: defaultdict[OktaUser, list[RoleGroupMap]] = defaultdict(list)
+    for role_group_map in db_roles_expiring_tomorrow:
+        for owner in managers_by_role_group_id.get(role_group_map.role_group_id, []):
+            role_owner_expiring_roles_tomorrow[owner].append(role_group_map)
+
     # Map of role owners -> list[RoleGroupMap]
     role_owner_expiring_roles_next: defaultdict[OktaUser, list[RoleGroupMap]] = defaultdict(list)
     for role_group_map in db_roles_expiring_next_week:
-        owners = await get_group_managers(role_group_map.role_group.id)
-
-        if len(owners) == 0:
-            owners = access_owners
-
-        for owner in owners:
+        for owner in managers_by_role_group_id.get(role_group_map.role_group_id, []):
             role_owner_expiring_roles_next[owner].append(role_group_map)
 
+    notifications: list[dict[str, Any]] = []
     for owner in role_owner_expiring_roles_tomorrow:
         # If the role owner has roles they own with access expiring both this week and next week, only send one message
         if owner in role_owner_expiring_roles_next:
-            # Notification hooks are native async now: awaited directly on the event
-            # loop, so the ORM objects they read stay on this AsyncSession without any
-            # run_sync/worker-thread bridge.
-            await send_notification(
-                NotificationHook.ACCESS_EXPIRING_ROLE_OWNER,
-                owner=owner,
-                roles=role_owner_expiring_roles_tomorrow[owner] + role_owner_expiring_roles_next[owner],
-                expiration_datetime=None,
+            notifications.append(
+                dict(
+                    owner=owner,
+                    roles=role_owner_expiring_roles_tomorrow[owner] + role_owner_expiring_roles_next[owner],
+                    expiration_datetime=None,
+                )
             )
         else:
-            await send_notification(
-                NotificationHook.ACCESS_EXPIRING_ROLE_OWNER,
-                owner=owner,
-                roles=role_owner_expiring_roles_tomorrow[owner],
-                expiration_datetime=None if weekend_notif_tomorrow else datetime.now() + timedelta(days=1),
+            notifications.append(
+                dict(
+                    owner=owner,
+                    roles=role_owner_expiring_roles_tomorrow[owner],
+                    expiration_datetime=None if weekend_notif_tomorrow else datetime.now() + timedelta(days=1),
+                )
             )
 
     for owner in role_owner_expiring_roles_next:
         if owner not in role_owner_expiring_roles_tomorrow:
-            await send_notification(
-                NotificationHook.ACCESS_EXPIRING_ROLE_OWNER,
-                owner=owner,
-                roles=role_owner_expiring_roles_next[owner],
-                expiration_datetime=None if weekend_notif_week else datetime.now() + timedelta(weeks=1),
+            notifications.append(
+                dict(
+                    owner=owner,
+                    roles=role_owner_expiring_roles_next[owner],
+                    expiration_datetime=None if weekend_notif_week else datetime.now() + timedelta(weeks=1),
+                )
             )
 
-    logger.info("Expiring access notifications for role owners finished.")
+    # Everything the hooks read is loaded above, so they can be sent concurrently
+    summary = await send_notifications(
+        NotificationHook.ACCESS_EXPIRING_ROLE_OWNER, notifications, concurrency=concurrency
+    )
+    logger.info(
+        f"Expiring access notifications for role owners finished: {summary.sent} sent, {summary.failed} failed "
+        f"in {summary.duration_seconds:.1f}s."
+    )
+    return summary
@@ -0,0 +1,32 @@
+"""sync state
+
+Revision ID: 4b7e2c91d0a3
+Revises: c8f9ba49f867
+Create Date: 2026-10-16 09:12:44.518203
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4b7e2c91d0a3"
+down_revision = "c8f9ba49f867"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_state",
+        sa.Column("name", sa.Unicode(length=50), nullable=False),
+        sa.Column("watermark", sa.DateTime(), nullable=True),
+        sa.Column("last_full_sync_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("name", name=op.f("pk_sync_state")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sync_state")
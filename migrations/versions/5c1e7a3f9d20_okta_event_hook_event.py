@@ -0,0 +1,39 @@
+"""okta event hook event
+
+Revision ID: 5c1e7a3f9d20
+Revises: 9b2f6c1d8e47
+Create Date: 2026-10-18 10:12:45.603318
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5c1e7a3f9d20"
+down_revision = "9b2f6c1d8e47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "okta_event_hook_event",
+        sa.Column("id", sa.Unicode(length=50), nullable=False),
+        sa.Column("event_type", sa.Unicode(length=255), nullable=False),
+        sa.Column("group_id", sa.Unicode(length=50), nullable=True),
+        sa.Column("user_id", sa.Unicode(length=50), nullable=True),
+        sa.Column("published_at", sa.DateTime(), nullable=True),
+        sa.Column("received_at", sa.DateTime(), nullable=False),
+        sa.Column("claimed_at", sa.DateTime(), nullable=True),
+        sa.Column("claimed_by", sa.Unicode(length=36), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_okta_event_hook_event")),
+    )
+    op.create_index("idx_okta_event_hook_event_received_at", "okta_event_hook_event", ["received_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_okta_event_hook_event_received_at", table_name="okta_event_hook_event")
+    op.drop_table("okta_event_hook_event")
@@ -0,0 +1,27 @@
+"""group membership sync markers
+
+Revision ID: 5f1a8c3e7b26
+Revises: 9e3d51a7c2f4
+Create Date: 2026-10-16 14:05:37.804119
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5f1a8c3e7b26"
+down_revision = "9e3d51a7c2f4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("okta_group", sa.Column("okta_last_membership_updated", sa.DateTime(), nullable=True))
+    op.add_column("okta_group", sa.Column("memberships_synced_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("okta_group", "memberships_synced_at")
+    op.drop_column("okta_group", "okta_last_membership_updated")
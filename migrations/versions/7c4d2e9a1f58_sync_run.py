@@ -0,0 +1,42 @@
+"""sync run
+
+Revision ID: 7c4d2e9a1f58
+Revises: 5f1a8c3e7b26
+Create Date: 2026-10-16 22:31:08.274915
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7c4d2e9a1f58"
+down_revision = "5f1a8c3e7b26"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_run",
+        sa.Column("stage", sa.Unicode(length=50), nullable=False),
+        sa.Column("snapshot_at", sa.DateTime(), nullable=False),
+        sa.Column("full", sa.Boolean(), nullable=False),
+        sa.Column("groups_total", sa.Integer(), nullable=False),
+        sa.Column("groups_completed", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("stage", name=op.f("pk_sync_run")),
+    )
+    op.create_table(
+        "sync_run_group",
+        sa.Column("stage", sa.Unicode(length=50), nullable=False),
+        sa.Column("group_id", sa.Unicode(length=50), nullable=False),
+        sa.ForeignKeyConstraint(["stage"], ["sync_run.stage"], name=op.f("fk_sync_run_group_stage_sync_run")),
+        sa.PrimaryKeyConstraint("stage", "group_id", name=op.f("pk_sync_run_group")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sync_run_group")
+    op.drop_table("sync_run")
@@ -0,0 +1,45 @@
+"""sync ledger entry
+
+Revision ID: 9b2f6c1d8e47
+Revises: 7c4d2e9a1f58
+Create Date: 2026-10-17 09:41:08.227514
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "9b2f6c1d8e47"
+down_revision = "7c4d2e9a1f58"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_ledger_entry",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), autoincrement=True, nullable=False),
+        sa.Column("run_id", sa.Unicode(length=36), nullable=False),
+        sa.Column("stage", sa.Unicode(length=50), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("duration_seconds", sa.Float(), nullable=False),
+        sa.Column("succeeded", sa.Boolean(), nullable=False),
+        sa.Column(
+            "okta_calls", sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), "postgresql"), nullable=False
+        ),
+        sa.Column("rows_inserted", sa.Integer(), nullable=False),
+        sa.Column("rows_updated", sa.Integer(), nullable=False),
+        sa.Column("rows_ended", sa.Integer(), nullable=False),
+        sa.Column("groups_skipped", sa.Integer(), nullable=False),
+        sa.Column("peak_fetch_window", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_sync_ledger_entry")),
+    )
+    op.create_index("idx_sync_ledger_entry_started_at", "sync_ledger_entry", ["started_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_sync_ledger_entry_started_at", table_name="sync_ledger_entry")
+    op.drop_table("sync_ledger_entry")
@@ -0,0 +1,27 @@
+"""okta profile hash
+
+Revision ID: 9e3d51a7c2f4
+Revises: 4b7e2c91d0a3
+Create Date: 2026-10-16 11:40:03.271954
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9e3d51a7c2f4"
+down_revision = "4b7e2c91d0a3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("okta_user", sa.Column("okta_profile_hash", sa.Unicode(length=64), nullable=True))
+    op.add_column("okta_group", sa.Column("okta_profile_hash", sa.Unicode(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("okta_group", "okta_profile_hash")
+    op.drop_column("okta_user", "okta_profile_hash")
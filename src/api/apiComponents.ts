@@ -1626,6 +1626,50 @@ export const useGroupAuditById = <TData = void>(
   });
 };
 
+export type GroupResyncByIdPathParams = {
+  groupId: string;
+};
+
+export type GroupResyncByIdError = Fetcher.ErrorWrapper<{
+  status: Exclude<ClientErrorStatus | ServerErrorStatus, 200>;
+  payload: Schemas.ProblemDetail;
+}>;
+
+export type GroupResyncByIdRequestBody = Schemas.GroupResyncBody | null;
+
+export type GroupResyncByIdVariables = {
+  body?: GroupResyncByIdRequestBody;
+  pathParams: GroupResyncByIdPathParams;
+} & ApiContext['fetcherOptions'];
+
+export const fetchGroupResyncById = (variables: GroupResyncByIdVariables, signal?: AbortSignal) =>
+  apiFetch<
+    Schemas.GroupResyncDiff,
+    GroupResyncByIdError,
+    GroupResyncByIdRequestBody,
+    {},
+    {},
+    GroupResyncByIdPathParams
+  >({
+    url: '/api/groups/{groupId}/resync',
+    method: 'post',
+    ...variables,
+    signal,
+  });
+
+export const useGroupResyncById = (
+  options?: Omit<
+    reactQuery.UseMutationOptions<Schemas.GroupResyncDiff, GroupResyncByIdError, GroupResyncByIdVariables>,
+    'mutationFn'
+  >,
+) => {
+  const {fetcherOptions} = useApiContext();
+  return reactQuery.useMutation<Schemas.GroupResyncDiff, GroupResyncByIdError, GroupResyncByIdVariables>({
+    mutationFn: (variables: GroupResyncByIdVariables) => fetchGroupResyncById(deepMerge(fetcherOptions, variables)),
+    ...options,
+  });
+};
+
 export type GroupMembersByIdPathParams = {
   groupId: string;
 };
@@ -3055,6 +3099,99 @@ export const useRoleMembersByIdPut = (
   });
 };
 
+export type SyncRunsQueryParams = {
+  /**
+   * Page number
+   *
+   * @minimum 1
+   * @default 1
+   */
+  page?: number;
+  /**
+   * Items per page
+   *
+   * @maximum 1000
+   * @minimum 1
+   * @default 50
+   */
+  size?: number;
+};
+
+export type SyncRunsError = Fetcher.ErrorWrapper<{
+  status: Exclude<ClientErrorStatus | ServerErrorStatus, 200>;
+  payload: Schemas.ProblemDetail;
+}>;
+
+export type SyncRunsVariables = {
+  queryParams?: SyncRunsQueryParams;
+} & ApiContext['fetcherOptions'];
+
+export const fetchSyncRuns = (variables: SyncRunsVariables, signal?: AbortSignal) =>
+  apiFetch<
+    Schemas.PageTypeVarCustomizedSyncLedgerEntryDetail,
+    SyncRunsError,
+    undefined,
+    {},
+    SyncRunsQueryParams,
+    {}
+  >({url: '/api/sync-runs', method: 'get', ...variables, signal});
+
+export function syncRunsQuery(variables: SyncRunsVariables): {
+  queryKey: reactQuery.QueryKey;
+  queryFn: (options: QueryFnOptions) => Promise<Schemas.PageTypeVarCustomizedSyncLedgerEntryDetail>;
+};
+
+export function syncRunsQuery(variables: SyncRunsVariables | reactQuery.SkipToken): {
+  queryKey: reactQuery.QueryKey;
+  queryFn:
+    | ((options: QueryFnOptions) => Promise<Schemas.PageTypeVarCustomizedSyncLedgerEntryDetail>)
+    | reactQuery.SkipToken;
+};
+
+export function syncRunsQuery(variables: SyncRunsVariables | reactQuery.SkipToken) {
+  return {
+    queryKey: queryKeyFn({
+      path: '/api/sync-runs',
+      operationId: 'syncRuns',
+      variables,
+    }),
+    queryFn:
+      variables === reactQuery.skipToken
+        ? reactQuery.skipToken
+        : ({signal}: QueryFnOptions) => fetchSyncRuns(variables, signal),
+  };
+}
+
+export const useSuspenseSyncRuns = <TData = Schemas.PageTypeVarCustomizedSyncLedgerEntryDetail>(
+  variables: SyncRunsVariables,
+  options?: Omit<
+    reactQuery.UseQueryOptions<Schemas.PageTypeVarCustomizedSyncLedgerEntryDetail, SyncRunsError, TData>,
+    'queryKey' | 'queryFn' | 'initialData'
+  >,
+) => {
+  const {queryOptions, fetcherOptions} = useApiContext(options);
+  return reactQuery.useSuspenseQuery<Schemas.PageTypeVarCustomizedSyncLedgerEntryDetail, SyncRunsError, TData>({
+    ...syncRunsQuery(deepMerge(fetcherOptions, variables)),
+    ...options,
+    ...queryOptions,
+  });
+};
+
+export const useSyncRuns = <TData = Schemas.PageTypeVarCustomizedSyncLedgerEntryDetail>(
+  variables: SyncRunsVariables | reactQuery.SkipToken,
+  options?: Omit<
+    reactQuery.UseQueryOptions<Schemas.PageTypeVarCustomizedSyncLedgerEntryDetail, SyncRunsError, TData>,
+    'queryKey' | 'queryFn' | 'initialData'
+  >,
+) => {
+  const {queryOptions, fetcherOptions} = useApiContext(options);
+  return reactQuery.useQuery<Schemas.PageTypeVarCustomizedSyncLedgerEntryDetail, SyncRunsError, TData>({
+    ...syncRunsQuery(variables === reactQuery.skipToken ? variables : deepMerge(fetcherOptions, variables)),
+    ...options,
+    ...queryOptions,
+  });
+};
+
 export type TagsQueryParams = {
   q?: string | null;
   /**
@@ -3678,6 +3815,11 @@ export type QueryOperation =
       operationId: 'roleMembersById';
       variables: RoleMembersByIdVariables | reactQuery.SkipToken;
     }
+  | {
+      path: '/api/sync-runs';
+      operationId: 'syncRuns';
+      variables: SyncRunsVariables | reactQuery.SkipToken;
+    }
   | {
       path: '/api/tags';
       operationId: 'tags';
@@ -529,6 +529,37 @@ export type GroupRequestDetail = {
   resolver?: OktaUserSummary | null;
 };
 
+/**
+ * Whether ``POST /api/groups/{id}/resync`` acts as the authority, as the ``access sync`` flags do.
+ */
+export type GroupResyncBody = {
+  /**
+   * @default false
+   */
+  sync_groups_authoritatively?: boolean;
+  /**
+   * @default false
+   */
+  sync_group_memberships_authoritatively?: boolean;
+};
+
+/**
+ * What ``POST /api/groups/{id}/resync`` changed, by user id, in Access and in Okta.
+ */
+export type GroupResyncDiff = {
+  group_id: string;
+  group_changed: boolean;
+  group_deleted: boolean;
+  members_added: string[];
+  members_removed: string[];
+  owners_added: string[];
+  owners_removed: string[];
+  okta_members_added: string[];
+  okta_members_removed: string[];
+  okta_owners_added: string[];
+  okta_owners_removed: string[];
+};
+
 export type GroupSummary =
   | (Omit<OktaGroupSummary, 'type'> & {
       type: 'okta_group';
@@ -902,6 +933,26 @@ export type PageTypeVarCustomizedRoleRequestSummary = {
   pages: number;
 };
 
+export type PageTypeVarCustomizedSyncLedgerEntryDetail = {
+  items: SyncLedgerEntryDetail[];
+  /**
+   * @minimum 0
+   */
+  total: number;
+  /**
+   * @minimum 1
+   */
+  page: number;
+  /**
+   * @minimum 1
+   */
+  size: number;
+  /**
+   * @minimum 0
+   */
+  pages: number;
+};
+
 export type PageTypeVarCustomizedTagListItem = {
   items: TagListItem[];
   /**
@@ -1424,6 +1475,26 @@ export type SearchUserQuery = {
   q?: string | null;
 };
 
+/**
+ * One stage of an ``access sync`` run, as recorded in the sync ledger.
+ */
+export type SyncLedgerEntryDetail = {
+  id: number;
+  run_id: string;
+  stage: string;
+  started_at: string | null;
+  duration_seconds: number;
+  succeeded: boolean;
+  okta_calls: {
+    [key: string]: number;
+  };
+  rows_inserted: number;
+  rows_updated: number;
+  rows_ended: number;
+  groups_skipped: number;
+  peak_fetch_window: number;
+};
+
 export type TagDetail = {
   id: string;
   name: string;
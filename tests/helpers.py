@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator, Callable
 from typing import Any
 
 from sqlalchemy import Select, func, select
@@ -15,3 +16,13 @@ async def db_count(session: AsyncSession, stmt: Select[Any]) -> int:
     `Query.count()` semantics exactly (joins/distinct included).
     """
     return (await session.scalar(select(func.count()).select_from(stmt.subquery()))) or 0
+
+
+def okta_pages(*pages: list[Any]) -> Callable[..., AsyncIterator[list[Any]]]:
+    """A side effect for mocking the ``OktaService.iter_*`` listings, yielding ``pages`` in order."""
+
+    async def iter_pages(*args: Any, **kwargs: Any) -> AsyncIterator[list[Any]]:
+        for page in pages:
+            yield page
+
+    return iter_pages
@@ -0,0 +1,529 @@
+"""A local stand-in for the Okta management API, for running ``access sync`` without an Okta org.
+
+``OktaEmulator`` serves, over plain HTTP, the endpoints the ``okta`` SDK calls
+during a sync: listing users, groups, group members, group owners and group
+rules (with Okta's ``after`` cursor pagination and simple ``filter``
+expressions), reading the user type and schema, and adding and removing group
+members and owners. Every response carries ``X-Rate-Limit-*`` headers from a
+fixed window per endpoint family, and a request past the window's limit gets a
+429 like Okta's. ``latency_seconds`` delays every response and
+``throttle_rate`` answers that fraction of requests with a 429 on top.
+
+The SDK refuses a non-https org URL unless its testing switch is on, so point
+Access at the emulator with ``OKTA_ORG_URL=<emulator.url>`` and
+``OKTA_TESTING_TESTINGDISABLEHTTPSCHECK=true`` (or ``okta_client_env``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import random
+import threading
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from aiohttp import web
+
+# Page size caps per listing, as documented for the Okta management API
+_MAX_PAGE_SIZE = {"users": 200, "groups": 10000, "group_members": 1000, "group_owners": 1000, "group_rules": 200}
+
+_USER_TYPE_ID = "oty00000000000000001"
+_USER_SCHEMA_ID = "osc00000000000000001"
+
+_BASE_SCHEMA_PROPERTIES = {
+    "login": "Username",
+    "email": "Primary email",
+    "firstName": "First name",
+    "lastName": "Last name",
+    "displayName": "Display name",
+    "employeeNumber": "Employee number",
+    "department": "Department",
+    "title": "Title",
+    "managerId": "ManagerId",
+}
+
+_EPOCH = "2024-01-01T00:00:00.000Z"
+
+
+def _okta_timestamp(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+def okta_client_env(url: str) -> dict[str, str]:
+    """The environment variables that point an ``access`` process at the emulator serving at ``url``."""
+    return {
+        "OKTA_DOMAIN": "okta-emulator.local",
+        "OKTA_API_TOKEN": "okta-emulator-token",
+        "OKTA_ORG_URL": url,
+        "OKTA_TESTING_TESTINGDISABLEHTTPSCHECK": "true",
+    }
+
+
+class _FilterError(ValueError):
+    pass
+
+
+def _compile_filter(expression: str | None) -> Callable[[dict[str, Any]], bool]:
+    """Compile the subset of Okta's ``filter`` syntax the syncer uses: ``attr op "value"`` clauses joined by ``or``.
+
+    Supports ``eq``, ``gt``, ``ge``, ``lt`` and ``le`` against top-level
+    attributes such as ``type`` and ``lastUpdated``. Okta's timestamps sort
+    lexically, so they are compared as strings.
+    """
+    if not expression:
+        return lambda resource: True
+    clauses = []
+    for clause in expression.split(" or "):
+        attribute, _, rest = clause.strip().partition(" ")
+        operator, _, value = rest.partition(" ")
+        if operator not in ("eq", "gt", "ge", "lt", "le") or len(value) < 2 or value[0] != '"' or value[-1] != '"':
+            raise _FilterError(expression)
+        clauses.append((attribute, operator, value[1:-1]))
+
+    def _matches(resource: dict[str, Any]) -> bool:
+        for attribute, operator, value in clauses:
+            actual = resource.get(attribute)
+            if actual is None:
+                continue
+            if (
+                (operator == "eq" and actual == value)
+                or (operator == "gt" and actual > value)
+                or (operator == "ge" and actual >= value)
+                or (operator == "lt" and actual < value)
+                or (operator == "le" and actual <= value)
+            ):
+                return True
+        return False
+
+    return _matches
+
+
+@dataclass
+class _RateLimitWindow:
+    resets_at: int
+    remaining: int
+
+
+class OktaEmulator:
+    """An in-memory Okta org behind an aiohttp server; see the module docstring.
+
+    Args:
+        latency_seconds: Added to every response, e.g. 0.05 for a typical round trip to Okta.
+        throttle_rate: Fraction of requests answered with a 429, regardless of the rate limits.
+        rate_limit: Requests each endpoint family allows per ``rate_limit_window_seconds``.
+        seed: Seeds the 429 injection and ``populate``.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency_seconds: float = 0.0,
+        throttle_rate: float = 0.0,
+        rate_limit: int = 1_000_000,
+        rate_limit_window_seconds: int = 60,
+        seed: int = 0,
+    ) -> None:
+        self.latency_seconds = latency_seconds
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.rate_limit_window_seconds = rate_limit_window_seconds
+        self.users: dict[str, dict[str, Any]] = {}
+        self.groups: dict[str, dict[str, Any]] = {}
+        self.group_rules: dict[str, dict[str, Any]] = {}
+        self.members: dict[str, set[str]] = {}
+        self.owners: dict[str, set[str]] = {}
+        # Requests served, by route name (e.g. "list_group_users"), and the 429s among them
+        self.requests: Counter[str] = Counter()
+        self.throttled: Counter[str] = Counter()
+        self.url = ""
+        self._random = random.Random(seed)
+        self._windows: dict[str, _RateLimitWindow] = {}
+        # Sorted ids for cursor pagination, rebuilt after a change
+        self._sorted_ids: dict[str, list[str]] = {}
+        self._runner: web.AppRunner | None = None
+
+    # --- Org contents ------------------------------------------------------
+
+    def add_user(self, *, status: str = "ACTIVE", **profile: Any) -> str:
+        user_id = f"00u{len(self.users):017x}"
+        login = profile.pop("login", f"user{len(self.users)}@example.com")
+        self.users[user_id] = {
+            "id": user_id,
+            "status": status,
+            "created": _EPOCH,
+            "activated": _EPOCH,
+            "statusChanged": _EPOCH,
+            "lastLogin": None,
+            "lastUpdated": _EPOCH,
+            "passwordChanged": None,
+            "type": {"id": _USER_TYPE_ID},
+            "profile": {
+                "login": login,
+                "email": login,
+                "firstName": f"First{len(self.users)}",
+                "lastName": f"Last{len(self.users)}",
+                "employeeNumber": str(len(self.users)),
+                **profile,
+            },
+        }
+        self._sorted_ids.pop("users", None)
+        return user_id
+
+    def update_user(self, user_id: str, *, status: str | None = None, **profile: Any) -> None:
+        user = self.users[user_id]
+        if status is not None:
+            user["status"] = status
+        user["profile"].update(profile)
+        user["lastUpdated"] = _okta_timestamp(datetime.now(timezone.utc))
+
+    def add_group(self, name: str | None = None, description: str = "", type: str = "OKTA_GROUP") -> str:
+        group_id = f"00g{len(self.groups):017x}"
+        self.groups[group_id] = {
+            "id": group_id,
+            "created": _EPOCH,
+            "lastUpdated": _EPOCH,
+            "lastMembershipUpdated": _EPOCH,
+            "objectClass": ["okta:user_group"],
+            "type": type,
+            "profile": {"name": name or f"Group {len(self.groups)}", "description": description},
+        }
+        self.members[group_id] = set()
+        self.owners[group_id] = set()
+        self._sorted_ids.pop("groups", None)
+        return group_id
+
+    def add_member(self, group_id: str, user_id: str) -> None:
+        self.members[group_id].add(user_id)
+        self._membership_changed(group_id)
+
+    def remove_member(self, group_id: str, user_id: str) -> None:
+        self.members[group_id].discard(user_id)
+        self._membership_changed(group_id)
+
+    def add_owner(self, group_id: str, user_id: str) -> None:
+        self.owners[group_id].add(user_id)
+        self._sorted_ids.pop(f"owners:{group_id}", None)
+
+    def add_group_rule(self, group_ids: list[str], name: str | None = None, status: str = "ACTIVE") -> str:
+        rule_id = f"0pr{len(self.group_rules):017x}"
+        self.group_rules[rule_id] = {
+            "id": rule_id,
+            "name": name or f"Rule {len(self.group_rules)}",
+            "status": status,
+            "type": "group_rule",
+            "created": _EPOCH,
+            "lastUpdated": _EPOCH,
+            "conditions": {"expression": {"type": "urn:okta:expression:1.0", "value": 'user.department=="x"'}},
+            "actions": {"assignUserToGroups": {"groupIds": list(group_ids)}},
+        }
+        self._sorted_ids.pop("group_rules", None)
+        return rule_id
+
+    def populate(
+        self,
+        users: int,
+        groups: int,
+        *,
+        mean_group_size: float = 25.0,
+        owners_per_group: int = 1,
+        group_rule_fraction: float = 0.02,
+    ) -> None:
+        """Fill the org with ``users`` users and ``groups`` groups of heavy-tailed sizes.
+
+        Group sizes follow a Pareto distribution with mean ``mean_group_size``,
+        capped at the user count, so most groups are small and a few hold a
+        large share of the org, as in a real one.
+        """
+        user_ids = [self.add_user() for _ in range(users)]
+        # A Pareto distribution with shape 1.5 has mean 3 * scale
+        scale = mean_group_size / 3
+        for _ in range(groups):
+            group_id = self.add_group()
+            size = min(users, int(scale * self._random.paretovariate(1.5)))
+            self.members[group_id].update(self._random.sample(user_ids, size))
+            self.owners[group_id].update(self._random.sample(user_ids, min(users, owners_per_group)))
+            if self._random.random() < group_rule_fraction:
+                self.add_group_rule([group_id])
+
+    def _membership_changed(self, group_id: str) -> None:
+        self.groups[group_id]["lastMembershipUpdated"] = _okta_timestamp(datetime.now(timezone.utc))
+        self._sorted_ids.pop(f"members:{group_id}", None)
+
+    def _sorted(self, key: str, ids: Callable[[], Any]) -> list[str]:
+        if key not in self._sorted_ids:
+            self._sorted_ids[key] = sorted(ids())
+        return self._sorted_ids[key]
+
+    # --- Serving -----------------------------------------------------------
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._okta_middleware])
+        routes = [
+            web.get("/api/v1/users", self._list_users, name="list_users"),
+            web.get("/api/v1/users/{userId}", self._get_user, name="get_user"),
+            web.get("/api/v1/meta/types/user/{typeId}", self._get_user_type, name="get_user_type"),
+            web.get("/api/v1/meta/schemas/user/{schemaId}", self._get_user_schema, name="get_user_schema"),
+            web.get("/api/v1/groups", self._list_groups, name="list_groups"),
+            # Registered before the ``{groupId}`` routes, which would otherwise match it
+            web.get("/api/v1/groups/rules", self._list_group_rules, name="list_group_rules"),
+            web.get("/api/v1/groups/{groupId}", self._get_group, name="get_group"),
+            web.get("/api/v1/groups/{groupId}/users", self._list_group_users, name="list_group_users"),
+            web.put("/api/v1/groups/{groupId}/users/{userId}", self._assign_user, name="assign_user_to_group"),
+            web.delete("/api/v1/groups/{groupId}/users/{userId}", self._unassign_user, name="unassign_user_from_group"),
+            web.get("/api/v1/groups/{groupId}/owners", self._list_group_owners, name="list_group_owners"),
+            web.post("/api/v1/groups/{groupId}/owners", self._assign_owner, name="assign_group_owner"),
+            web.delete("/api/v1/groups/{groupId}/owners/{ownerId}", self._delete_owner, name="delete_group_owner"),
+        ]
+        app.add_routes(routes)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve on ``host``:``port`` (any free port by default) and return the base URL."""
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{bound_port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @asynccontextmanager
+    async def serving(self) -> AsyncIterator[str]:
+        """Serve on the running event loop for the duration of the block."""
+        url = await self.start()
+        try:
+            yield url
+        finally:
+            await self.stop()
+
+    @contextmanager
+    def serving_in_thread(self) -> Iterator[str]:
+        """Serve from a background thread for the duration of the block, e.g. to sync against from a subprocess."""
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def _run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        thread = threading.Thread(target=_run, name="okta-emulator", daemon=True)
+        thread.start()
+        started.wait()
+        try:
+            yield self.url
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+
+    # --- Rate limits, latency and errors ----------------------------------
+
+    @staticmethod
+    def _endpoint_family(route_name: str) -> str:
+        for fragment, family in (
+            ("group_rule", "group_rules"),
+            ("group_owner", "group_owners"),
+            ("user_from_group", "group_members"),
+            ("user_to_group", "group_members"),
+            ("group_users", "group_members"),
+            ("group", "groups"),
+            ("user", "users"),
+        ):
+            if fragment in route_name:
+                return family
+        return "other"
+
+    @web.middleware
+    async def _okta_middleware(self, request: web.Request, handler: Callable[[web.Request], Any]) -> web.StreamResponse:
+        route_name = request.match_info.route.name or "unknown"
+        self.requests[route_name] += 1
+        if self.latency_seconds > 0:
+            await asyncio.sleep(self.latency_seconds)
+
+        now = int(time.time())
+        family = self._endpoint_family(route_name)
+        window = self._windows.get(family)
+        if window is None or window.resets_at <= now:
+            window = self._windows[family] = _RateLimitWindow(
+                resets_at=now + self.rate_limit_window_seconds, remaining=self.rate_limit
+            )
+        injected = self.throttle_rate > 0 and self._random.random() < self.throttle_rate
+        if window.remaining == 0 or injected:
+            self.throttled[route_name] += 1
+            # An injected 429 clears a second later, like a brief burst on a shared limit
+            resets_at = now + 1 if injected else window.resets_at
+            response: web.StreamResponse = _okta_error(
+                429, "E0000047", "API call exceeded rate limit due to too many requests."
+            )
+            remaining = 0
+        else:
+            window.remaining -= 1
+            resets_at = window.resets_at
+            remaining = window.remaining
+            try:
+                response = await handler(request)
+            except _FilterError as exc:
+                response = _okta_error(400, "E0000031", f"Invalid search criteria: {exc}")
+            except KeyError:
+                response = _okta_error(404, "E0000007", f"Not found: Resource not found: {request.path} (Resource)")
+        response.headers["X-Rate-Limit-Limit"] = str(self.rate_limit)
+        response.headers["X-Rate-Limit-Remaining"] = str(remaining)
+        response.headers["X-Rate-Limit-Reset"] = str(resets_at)
+        return response
+
+    def _page(
+        self, request: web.Request, listing: str, sorted_ids: list[str], resources: Callable[[str], dict[str, Any]]
+    ) -> web.Response:
+        limit = min(int(request.query.get("limit", 20)), _MAX_PAGE_SIZE[listing])
+        matches = _compile_filter(request.query.get("filter"))
+        after = request.query.get("after")
+        start = bisect.bisect_right(sorted_ids, after) if after else 0
+        page: list[dict[str, Any]] = []
+        position = start
+        while position < len(sorted_ids) and len(page) < limit:
+            resource = resources(sorted_ids[position])
+            position += 1
+            if matches(resource):
+                page.append(resource)
+        response = web.json_response(page)
+        if position < len(sorted_ids) and page:
+            next_url = request.url.update_query(after=page[-1]["id"], limit=str(limit))
+            response.headers["Link"] = f'<{next_url}>; rel="next"'
+        return response
+
+    # --- Handlers ----------------------------------------------------------
+
+    async def _list_users(self, request: web.Request) -> web.Response:
+        return self._page(request, "users", self._sorted("users", self.users.keys), self.users.__getitem__)
+
+    async def _get_user(self, request: web.Request) -> web.Response:
+        return web.json_response(self.users[request.match_info["userId"]])
+
+    async def _get_user_type(self, request: web.Request) -> web.Response:
+        if request.match_info["typeId"] != _USER_TYPE_ID:
+            raise KeyError(request.match_info["typeId"])
+        return web.json_response(
+            {
+                "id": _USER_TYPE_ID,
+                "name": "user",
+                "displayName": "User",
+                "description": "Okta user profile template with default permission settings",
+                "default": True,
+                "created": _EPOCH,
+                "lastUpdated": _EPOCH,
+                "_links": {"schema": {"href": f"{self.url}/api/v1/meta/schemas/user/{_USER_SCHEMA_ID}"}},
+            }
+        )
+
+    async def _get_user_schema(self, request: web.Request) -> web.Response:
+        if request.match_info["schemaId"] != _USER_SCHEMA_ID:
+            raise KeyError(request.match_info["schemaId"])
+        return web.json_response(
+            {
+                "id": f"{self.url}/meta/schemas/user/{_USER_SCHEMA_ID}",
+                "$schema": "http://json-schema.org/draft-04/schema#",
+                "name": "user",
+                "title": "User",
+                "type": "object",
+                "created": _EPOCH,
+                "lastUpdated": _EPOCH,
+                "definitions": {
+                    "base": {
+                        "id": "#base",
+                        "type": "object",
+                        "properties": {name: {"title": title} for name, title in _BASE_SCHEMA_PROPERTIES.items()},
+                    },
+                    "custom": {"id": "#custom", "type": "object", "properties": {}},
+                },
+            }
+        )
+
+    async def _list_groups(self, request: web.Request) -> web.Response:
+        return self._page(request, "groups", self._sorted("groups", self.groups.keys), self.groups.__getitem__)
+
+    async def _list_group_rules(self, request: web.Request) -> web.Response:
+        sorted_ids = self._sorted("group_rules", self.group_rules.keys)
+        return self._page(request, "group_rules", sorted_ids, self.group_rules.__getitem__)
+
+    async def _get_group(self, request: web.Request) -> web.Response:
+        return web.json_response(self.groups[request.match_info["groupId"]])
+
+    async def _list_group_users(self, request: web.Request) -> web.Response:
+        group_id = request.match_info["groupId"]
+        members = self.members[group_id]
+        return self._page(
+            request, "group_members", self._sorted(f"members:{group_id}", lambda: members), self.users.__getitem__
+        )
+
+    async def _assign_user(self, request: web.Request) -> web.Response:
+        group_id, user_id = request.match_info["groupId"], request.match_info["userId"]
+        if user_id not in self.users:
+            raise KeyError(user_id)
+        self.add_member(group_id, user_id)
+        return web.Response(status=204)
+
+    async def _unassign_user(self, request: web.Request) -> web.Response:
+        group_id, user_id = request.match_info["groupId"], request.match_info["userId"]
+        if group_id not in self.groups:
+            raise KeyError(group_id)
+        self.remove_member(group_id, user_id)
+        return web.Response(status=204)
+
+    def _group_owner(self, user_id: str) -> dict[str, Any]:
+        user = self.users[user_id]
+        return {
+            "id": user_id,
+            "type": "USER",
+            "displayName": f"{user['profile']['firstName']} {user['profile']['lastName']}",
+            "originType": "OKTA_DIRECTORY",
+            "resolved": True,
+            "lastUpdated": _EPOCH,
+        }
+
+    async def _list_group_owners(self, request: web.Request) -> web.Response:
+        group_id = request.match_info["groupId"]
+        owners = self.owners[group_id]
+        return self._page(
+            request, "group_owners", self._sorted(f"owners:{group_id}", lambda: owners), self._group_owner
+        )
+
+    async def _assign_owner(self, request: web.Request) -> web.Response:
+        group_id = request.match_info["groupId"]
+        user_id = (await request.json())["id"]
+        if group_id not in self.groups or user_id not in self.users:
+            raise KeyError(group_id)
+        if user_id in self.owners[group_id]:
+            return _okta_error(
+                400, "E0000001", "Api validation failed: Provided owner is already assigned to this group"
+            )
+        self.add_owner(group_id, user_id)
+        return web.json_response(self._group_owner(user_id), status=201)
+
+    async def _delete_owner(self, request: web.Request) -> web.Response:
+        group_id, user_id = request.match_info["groupId"], request.match_info["ownerId"]
+        if group_id not in self.groups:
+            raise KeyError(group_id)
+        self.owners[group_id].discard(user_id)
+        self._sorted_ids.pop(f"owners:{group_id}", None)
+        return web.Response(status=204)
+
+
+def _okta_error(status: int, code: str, summary: str) -> web.Response:
+    return web.json_response(
+        {"errorCode": code, "errorSummary": summary, "errorLink": code, "errorId": "oae-emulator", "errorCauses": []},
+        status=status,
+    )
@@ -669,19 +669,19 @@ async def test_get_all_possible_request_approvers(app: FastAPI, mocker: MockerFi
     db.session.add_all(users)
     await db.session.commit()
 
+    req = AccessRequest()
+    req.requested_group = AppGroupFactory.build()
+
     mocker.patch(
-        "api.models.access_request.get_group_managers",
-        return_value=[users[0], users[1]],
+        "api.models.access_request._group_owners_by_group_id",
+        return_value={req.requested_group.id: {users[0], users[1]}},
     )
 
     mocker.patch(
-        "api.models.access_request.get_app_managers",
-        return_value=[users[0], users[2]],
+        "api.models.access_request._app_managers_by_app_id",
+        return_value={req.requested_group.app_id: {users[0], users[2]}},
     )
 
-    req = AccessRequest()
-    req.requested_group = AppGroupFactory.build()
-
     approvers = await get_all_possible_request_approvers(req)
 
     # Assert that the access admin and 3 users are returned with no duplicates
@@ -4278,7 +4278,7 @@ async def test_create_push_mapping_for_existing_group_links_by_resolved_target(m
     group = _push_source_group(mocker)
     list_groups = mocker.patch(
         "api.plugins.app_group_lifecycle.okta.list_groups",
-        return_value=[mocker.Mock(group=mocker.Mock(id="okta-tgt-1"))],
+        return_value=[mocker.Mock(id="okta-tgt-1")],
     )
     create = mocker.patch(
         "api.plugins.app_group_lifecycle.okta.create_group_push_mapping", return_value={"id": "map-1"}
@@ -4320,7 +4320,7 @@ async def test_create_push_mapping_for_existing_group_raises_on_ambiguous_target
     # imported" or resolved arbitrarily.
     mocker.patch(
         "api.plugins.app_group_lifecycle.okta.list_groups",
-        return_value=[mocker.Mock(group=mocker.Mock(id="okta-tgt-1")), mocker.Mock(group=mocker.Mock(id="okta-tgt-2"))],
+        return_value=[mocker.Mock(id="okta-tgt-1"), mocker.Mock(id="okta-tgt-2")],
     )
     create = mocker.patch("api.plugins.app_group_lifecycle.okta.create_group_push_mapping")
 
@@ -1,9 +1,19 @@
+import asyncio
+import json
 from datetime import datetime, timedelta, timezone
 
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy import select
 
+from api.config import settings
 from api.models import AccessRequest, AccessRequestStatus, OktaGroup, OktaUser
 from api.extensions import Db
+from api.operations import ModifyGroupUsers, RejectAccessRequests
+from api.plugins import get_notification_hook
+from api.schemas import EventType
 from api.syncer import expire_access_requests
+from tests.factories import AccessRequestFactory, AppFactory, AppGroupFactory, OktaGroupFactory, OktaUserFactory
 
 
 async def test_no_expire_new_access_request(
@@ -42,9 +52,8 @@ async def test_expire_old_access_request(
 
     await expire_access_requests()
 
-    # The reject operation expired this row's attributes via a
-    # synchronize_session="fetch" UPDATE; expire_all so the awaited get()
-    # refreshes it instead of lazy-loading on attribute access.
+    # The rejection updated this row with a bulk UPDATE; expire_all so the
+    # awaited get() refreshes it instead of lazy-loading on attribute access.
     db.session.expire_all()
     access_request = await db.session.get(AccessRequest, access_request_id)
     assert access_request.status == AccessRequestStatus.REJECTED
@@ -68,10 +77,116 @@ async def test_expire_old_temporary_access_request(
 
     await expire_access_requests()
 
-    # The reject operation expired this row's attributes via a
-    # synchronize_session="fetch" UPDATE; expire_all so the awaited get()
-    # refreshes it instead of lazy-loading on attribute access.
+    # The rejection updated this row with a bulk UPDATE; expire_all so the
+    # awaited get() refreshes it instead of lazy-loading on attribute access.
     db.session.expire_all()
     access_request = await db.session.get(AccessRequest, access_request_id)
     assert access_request.status == AccessRequestStatus.REJECTED
     assert access_request.resolved_at is not None
+
+
+async def test_expire_access_requests_in_bulk(db: Db, mocker: MockerFixture, caplog: pytest.LogCaptureFixture) -> None:
+    access_owner = (
+        await db.session.scalars(select(OktaUser).where(OktaUser.email == settings.CURRENT_OKTA_USER_EMAIL))
+    ).one()
+    app = await AppFactory.create_async()
+    owner_app_group = await AppGroupFactory.create_async(app_id=app.id, is_owner=True)
+    app_group = await AppGroupFactory.create_async(app_id=app.id, is_owner=False)
+    okta_group = await OktaGroupFactory.create_async()
+    app_owner, group_owner, requester = await OktaUserFactory.create_batch_async(3)
+    await ModifyGroupUsers(group=owner_app_group, owners_to_add=[app_owner.id], sync_to_okta=False).execute()
+    await ModifyGroupUsers(group=okta_group, owners_to_add=[group_owner.id], sync_to_okta=False).execute()
+
+    long_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    expired = [
+        *await AccessRequestFactory.create_batch_async(
+            3, requester_user_id=requester.id, requested_group_id=okta_group.id, created_at=long_ago
+        ),
+        *await AccessRequestFactory.create_batch_async(
+            2, requester_user_id=requester.id, requested_group_id=app_group.id, created_at=long_ago
+        ),
+        await AccessRequestFactory.create_async(
+            requester_user_id=requester.id,
+            requested_group_id=okta_group.id,
+            request_ending_at=datetime.now(timezone.utc) - timedelta(hours=1),
+        ),
+    ]
+    pending = await AccessRequestFactory.create_async(requester_user_id=requester.id, requested_group_id=okta_group.id)
+    approved = await AccessRequestFactory.create_async(
+        requester_user_id=requester.id,
+        requested_group_id=okta_group.id,
+        created_at=long_ago,
+        status=AccessRequestStatus.APPROVED,
+        resolved_at=long_ago,
+    )
+    expired_ids = {access_request.id for access_request in expired}
+    pending_id, approved_id = pending.id, approved.id
+    mocker.patch.object(RejectAccessRequests, "CHUNK_SIZE", 4)
+    notification_spy = mocker.patch.object(get_notification_hook(), "access_request_completed")
+
+    with caplog.at_level("INFO", logger="access.audit"):
+        await expire_access_requests()
+
+    audit_logs = [
+        log
+        for log in (json.loads(r.getMessage()) for r in caplog.records if r.name == "access.audit")
+        if log["event_type"] == EventType.access_reject.value
+    ]
+    assert {log["request"]["id"] for log in audit_logs} == expired_ids
+    assert len(audit_logs) == len(expired_ids)
+
+    assert notification_spy.call_count == len(expired_ids)
+    approvers_by_request_id = {
+        kwargs["access_request"].id: {approver.id for approver in kwargs["approvers"]}
+        for _, kwargs in notification_spy.call_args_list
+    }
+    for access_request in expired:
+        if access_request.requested_group_id == app_group.id:
+            assert approvers_by_request_id[access_request.id] == {access_owner.id, app_owner.id}
+        else:
+            assert approvers_by_request_id[access_request.id] == {access_owner.id, group_owner.id}
+    for _, kwargs in notification_spy.call_args_list:
+        assert kwargs["access_request"].resolution_reason == "Closed because the request expired"
+        assert kwargs["access_request"].resolved_at is not None
+        assert kwargs["requester"].id == requester.id
+
+    db.session.expire_all()
+    statuses = {
+        access_request.id: access_request.status for access_request in await db.session.scalars(select(AccessRequest))
+    }
+    assert statuses == {
+        **{access_request_id: AccessRequestStatus.REJECTED for access_request_id in expired_ids},
+        pending_id: AccessRequestStatus.PENDING,
+        approved_id: AccessRequestStatus.APPROVED,
+    }
+
+
+async def test_reject_access_requests_bounds_notifications(db: Db, mocker: MockerFixture) -> None:
+    okta_group = await OktaGroupFactory.create_async()
+    requester = await OktaUserFactory.create_async()
+    access_requests = await AccessRequestFactory.create_batch_async(
+        5, requester_user_id=requester.id, requested_group_id=okta_group.id
+    )
+    await db.session.commit()
+
+    in_flight = 0
+    peak_in_flight = 0
+
+    async def _notify() -> None:
+        nonlocal in_flight, peak_in_flight
+        in_flight += 1
+        peak_in_flight = max(peak_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    notification_spy = mocker.patch.object(
+        get_notification_hook(), "access_request_completed", side_effect=lambda **kwargs: [_notify()]
+    )
+
+    rejected = await RejectAccessRequests(
+        access_requests=access_requests, rejection_reason="Closed", notification_concurrency=2
+    ).execute()
+
+    assert len(rejected) == 5
+    assert notification_spy.call_count == 5
+    assert peak_in_flight == 2
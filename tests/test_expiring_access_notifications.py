@@ -1,15 +1,16 @@
+import asyncio
 import threading
 from datetime import datetime, timedelta
 from typing import Any
 
 from pytest_mock import MockerFixture
-from sqlalchemy import select
+from sqlalchemy import event, select
 
-from api.models import OktaGroup, OktaUser, OktaUserGroupMember, RoleGroup, RoleGroupMap
+from api.models import App, AppGroup, OktaGroup, OktaUser, OktaUserGroupMember, RoleGroup, RoleGroupMap
 from api.extensions import Db
 from api.config import settings
 from api.operations import ModifyGroupUsers, ModifyRoleGroups
-from api.plugins import get_notification_hook
+from api.plugins import NotificationHook, get_notification_hook, send_notifications
 from fastapi import FastAPI
 
 from api.syncer import (
@@ -877,11 +878,10 @@ async def test_expiring_role_owner_notification_hook_can_read_association_relati
 
 # Regression test for the notify-owners cronjob crashing with MissingGreenlet after the
 # async-SQLAlchemy flip (#480). When a managed AppGroup with an expiring membership has no
-# direct group owners, the owner syncer falls back to
-# `get_app_managers(okta_user_group_member.group.app_id)`. Reading `.group.app_id` needs the
-# AppGroup polymorphic subclass columns; the membership query must eager-load them
-# (`of_type(with_polymorphic(...))`) or the read emits a lazy SELECT, which raises
-# MissingGreenlet under async SQLAlchemy. expire_all() drops the identity map so the syncer
+# direct group owners, the owner syncer falls back to the owners of the group's app. Reading
+# the group's app off the membership needs the AppGroup polymorphic subclass columns; the
+# membership query must eager-load them (`of_type(with_polymorphic(...))`) or the read emits
+# a lazy SELECT, which raises MissingGreenlet under async SQLAlchemy. expire_all() drops the identity map so the syncer
 # reloads the group fresh (base okta_group row only) — reproducing the cronjob's cold-load
 # path, which is where the missing eager-load bites.
 async def test_owner_expiring_access_notifications_app_group_falls_back_to_app_managers(
@@ -930,3 +930,121 @@ async def test_owner_expiring_access_notifications_app_group_falls_back_to_app_m
     assert kwargs["owner"].id == app_owner_id
     assert len(kwargs["group_user_associations"]) == 1
     assert kwargs["group_user_associations"][0].id == membership_id
+
+
+# Owners are resolved for every expiring group at once: by the group's owners, then the
+# owners of its app, then the Access owners. The number of queries the job issues doesn't
+# grow with the number of expiring groups.
+async def test_owner_expiring_access_notifications_resolves_owners_in_bulk(db: Db, mocker: MockerFixture) -> None:
+    access_owner = (
+        await db.session.scalars(select(OktaUser).where(OktaUser.email == settings.CURRENT_OKTA_USER_EMAIL))
+    ).one()
+    app = await AppFactory.create_async()
+    owner_app_group = await AppGroupFactory.create_async(app_id=app.id, is_owner=True)
+    app_owner = await OktaUserFactory.create_async()
+    group_owner = await OktaUserFactory.create_async()
+    member = await OktaUserFactory.create_async()
+    expiration_datetime = datetime.now() + timedelta(days=2)
+    await ModifyGroupUsers(group=owner_app_group, owners_to_add=[app_owner.id], sync_to_okta=False).execute()
+
+    async def _add_expiring_groups() -> tuple[OktaGroup, AppGroup, OktaGroup]:
+        owned_group = await OktaGroupFactory.create_async()
+        app_group = await AppGroupFactory.create_async(app_id=app.id, is_owner=False)
+        unowned_group = await OktaGroupFactory.create_async()
+        await ModifyGroupUsers(group=owned_group, owners_to_add=[group_owner.id], sync_to_okta=False).execute()
+        for group in (owned_group, app_group, unowned_group):
+            await ModifyGroupUsers(
+                group=group, users_added_ended_at=expiration_datetime, members_to_add=[member.id], sync_to_okta=False
+            ).execute()
+        return owned_group, app_group, unowned_group
+
+    async def _notify() -> tuple[dict[str, set[str]], int]:
+        queries: list[str] = []
+
+        def _record(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+            queries.append(statement)
+
+        spy = mocker.patch.object(get_notification_hook(), "access_expiring_owner")
+        event.listen(db.engine.sync_engine, "before_cursor_execute", _record)
+        try:
+            await expiring_access_notifications_owner()
+        finally:
+            event.remove(db.engine.sync_engine, "before_cursor_execute", _record)
+        notified = {
+            kwargs["owner"].id: {m.group_id for m in kwargs["group_user_associations"]}
+            for _, kwargs in spy.call_args_list
+        }
+        return notified, len(queries)
+
+    owned_group, app_group, unowned_group = await _add_expiring_groups()
+    notified, query_count = await _notify()
+    assert notified == {
+        group_owner.id: {owned_group.id},
+        app_owner.id: {app_group.id},
+        access_owner.id: {unowned_group.id},
+    }
+
+    more_groups = [await _add_expiring_groups() for _ in range(4)]
+    notified, more_groups_query_count = await _notify()
+    assert notified[group_owner.id] == {owned_group.id} | {groups[0].id for groups in more_groups}
+    assert notified[access_owner.id] == {unowned_group.id} | {groups[2].id for groups in more_groups}
+    assert more_groups_query_count == query_count
+
+    # The Access app's owners are only a fallback while the Access app exists
+    access_app = (await db.session.scalars(select(App).where(App.name == App.ACCESS_APP_RESERVED_NAME))).one()
+    access_app.deleted_at = datetime.now()
+    await db.session.commit()
+    notified, _ = await _notify()
+    assert access_owner.id not in notified
+
+
+async def test_send_notifications_bounds_concurrency_and_isolates_failures(mocker: MockerFixture) -> None:
+    in_flight = 0
+    max_in_flight = 0
+
+    async def _send(user: str) -> None:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if user == "broken":
+                raise RuntimeError("Slack is down")
+        finally:
+            in_flight -= 1
+
+    mocker.patch.object(
+        get_notification_hook(), "access_expiring_user", side_effect=lambda **kwargs: [_send(kwargs["user"])]
+    )
+    notifications = [dict(user=user, expiration_datetime=None, okta_user_group_members=[]) for user in "abcdef"]
+    notifications.insert(2, dict(user="broken", expiration_datetime=None, okta_user_group_members=[]))
+
+    summary = await send_notifications(NotificationHook.ACCESS_EXPIRING_USER, notifications, concurrency=3)
+
+    assert (summary.sent, summary.failed) == (6, 1)
+    assert max_in_flight == 3
+    assert summary.duration_seconds > 0
+
+
+async def test_individual_expiring_access_notifications_summary(db: Db, mocker: MockerFixture) -> None:
+    group = await OktaGroupFactory.create_async()
+    users = await OktaUserFactory.create_batch_async(2)
+    await ModifyGroupUsers(
+        group=group,
+        users_added_ended_at=datetime.now() + timedelta(days=1),
+        members_to_add=[user.id for user in users],
+        sync_to_okta=False,
+    ).execute()
+    broken_user_id = users[0].id
+
+    async def _send(user: OktaUser) -> None:
+        if user.id == broken_user_id:
+            raise RuntimeError("Slack is down")
+
+    mocker.patch.object(
+        get_notification_hook(), "access_expiring_user", side_effect=lambda **kwargs: [_send(kwargs["user"])]
+    )
+
+    summary = await expiring_access_notifications_user(concurrency=2)
+
+    assert (summary.sent, summary.failed) == (1, 1)
@@ -8,12 +8,14 @@ from pytest_mock import MockerFixture
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.models import OktaGroup, OktaUser, OktaUserGroupMember
+from api.config import settings
+from api.models import OktaGroup, OktaUser, OktaUserGroupMember, SyncRun, SyncRunGroup, SyncState
 from api.extensions import Db
 from api.services import okta
-from api.services.okta_service import Group, OktaResourceNotFoundError, User
-from api.syncer import sync_group_memberships
+from api.services.okta_service import Group, ManagedGroupIndex, OktaResourceNotFoundError, User
+from api.syncer import GroupShard, sync_group_memberships
 from tests.factories import GroupFactory, UserFactory
+from tests.helpers import okta_pages
 
 MembershipDetails = namedtuple("MembershipDetails", ["expired_at", "db_pk"])
 
@@ -54,6 +56,26 @@ async def test_membership_in_okta_not_in_db_authoritative(db: Db, mocker: Mocker
     assert len(members) == 0
 
 
+async def test_membership_authoritative_write_failure_does_not_abort_group(db: Db, mocker: MockerFixture) -> None:
+    initial_okta_users = UserFactory.create_batch(3)
+    initial_okta_groups = GroupFactory.create_batch(1, lastMembershipUpdated="2024-01-01T00:00:00.000Z")
+    await seed_db(db, initial_okta_users, initial_okta_groups)
+
+    async def fake_remove_user_from_group(group_id: str, user_id: str) -> None:
+        if user_id == initial_okta_users[1].id:
+            raise RuntimeError("boom")
+
+    delete_membership_spy = mocker.patch.object(okta, "remove_user_from_group", side_effect=fake_remove_user_from_group)
+
+    await run_sync(db, mocker, initial_okta_groups, lambda group_id: initial_okta_users, True)
+
+    assert delete_membership_spy.call_count == 3
+    # The group isn't marked as synced, so the next incremental run retries it
+    async with AsyncSession(db.engine) as session:
+        group = await session.get(OktaGroup, initial_okta_groups[0].id)
+        assert group is not None and group.memberships_synced_at is None
+
+
 async def test_membership_in_okta_not_in_db_not_authoritative(db: Db, mocker: MockerFixture) -> None:
     initial_okta_users = UserFactory.create_batch(3)
     initial_okta_groups = GroupFactory.create_batch(3)
@@ -370,6 +392,227 @@ async def test_membership_sync_skips_group_deleted_mid_run_at_warning(
     )
 
 
+async def test_membership_sync_skips_groups_with_unchanged_membership(db: Db, mocker: MockerFixture) -> None:
+    initial_okta_users = UserFactory.create_batch(2)
+    initial_okta_groups = GroupFactory.create_batch(3, lastMembershipUpdated="2024-01-01T00:00:00.000Z")
+    await seed_db(db, initial_okta_users, initial_okta_groups)
+
+    def fake_list_users_for_group(group_id: str) -> list[User]:
+        if group_id == initial_okta_groups[0].id:
+            return initial_okta_users
+        return []
+
+    await run_sync(db, mocker, initial_okta_groups, fake_list_users_for_group, False)
+    assert len(await _get_group_members(db, initial_okta_groups[0].id)) == 2
+
+    # Membership moved in Okta for the second group and, since an earlier sync,
+    # in Access for the third
+    initial_okta_groups[1].last_membership_updated = datetime(2024, 2, 1)
+    async with AsyncSession(db.engine) as session:
+        (await session.get(OktaGroup, initial_okta_groups[2].id)).memberships_synced_at = datetime.now() - timedelta(
+            hours=1
+        )
+        session.add(
+            OktaUserGroupMember(user_id=initial_okta_users[0].id, group_id=initial_okta_groups[2].id, is_owner=False)
+        )
+        await session.commit()
+
+    await run_sync(db, mocker, initial_okta_groups, fake_list_users_for_group, False, full=False)
+
+    fetched_group_ids = {call.args[0] for call in okta.list_users_for_group.call_args_list}
+    assert fetched_group_ids == {initial_okta_groups[1].id, initial_okta_groups[2].id}
+    assert len(await _get_group_members(db, initial_okta_groups[0].id)) == 2
+    # The Access-only membership was reconciled away against Okta
+    assert all(m.expired_at is not None for m in (await _get_group_members(db, initial_okta_groups[2].id)).values())
+
+
+async def test_membership_sync_full_pass_fetches_every_group(db: Db, mocker: MockerFixture) -> None:
+    initial_okta_users = UserFactory.create_batch(2)
+    initial_okta_groups = GroupFactory.create_batch(3, lastMembershipUpdated="2024-01-01T00:00:00.000Z")
+    await seed_db(db, initial_okta_users, initial_okta_groups)
+
+    await run_sync(db, mocker, initial_okta_groups, lambda group_id: [], False)
+    await run_sync(db, mocker, initial_okta_groups, lambda group_id: [], False, full=True)
+
+    fetched_group_ids = {call.args[0] for call in okta.list_users_for_group.call_args_list}
+    assert fetched_group_ids == {g.id for g in initial_okta_groups}
+
+
+async def test_membership_sync_including_ownerships(db: Db, mocker: MockerFixture) -> None:
+    initial_okta_users = UserFactory.create_batch(2)
+    initial_okta_groups = GroupFactory.create_batch(3, lastMembershipUpdated="2024-01-01T00:00:00.000Z")
+    await seed_db(db, initial_okta_users, initial_okta_groups)
+    await run_sync(db, mocker, initial_okta_groups, lambda group_id: [], False)
+
+    # Only the first group's membership moved in Okta since the last sync
+    initial_okta_groups[0].last_membership_updated = datetime(2024, 2, 1)
+    mocker.patch.object(okta, "list_users_for_group", return_value=initial_okta_users)
+    list_owners_spy = mocker.patch.object(okta, "list_owners_for_group", return_value=initial_okta_users[:1])
+    await sync_group_memberships(
+        False, initial_okta_groups, ManagedGroupIndex({}), concurrency=10, full=False, include_ownerships=True
+    )
+
+    # Members are only listed for the changed group, owners for every group
+    assert {call.args[0] for call in okta.list_users_for_group.call_args_list} == {initial_okta_groups[0].id}
+    assert {call.args[0] for call in list_owners_spy.call_args_list} == {g.id for g in initial_okta_groups}
+    assert len(await _get_group_members(db, initial_okta_groups[0].id)) == 2
+    assert len(await _get_group_members(db, initial_okta_groups[1].id)) == 0
+    async with AsyncSession(db.engine) as session:
+        owners = (
+            await session.scalars(select(OktaUserGroupMember).where(OktaUserGroupMember.is_owner.is_(True)))
+        ).all()
+        assert {(o.group_id, o.user_id) for o in owners} == {
+            (g.id, initial_okta_users[0].id) for g in initial_okta_groups
+        }
+
+
+async def test_membership_sync_shards_cover_every_group_once(db: Db, mocker: MockerFixture) -> None:
+    initial_okta_groups = GroupFactory.create_batch(8)
+    await seed_db(db, [], initial_okta_groups)
+
+    fetched_group_ids: list[str] = []
+    for index in range(3):
+        await run_sync(
+            db, mocker, initial_okta_groups, lambda group_id: [], False, full=True, shard=GroupShard(index, 3)
+        )
+        fetched_group_ids.extend(call.args[0] for call in okta.list_users_for_group.call_args_list)
+
+    assert sorted(fetched_group_ids) == sorted(g.id for g in initial_okta_groups)
+    # Each shard keeps its own full-pass schedule
+    async with AsyncSession(db.engine) as session:
+        assert {s.name for s in (await session.scalars(select(SyncState))).all()} == {
+            "group_memberships:0/3",
+            "group_memberships:1/3",
+            "group_memberships:2/3",
+        }
+
+
+async def test_membership_sync_resumes_interrupted_run(db: Db, mocker: MockerFixture) -> None:
+    initial_okta_groups = GroupFactory.create_batch(4)
+    await seed_db(db, [], initial_okta_groups)
+
+    # A full pass was killed after reconciling the first two groups
+    snapshot_at = datetime.now() - timedelta(minutes=30)
+    async with AsyncSession(db.engine) as session:
+        session.add(SyncRun(stage="group_memberships", snapshot_at=snapshot_at, full=True, groups_total=4))
+        await session.flush()
+        session.add_all([SyncRunGroup(stage="group_memberships", group_id=g.id) for g in initial_okta_groups[:2]])
+        await session.commit()
+
+    await run_sync(db, mocker, initial_okta_groups, lambda group_id: [], False)
+
+    fetched_group_ids = {call.args[0] for call in okta.list_users_for_group.call_args_list}
+    assert fetched_group_ids == {g.id for g in initial_okta_groups[2:]}
+    async with AsyncSession(db.engine) as session:
+        assert (await session.scalars(select(SyncRun))).all() == []
+        assert (await session.scalars(select(SyncRunGroup))).all() == []
+        # The resumed pass is recorded as the full pass that started at the snapshot
+        state = await session.get(SyncState, "group_memberships")
+        assert state is not None and state.last_full_sync_at == snapshot_at
+
+
+async def test_membership_sync_discards_stale_run(db: Db, mocker: MockerFixture) -> None:
+    initial_okta_groups = GroupFactory.create_batch(3)
+    await seed_db(db, [], initial_okta_groups)
+
+    async with AsyncSession(db.engine) as session:
+        session.add(
+            SyncRun(
+                stage="group_memberships", snapshot_at=datetime.now() - timedelta(days=2), full=True, groups_total=3
+            )
+        )
+        await session.flush()
+        session.add(SyncRunGroup(stage="group_memberships", group_id=initial_okta_groups[0].id))
+        await session.commit()
+
+    await run_sync(db, mocker, initial_okta_groups, lambda group_id: [], False, full=True)
+
+    fetched_group_ids = {call.args[0] for call in okta.list_users_for_group.call_args_list}
+    assert fetched_group_ids == {g.id for g in initial_okta_groups}
+
+
+async def test_membership_sync_streams_large_groups(db: Db, mocker: MockerFixture) -> None:
+    initial_okta_users = sorted(UserFactory.create_batch(4), key=lambda u: u.id)
+    initial_okta_groups = GroupFactory.create_batch(1)
+    await seed_db(db, initial_okta_users, initial_okta_groups)
+    group_id = initial_okta_groups[0].id
+    member_until = datetime.now() + timedelta(days=1)
+    await _add_group_membership_record(db, initial_okta_users[0].id, group_id, member_until)
+    await _add_group_membership_record(db, initial_okta_users[2].id, group_id, member_until)
+
+    mocker.patch.object(settings, "SYNC_STREAMING_RECONCILE_MIN_MEMBERS", 2)
+    mocker.patch.object(
+        okta,
+        "iter_group_users",
+        side_effect=okta_pages([User(initial_okta_users[1])], [User(u) for u in initial_okta_users[2:]]),
+    )
+    remove_membership_spy = mocker.patch.object(okta, "remove_user_from_group")
+    await run_sync(db, mocker, initial_okta_groups, lambda group_id: [], False)
+
+    # The large group's members were streamed rather than listed up front
+    assert okta.list_users_for_group.call_count == 0
+    members = await _get_group_members(db, group_id)
+    assert members[initial_okta_users[0].id].expired_at < member_until
+    assert members[initial_okta_users[1].id].expired_at is None
+    assert members[initial_okta_users[2].id].expired_at == member_until
+    assert members[initial_okta_users[3].id].expired_at is None
+    assert [call.args[1] for call in remove_membership_spy.call_args_list] == [initial_okta_users[0].id]
+
+
+async def test_membership_sync_streams_large_groups_authoritative(db: Db, mocker: MockerFixture) -> None:
+    initial_okta_users = sorted(UserFactory.create_batch(4), key=lambda u: u.id)
+    initial_okta_groups = GroupFactory.create_batch(1)
+    await seed_db(db, initial_okta_users, initial_okta_groups)
+    group_id = initial_okta_groups[0].id
+    member_until = datetime.now() + timedelta(days=1)
+    await _add_group_membership_record(db, initial_okta_users[0].id, group_id, member_until)
+    await _add_group_membership_record(db, initial_okta_users[2].id, group_id, member_until)
+
+    mocker.patch.object(settings, "SYNC_STREAMING_RECONCILE_MIN_MEMBERS", 2)
+    mocker.patch.object(
+        okta,
+        "iter_group_users",
+        side_effect=okta_pages([User(initial_okta_users[1])], [User(u) for u in initial_okta_users[2:]]),
+    )
+    add_membership_spy = mocker.patch.object(okta, "add_user_to_group")
+    remove_membership_spy = mocker.patch.object(okta, "remove_user_from_group")
+    await run_sync(db, mocker, initial_okta_groups, lambda group_id: [], True)
+
+    assert [call.args[1] for call in add_membership_spy.call_args_list] == [initial_okta_users[0].id]
+    assert sorted(call.args[1] for call in remove_membership_spy.call_args_list) == [
+        initial_okta_users[1].id,
+        initial_okta_users[3].id,
+    ]
+
+
+async def test_membership_sync_streaming_falls_back_on_unordered_listing(db: Db, mocker: MockerFixture) -> None:
+    initial_okta_users = sorted(UserFactory.create_batch(4), key=lambda u: u.id)
+    initial_okta_groups = GroupFactory.create_batch(1)
+    await seed_db(db, initial_okta_users, initial_okta_groups)
+    group_id = initial_okta_groups[0].id
+    member_until = datetime.now() + timedelta(days=1)
+    await _add_group_membership_record(db, initial_okta_users[0].id, group_id, member_until)
+    await _add_group_membership_record(db, initial_okta_users[2].id, group_id, member_until)
+
+    mocker.patch.object(settings, "SYNC_STREAMING_RECONCILE_MIN_MEMBERS", 2)
+    okta_members = [initial_okta_users[3], initial_okta_users[1]]
+    mocker.patch.object(okta, "iter_group_users", side_effect=okta_pages([User(u) for u in okta_members]))
+    await run_sync(db, mocker, initial_okta_groups, lambda group_id: okta_members, False)
+
+    assert [call.args[0] for call in okta.list_users_for_group.call_args_list] == [group_id]
+    members = await _get_group_members(db, group_id)
+    assert members[initial_okta_users[0].id].expired_at < member_until
+    assert members[initial_okta_users[1].id].expired_at is None
+    assert members[initial_okta_users[2].id].expired_at < member_until
+    assert members[initial_okta_users[3].id].expired_at is None
+
+
+@pytest.mark.parametrize("value", ["1", "3/3", "-1/3", "a/b", "0/0"])
+def test_group_shard_rejects_invalid_values(value: str) -> None:
+    with pytest.raises(ValueError):
+        GroupShard.parse(value)
+
+
 async def seed_db(db: Db, users: list[OktaUser], groups: list[OktaGroup]) -> Tuple[list[OktaUser], list[OktaGroup]]:
     async with AsyncSession(db.engine) as session:
         session.add_all([Group(g).update_okta_group(OktaGroup(), {}) for g in groups])
@@ -389,15 +632,19 @@ async def run_sync(
     user_membership_func: Callable[[str], list[User]],
     act_as_authority: bool,
     groups_with_rules: set[str] = set(),
+    full: bool | None = None,
+    shard: GroupShard | None = None,
 ) -> list[OktaUserGroupMember]:
     async with AsyncSession(db.engine) as session:
         mocker.patch.object(okta, "list_groups", return_value=okta_groups)
 
         mocker.patch.object(okta, "list_users_for_group", side_effect=user_membership_func)
 
-        mocker.patch.object(okta, "list_groups_with_active_rules", return_value=groups_with_rules)
+        mocker.patch.object(
+            okta, "list_groups_with_active_rules", return_value={group_id: [] for group_id in groups_with_rules}
+        )
 
-        await sync_group_memberships(act_as_authority, concurrency=10)
+        await sync_group_memberships(act_as_authority, concurrency=10, full=full, shard=shard)
 
         return list((await session.scalars(select(OktaUserGroupMember))).all())
 
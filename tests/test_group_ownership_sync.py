@@ -446,7 +446,9 @@ async def run_sync(
 
         mocker.patch.object(okta, "list_owners_for_group", side_effect=user_ownership_func)
 
-        mocker.patch.object(okta, "list_groups_with_active_rules", return_value=groups_with_rules)
+        mocker.patch.object(
+            okta, "list_groups_with_active_rules", return_value={group_id: [] for group_id in groups_with_rules}
+        )
 
         await sync_group_ownerships(act_as_authority, concurrency=10)
 
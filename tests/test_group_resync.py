@@ -0,0 +1,204 @@
+import json
+from datetime import datetime
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+from pytest_mock import MockerFixture
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.cli import _sync_targets
+from api.config import settings
+from api.extensions import Db
+from api.models import OktaGroup, OktaUser, OktaUserGroupMember
+from api.services import okta
+from api.services.okta_service import Group, OktaResourceNotFoundError, User, UserSchema
+from api.syncer import GroupSyncDiff, UserSyncDiff, resolve_group_id, sync_group, sync_user
+from tests.factories import GroupFactory, OktaGroupFactory, OktaUserFactory, UserFactory, UserSchemaFactory
+
+
+async def _seed_db(db: Db, users: list[Any], groups: list[Any], members: list[tuple[str, str]]) -> None:
+    async with AsyncSession(db.engine) as session:
+        session.add_all([Group(g).update_okta_group(OktaGroup(), {}) for g in groups])
+        session.add_all([User(u).update_okta_user(OktaUser(), {}) for u in users])
+        await session.flush()
+        session.add_all(
+            [OktaUserGroupMember(user_id=user_id, group_id=group_id, is_owner=False) for user_id, group_id in members]
+        )
+        await session.commit()
+
+
+def _mock_okta_group(mocker: MockerFixture, group: Any, members: list[Any], owners: list[Any]) -> None:
+    mocker.patch.object(settings, "OKTA_USE_GROUP_OWNERS_API", True)
+    mocker.patch.object(okta, "get_group", return_value=Group(group))
+    mocker.patch.object(okta, "list_users_for_group", return_value=[User(member) for member in members])
+    mocker.patch.object(okta, "list_owners_for_group", return_value=[User(owner) for owner in owners])
+    mocker.patch.object(okta, "list_groups_with_active_rules", return_value={})
+
+
+async def _active_memberships(db: Db, group_id: str) -> set[tuple[str, bool]]:
+    async with AsyncSession(db.engine) as session:
+        memberships = (
+            await session.scalars(
+                select(OktaUserGroupMember)
+                .where(OktaUserGroupMember.group_id == group_id)
+                .where(OktaUserGroupMember.ended_at.is_(None))
+            )
+        ).all()
+        return {(m.user_id, m.is_owner) for m in memberships}
+
+
+async def test_sync_group_returns_db_diff(db: Db, mocker: MockerFixture) -> None:
+    removed, added, owner = UserFactory.create_batch(3)
+    group = GroupFactory.create()
+    await _seed_db(db, [removed, added, owner], [group], [(removed.id, group.id)])
+    _mock_okta_group(mocker, group, members=[added], owners=[owner])
+
+    diff = await sync_group(group.id)
+
+    assert diff == GroupSyncDiff(
+        group_id=group.id,
+        members_added=[added.id],
+        members_removed=[removed.id],
+        owners_added=[owner.id],
+    )
+    assert await _active_memberships(db, group.id) == {(added.id, False), (owner.id, True)}
+
+
+async def test_sync_group_returns_okta_writes_when_authoritative(db: Db, mocker: MockerFixture) -> None:
+    in_db, in_okta = UserFactory.create_batch(2)
+    group = GroupFactory.create()
+    await _seed_db(db, [in_db, in_okta], [group], [(in_db.id, group.id)])
+    _mock_okta_group(mocker, group, members=[in_okta], owners=[])
+    add_spy = mocker.patch.object(okta, "add_user_to_group")
+    remove_spy = mocker.patch.object(okta, "remove_user_from_group")
+
+    diff = await sync_group(group.id, sync_group_memberships_authoritatively=True)
+
+    assert diff == GroupSyncDiff(group_id=group.id, okta_members_added=[in_db.id], okta_members_removed=[in_okta.id])
+    add_spy.assert_called_once_with(group.id, in_db.id)
+    remove_spy.assert_called_once_with(group.id, in_okta.id)
+    assert await _active_memberships(db, group.id) == {(in_db.id, False)}
+
+
+async def test_sync_group_deleted_in_okta(db: Db, mocker: MockerFixture) -> None:
+    group = GroupFactory.create()
+    await _seed_db(db, [], [group], [])
+    mocker.patch.object(okta, "get_group", side_effect=OktaResourceNotFoundError("not found"))
+    mocker.patch.object(okta, "list_groups_with_active_rules", return_value={})
+
+    diff = await sync_group(group.id)
+
+    assert diff == GroupSyncDiff(group_id=group.id, group_changed=True, group_deleted=True)
+
+
+async def test_sync_user_returns_diff(db: Db, mocker: MockerFixture) -> None:
+    user = UserFactory.create()
+    mocker.patch.object(okta, "get_user_schema", return_value=UserSchema(UserSchemaFactory.create()))
+    get_user_spy = mocker.patch.object(okta, "get_user", return_value=User(user))
+
+    assert await sync_user(user.id) == UserSyncDiff(user_id=user.id, created=True)
+    assert await sync_user(user.id) == UserSyncDiff(user_id=user.id)
+
+    user.profile.last_name = "Changed"
+    get_user_spy.return_value = User(user)
+    assert await sync_user(user.id) == UserSyncDiff(user_id=user.id, updated=True)
+
+    get_user_spy.side_effect = OktaResourceNotFoundError("not found")
+    assert await sync_user(user.id) == UserSyncDiff(user_id=user.id, deleted=True)
+
+
+async def test_resync_group(client: AsyncClient, db: Db, mocker: MockerFixture, mock_user: Any, url_for: Any) -> None:
+    member = UserFactory.create()
+    group = GroupFactory.create()
+    await _seed_db(db, [member], [group], [])
+    _mock_okta_group(mocker, group, members=[member], owners=[])
+
+    group_name = Group(group).okta_group_values({})["name"]
+    rep = await client.post(url_for("api-groups.group_resync_by_id", group_id=group_name))
+    assert rep.status_code == 200
+    data = rep.json()
+    assert data["group_id"] == group.id
+    assert data["members_added"] == [member.id]
+    assert data["okta_members_added"] == []
+    assert await _active_memberships(db, group.id) == {(member.id, False)}
+
+    rep = await client.post(url_for("api-groups.group_resync_by_id", group_id="missing"))
+    assert rep.status_code == 404
+
+    mock_user(await OktaUserFactory.create_async())
+    rep = await client.post(url_for("api-groups.group_resync_by_id", group_id=group.id))
+    assert rep.status_code == 403
+
+
+async def test_resolve_group_id_prefers_active_then_latest_deleted(db: Db) -> None:
+    older_deleted, newer_deleted = await OktaGroupFactory.create_batch_async(2, name="Resolved")
+    older_deleted.deleted_at = datetime(2024, 1, 1)
+    newer_deleted.deleted_at = datetime(2024, 6, 1)
+    await db.session.commit()
+
+    assert await resolve_group_id("Resolved") == newer_deleted.id
+    assert await resolve_group_id(older_deleted.id) == older_deleted.id
+
+    active = await OktaGroupFactory.create_async(name="Resolved")
+    await db.session.commit()
+
+    assert await resolve_group_id("Resolved") == active.id
+    assert await resolve_group_id("Missing") is None
+
+
+async def test_sync_targets_resolves_names_and_emails(
+    db: Db, mocker: MockerFixture, capsys: pytest.CaptureFixture[str]
+) -> None:
+    user = UserFactory.create()
+    group = GroupFactory.create()
+    await _seed_db(db, [user], [group], [])
+    _mock_okta_group(mocker, group, members=[user], owners=[])
+    mocker.patch.object(okta, "get_user_schema", return_value=UserSchema(UserSchemaFactory.create()))
+    get_user_spy = mocker.patch.object(okta, "get_user", return_value=User(user))
+    get_group_spy = okta.get_group
+
+    await _sync_targets(
+        (Group(group).okta_group_values({})["name"],),
+        (user.profile.login.upper(),),
+        sync_groups_authoritatively=False,
+        sync_group_memberships_authoritatively=False,
+        okta_write_concurrency=10,
+    )
+
+    get_user_spy.assert_called_once_with(user.id)
+    get_group_spy.assert_called_once_with(group.id)  # type: ignore[attr-defined]
+    user_diff, group_diff = (json.loads(line) for line in capsys.readouterr().out.splitlines())
+    assert user_diff["user_id"] == user.id
+    assert group_diff["group_id"] == group.id
+    assert group_diff["members_added"] == [user.id]
+
+
+async def test_resync_group_keeps_owners_without_group_owners_api(
+    client: AsyncClient, db: Db, mocker: MockerFixture, capsys: pytest.CaptureFixture[str], url_for: Any
+) -> None:
+    member, owner = UserFactory.create_batch(2)
+    group = GroupFactory.create()
+    await _seed_db(db, [member, owner], [group], [(member.id, group.id)])
+    async with AsyncSession(db.engine) as session:
+        session.add(OktaUserGroupMember(user_id=owner.id, group_id=group.id, is_owner=True))
+        await session.commit()
+    _mock_okta_group(mocker, group, members=[member], owners=[])
+    mocker.patch.object(settings, "OKTA_USE_GROUP_OWNERS_API", False)
+
+    rep = await client.post(url_for("api-groups.group_resync_by_id", group_id=group.id))
+    assert rep.status_code == 200
+    assert rep.json()["owners_removed"] == []
+
+    await _sync_targets(
+        (group.id,),
+        (),
+        sync_groups_authoritatively=False,
+        sync_group_memberships_authoritatively=False,
+        okta_write_concurrency=10,
+    )
+    assert json.loads(capsys.readouterr().out)["owners_removed"] == []
+
+    okta.list_owners_for_group.assert_not_called()  # type: ignore[attr-defined]
+    assert await _active_memberships(db, group.id) == {(member.id, False), (owner.id, True)}
@@ -14,6 +14,7 @@ from api.services import okta
 from api.services.okta_service import Group
 from api.syncer import sync_groups
 from tests.factories import GroupFactory
+from tests.helpers import okta_pages
 
 
 async def test_group_sync_no_changes(db: Db, mocker: MockerFixture) -> None:
@@ -148,12 +149,13 @@ async def test_group_sync_externally_managed_group_in_okta(db: Db, mocker: Mocke
         test_rule_conditions = OktaGroupRuleConditionsType()
         test_rule_conditions.expression = test_rule_expression
         test_rule = OktaGroupRuleType()
+        test_rule.id = "0pr1"
         test_rule.name = "Test"
         test_rule.conditions = test_rule_conditions
         mocker.patch.object(
             okta, "list_groups_with_active_rules", return_value={externally_managed_group.id: [test_rule]}
         )
-        mocker.patch.object(okta, "list_groups", return_value=[Group(g) for g in groups_in_okta])
+        mocker.patch.object(okta, "iter_groups", side_effect=okta_pages([Group(g) for g in groups_in_okta]))
         await sync_groups(False)
         new_db_groups = list((await session.scalars(select(OktaGroup))).all())
 
@@ -164,6 +166,44 @@ async def test_group_sync_externally_managed_group_in_okta(db: Db, mocker: Mocke
     assert external_group_entry.externally_managed_data == {"Test": 'user.department equals "Test"'}
 
 
+async def test_group_sync_skips_unchanged_groups(db: Db, mocker: MockerFixture) -> None:
+    groups_in_okta = GroupFactory.create_batch(2)
+    initial_db_groups = await seed_db(db, groups_in_okta)
+    groups_in_okta[0].profile.actual_instance.description = "changed"
+    groups_in_okta.append(await GroupFactory.create_access_owner_group())
+
+    new_db_groups = await run_sync(db, mocker, groups_in_okta, act_as_authority=False)
+
+    changed_group = get_group_by_id(new_db_groups, groups_in_okta[0].id)
+    assert changed_group is not None
+    assert changed_group.description == "changed"
+    assert changed_group.okta_profile_hash != get_group_by_id(initial_db_groups, groups_in_okta[0].id).okta_profile_hash
+    unchanged_group = get_group_by_id(new_db_groups, groups_in_okta[1].id)
+    assert unchanged_group is not None
+    assert unchanged_group.updated_at == get_group_by_id(initial_db_groups, groups_in_okta[1].id).updated_at
+
+
+async def test_group_sync_rewrites_group_changed_outside_sync(db: Db, mocker: MockerFixture) -> None:
+    groups_in_okta = GroupFactory.create_batch(1)
+    await seed_db(db, groups_in_okta)
+    groups_in_okta.append(await GroupFactory.create_access_owner_group())
+
+    # Changing a synced column outside the syncer clears the stored hash
+    async with AsyncSession(db.engine) as session:
+        db_group = await session.get(OktaGroup, groups_in_okta[0].id)
+        db_group.name = "renamed in Access"
+        await session.commit()
+        await session.refresh(db_group)
+        assert db_group.okta_profile_hash is None
+
+    new_db_groups = await run_sync(db, mocker, groups_in_okta, act_as_authority=False)
+
+    db_group = get_group_by_id(new_db_groups, groups_in_okta[0].id)
+    assert db_group is not None
+    assert db_group.name == groups_in_okta[0].profile.actual_instance.name
+    assert db_group.okta_profile_hash is not None
+
+
 async def seed_db(db: Db, groups: list[OktaGroup]) -> list[OktaGroup]:
     async with AsyncSession(db.engine) as session:
         session.add_all([Group(g).update_okta_group(OktaGroup(), {}) for g in groups])
@@ -176,7 +216,7 @@ async def run_sync(
 ) -> list[OktaGroup]:
     async with AsyncSession(db.engine) as session:
         mocker.patch.object(okta, "list_groups_with_active_rules", return_value={})
-        mocker.patch.object(okta, "list_groups", return_value=[Group(g) for g in okta_groups])
+        mocker.patch.object(okta, "iter_groups", side_effect=okta_pages([Group(g) for g in okta_groups]))
         await sync_groups(act_as_authority)
         return list((await session.scalars(select(OktaGroup))).all())
 
@@ -0,0 +1,118 @@
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock
+
+import pytest
+from okta.request_executor import RequestExecutor
+
+from api.services.okta_service import OktaService, OktaTransientError, RateLimitStatus, observe_rate_limits
+from tests.okta_emulator import OktaEmulator, okta_client_env
+
+
+@pytest.fixture
+async def emulator(monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[OktaEmulator]:
+    emulator = OktaEmulator()
+    async with emulator.serving() as url:
+        for name, value in okta_client_env(url).items():
+            monkeypatch.setenv(name, value)
+        yield emulator
+
+
+@pytest.fixture
+def okta(emulator: OktaEmulator) -> OktaService:
+    service = OktaService()
+    service.initialize("okta-emulator.local", "okta-emulator-token", use_group_owners_api=True, org_url=emulator.url)
+    return service
+
+
+async def test_lists_page_through_the_emulator(emulator: OktaEmulator, okta: OktaService) -> None:
+    emulator.populate(users=450, groups=30, mean_group_size=300)
+    largest_group = max(emulator.members, key=lambda group_id: len(emulator.members[group_id]))
+
+    users = await okta.list_users()
+    groups = await okta.list_groups()
+    members = await okta.list_users_for_group(largest_group)
+    owners = await okta.list_owners_for_group(largest_group)
+
+    assert [user.id for user in users] == sorted(emulator.users)
+    assert [group.id for group in groups] == sorted(emulator.groups)
+    assert {member.id for member in members} == emulator.members[largest_group]
+    assert {owner.id for owner in owners} == emulator.owners[largest_group]
+    # 450 users at 200 a page
+    assert emulator.requests["list_users"] == 3
+
+
+async def test_filters_users_by_last_updated(emulator: OktaEmulator, okta: OktaService) -> None:
+    emulator.populate(users=5, groups=0)
+    changed = sorted(emulator.users)[2]
+    emulator.update_user(changed, firstName="Renamed")
+
+    users = await okta.list_users(query_params={"filter": 'lastUpdated gt "2024-06-01T00:00:00.000Z"'})
+
+    assert [(user.id, user.profile.first_name) for user in users] == [(changed, "Renamed")]
+
+
+async def test_rejects_an_unsupported_filter(emulator: OktaEmulator, okta: OktaService) -> None:
+    emulator.add_group()
+
+    with pytest.raises(Exception, match="E0000031"):
+        await okta.list_groups(query_params={"filter": 'profile.name sw "Group"'})
+
+
+async def test_membership_and_ownership_mutations(emulator: OktaEmulator, okta: OktaService) -> None:
+    group_id = emulator.add_group()
+    user_id = emulator.add_user()
+
+    await okta.add_user_to_group(group_id, user_id)
+    await okta.add_owner_to_group(group_id, user_id)
+    # Okta rejects a repeat owner assignment, which the service ignores
+    await okta.add_owner_to_group(group_id, user_id)
+    assert emulator.members[group_id] == {user_id}
+    assert emulator.owners[group_id] == {user_id}
+
+    await okta.remove_user_from_group(group_id, user_id)
+    await okta.remove_owner_from_group(group_id, user_id)
+    assert emulator.members[group_id] == set()
+    assert emulator.owners[group_id] == set()
+
+
+async def test_reports_rate_limit_headers(emulator: OktaEmulator, okta: OktaService) -> None:
+    emulator.rate_limit = 50
+    emulator.populate(users=10, groups=0)
+    statuses: list[RateLimitStatus] = []
+
+    with observe_rate_limits(statuses.append):
+        await okta.list_users()
+
+    assert [(status.limit, status.remaining) for status in statuses] == [(50, 49)]
+
+
+async def test_exhausted_rate_limit_surfaces_as_transient(
+    emulator: OktaEmulator, okta: OktaService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Skip the SDK's wait for the rate limit to reset between its retries
+    backoff = AsyncMock()
+    monkeypatch.setattr(RequestExecutor, "pause_for_backoff", backoff)
+    emulator.rate_limit = 1
+    emulator.populate(users=1, groups=1)
+
+    await okta.list_users()
+    await okta.list_groups()
+    with pytest.raises(OktaTransientError):
+        await okta.list_users()
+
+    # Every request after the first, the SDK's retries included, hit the limit
+    assert emulator.throttled["list_users"] == emulator.requests["list_users"] - 1 > 1
+    backoff.assert_awaited()
+
+
+async def test_injected_throttling_is_retried(
+    emulator: OktaEmulator, okta: OktaService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(RequestExecutor, "pause_for_backoff", AsyncMock())
+    emulator.throttle_rate = 0.3
+    emulator.populate(users=1000, groups=0)
+
+    users = await okta.list_users()
+
+    assert len(users) == 1000
+    assert sum(emulator.throttled.values()) > 0
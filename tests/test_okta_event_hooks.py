@@ -0,0 +1,308 @@
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.config import settings
+from api.extensions import Db
+from api.models import OktaEventHookEvent, OktaGroup, OktaUser, OktaUserGroupMember
+from api import okta_events
+from api.okta_events import apply_queued_okta_events, sync_okta_events
+from api.services import okta
+from api.services.okta_request_budget import RequestPriority, current_request_priority
+from api.services.okta_service import Group, OktaResourceNotFoundError, User, UserSchema
+from tests.factories import GroupFactory, UserFactory, UserSchemaFactory
+
+EVENT_HOOK_URL = "/api/okta-event-hooks"
+SECRET = "okta-event-hook-secret"
+
+
+@pytest.fixture(autouse=True)
+def _forget_group_rules(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Each test mocks its own group rules
+    monkeypatch.setattr(okta_events, "_cached_group_rules", None)
+
+
+def _delivery(*events: dict[str, Any]) -> dict[str, Any]:
+    return {"eventType": "com.okta.event_hook", "data": {"events": list(events)}}
+
+
+def _event(uuid: str, event_type: str, *, user_id: str | None = None, group_id: str | None = None) -> dict[str, Any]:
+    target = []
+    if user_id is not None:
+        target.append({"id": user_id, "type": "User", "alternateId": "someone@example.com"})
+    if group_id is not None:
+        target.append({"id": group_id, "type": "UserGroup", "displayName": "Some group"})
+    return {"uuid": uuid, "eventType": event_type, "published": "2024-06-01T12:00:00.000Z", "target": target}
+
+
+async def _seed_db(db: Db, users: list[Any], groups: list[Any]) -> None:
+    async with AsyncSession(db.engine) as session:
+        session.add_all([Group(g).update_okta_group(OktaGroup(), {}) for g in groups])
+        session.add_all([User(u).update_okta_user(OktaUser(), {}) for u in users])
+        await session.commit()
+
+
+async def _queued_events(db: Db) -> list[OktaEventHookEvent]:
+    async with AsyncSession(db.engine) as session:
+        return list((await session.scalars(select(OktaEventHookEvent))).all())
+
+
+async def test_verification_echoes_challenge(client: httpx.AsyncClient, mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "OKTA_EVENT_HOOK_SECRET", SECRET)
+
+    rep = await client.get(
+        EVENT_HOOK_URL, headers={"Authorization": SECRET, "X-Okta-Verification-Challenge": "challenge"}
+    )
+
+    assert rep.status_code == 200
+    assert rep.json() == {"verification": "challenge"}
+
+
+async def test_disabled_without_secret(client: httpx.AsyncClient, mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "OKTA_EVENT_HOOK_SECRET", None)
+
+    rep = await client.post(EVENT_HOOK_URL, json=_delivery(), headers={"Authorization": ""})
+
+    assert rep.status_code == 404
+
+
+async def test_rejects_wrong_secret(client: httpx.AsyncClient, db: Db, mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "OKTA_EVENT_HOOK_SECRET", SECRET)
+    event = _event("event-1", "group.user_membership.add", user_id="user", group_id="group")
+
+    rep = await client.post(EVENT_HOOK_URL, json=_delivery(event), headers={"Authorization": "wrong"})
+    assert rep.status_code == 401
+    rep = await client.post(EVENT_HOOK_URL, json=_delivery(event))
+    assert rep.status_code == 401
+
+    assert await _queued_events(db) == []
+
+
+async def test_queues_relevant_events_once(client: httpx.AsyncClient, db: Db, mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "OKTA_EVENT_HOOK_SECRET", SECRET)
+    apply_spy = mocker.patch("api.routers.okta_event_hooks.apply_queued_okta_events")
+    delivery = _delivery(
+        _event("event-1", "group.user_membership.add", user_id="user", group_id="group"),
+        _event("event-2", "user.session.start", user_id="user"),
+    )
+
+    rep = await client.post(EVENT_HOOK_URL, json=delivery, headers={"Authorization": SECRET})
+    assert rep.status_code == 200
+    assert rep.json() == {"queued": 1}
+    # Okta redelivers an event it didn't see acknowledged
+    rep = await client.post(EVENT_HOOK_URL, json=delivery, headers={"Authorization": SECRET})
+    assert rep.status_code == 200
+
+    events = await _queued_events(db)
+    assert [(event.id, event.event_type, event.user_id, event.group_id) for event in events] == [
+        ("event-1", "group.user_membership.add", "user", "group")
+    ]
+    assert apply_spy.call_count == 2
+
+
+async def test_membership_event_reconciles_group(client: httpx.AsyncClient, db: Db, mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "OKTA_EVENT_HOOK_SECRET", SECRET)
+    okta_user = UserFactory.create()
+    okta_group = GroupFactory.create()
+    await _seed_db(db, [okta_user], [okta_group])
+    get_group_spy = mocker.patch.object(okta, "get_group", return_value=Group(okta_group))
+    mocker.patch.object(okta, "list_users_for_group", return_value=[User(okta_user)])
+    mocker.patch.object(okta, "list_owners_for_group", return_value=[])
+    mocker.patch.object(okta, "list_groups_with_active_rules", return_value={})
+    get_user_spy = mocker.patch.object(okta, "get_user")
+
+    rep = await client.post(
+        EVENT_HOOK_URL,
+        json=_delivery(_event("event-1", "group.user_membership.add", user_id=okta_user.id, group_id=okta_group.id)),
+        headers={"Authorization": SECRET},
+    )
+
+    assert rep.status_code == 200
+    get_group_spy.assert_called_once_with(okta_group.id)
+    # The member is already in the DB, so only the group is reconciled
+    get_user_spy.assert_not_called()
+    async with AsyncSession(db.engine) as session:
+        memberships = (await session.scalars(select(OktaUserGroupMember))).all()
+        assert [
+            (m.user_id, m.group_id, m.is_owner, m.ended_at) for m in memberships if m.group_id == okta_group.id
+        ] == [(okta_user.id, okta_group.id, False, None)]
+    assert await _queued_events(db) == []
+
+
+async def test_membership_event_syncs_new_user_first(db: Db, mocker: MockerFixture) -> None:
+    okta_user = UserFactory.create()
+    okta_group = GroupFactory.create()
+    await _seed_db(db, [], [okta_group])
+    mocker.patch.object(okta, "get_user", return_value=User(okta_user))
+    mocker.patch.object(okta, "get_user_schema", return_value=UserSchema(UserSchemaFactory.create()))
+    mocker.patch.object(okta, "get_group", return_value=Group(okta_group))
+    mocker.patch.object(okta, "list_users_for_group", return_value=[User(okta_user)])
+    mocker.patch.object(okta, "list_owners_for_group", return_value=[])
+    mocker.patch.object(okta, "list_groups_with_active_rules", return_value={})
+    db.session.add(
+        OktaEventHookEvent(
+            id="event-1", event_type="group.user_membership.add", user_id=okta_user.id, group_id=okta_group.id
+        )
+    )
+    await db.session.commit()
+
+    applied = await sync_okta_events(sync_groups_authoritatively=False, sync_group_memberships_authoritatively=False)
+
+    assert applied == 1
+    async with AsyncSession(db.engine) as session:
+        assert (await session.get(OktaUser, okta_user.id)) is not None
+        memberships = (
+            await session.scalars(select(OktaUserGroupMember).where(OktaUserGroupMember.group_id == okta_group.id))
+        ).all()
+        assert [m.user_id for m in memberships] == [okta_user.id]
+    assert await _queued_events(db) == []
+
+
+async def test_membership_event_keeps_owners_without_group_owners_api(db: Db, mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "OKTA_USE_GROUP_OWNERS_API", False)
+    okta_user, okta_owner = UserFactory.create_batch(2)
+    okta_group = GroupFactory.create()
+    await _seed_db(db, [okta_user, okta_owner], [okta_group])
+    db.session.add(OktaUserGroupMember(user_id=okta_owner.id, group_id=okta_group.id, is_owner=True))
+    db.session.add(
+        OktaEventHookEvent(
+            id="event-1", event_type="group.user_membership.add", user_id=okta_user.id, group_id=okta_group.id
+        )
+    )
+    await db.session.commit()
+    mocker.patch.object(okta, "get_group", return_value=Group(okta_group))
+    mocker.patch.object(okta, "list_users_for_group", return_value=[User(okta_user)])
+    list_owners_spy = mocker.patch.object(okta, "list_owners_for_group", return_value=[])
+    mocker.patch.object(okta, "list_groups_with_active_rules", return_value={})
+
+    applied = await sync_okta_events(sync_groups_authoritatively=False, sync_group_memberships_authoritatively=False)
+
+    assert applied == 1
+    list_owners_spy.assert_not_called()
+    async with AsyncSession(db.engine) as session:
+        memberships = (
+            await session.scalars(
+                select(OktaUserGroupMember)
+                .where(OktaUserGroupMember.group_id == okta_group.id)
+                .where(OktaUserGroupMember.ended_at.is_(None))
+            )
+        ).all()
+        assert {(m.user_id, m.is_owner) for m in memberships} == {(okta_user.id, False), (okta_owner.id, True)}
+
+
+async def test_lifecycle_events_delete_locally(db: Db, mocker: MockerFixture) -> None:
+    okta_user = UserFactory.create()
+    okta_group = GroupFactory.create()
+    await _seed_db(db, [okta_user], [okta_group])
+    mocker.patch.object(okta, "get_user", side_effect=OktaResourceNotFoundError("not found"))
+    mocker.patch.object(okta, "get_group", side_effect=OktaResourceNotFoundError("not found"))
+    mocker.patch.object(okta, "list_groups_with_active_rules", return_value={})
+    db.session.add_all(
+        [
+            OktaEventHookEvent(id="event-1", event_type="user.lifecycle.delete.completed", user_id=okta_user.id),
+            OktaEventHookEvent(id="event-2", event_type="group.lifecycle.delete", group_id=okta_group.id),
+        ]
+    )
+    await db.session.commit()
+
+    applied = await sync_okta_events(sync_groups_authoritatively=False, sync_group_memberships_authoritatively=False)
+
+    assert applied == 2
+    async with AsyncSession(db.engine) as session:
+        user = await session.get(OktaUser, okta_user.id)
+        group = await session.get(OktaGroup, okta_group.id)
+        assert user is not None and user.deleted_at is not None
+        assert group is not None and group.deleted_at is not None
+
+
+async def test_failed_event_stays_queued(db: Db, mocker: MockerFixture) -> None:
+    okta_group = GroupFactory.create()
+    await _seed_db(db, [], [okta_group])
+    mocker.patch.object(okta, "get_group", side_effect=RuntimeError("boom"))
+    mocker.patch.object(okta, "list_groups_with_active_rules", return_value={})
+    db.session.add(OktaEventHookEvent(id="event-1", event_type="group.lifecycle.create", group_id=okta_group.id))
+    await db.session.commit()
+
+    applied = await sync_okta_events(sync_groups_authoritatively=False, sync_group_memberships_authoritatively=False)
+
+    assert applied == 0
+    # Claimed until the claim times out, then retried
+    events = await _queued_events(db)
+    assert [(event.id, event.attempts) for event in events] == [("event-1", 1)]
+    assert events[0].claimed_at is not None
+
+
+async def test_group_held_by_another_claim_stays_queued(db: Db, mocker: MockerFixture) -> None:
+    okta_group, other_okta_group = GroupFactory.create_batch(2)
+    await _seed_db(db, [], [okta_group, other_okta_group])
+    mocker.patch.object(okta, "get_group", return_value=Group(other_okta_group))
+    mocker.patch.object(okta, "list_users_for_group", return_value=[])
+    mocker.patch.object(okta, "list_groups_with_active_rules", return_value={})
+    db.session.add_all(
+        [
+            # Another delivery is reconciling the group
+            OktaEventHookEvent(
+                id="event-1",
+                event_type="group.lifecycle.create",
+                group_id=okta_group.id,
+                claimed_at=datetime.now(timezone.utc),
+                claimed_by="another-delivery",
+                attempts=1,
+            ),
+            OktaEventHookEvent(id="event-2", event_type="group.user_membership.add", group_id=okta_group.id),
+            OktaEventHookEvent(id="event-3", event_type="group.lifecycle.create", group_id=other_okta_group.id),
+        ]
+    )
+    await db.session.commit()
+
+    applied = await sync_okta_events(sync_groups_authoritatively=False, sync_group_memberships_authoritatively=False)
+
+    assert applied == 1
+    assert okta.get_group.call_args_list == [mocker.call(other_okta_group.id)]
+    events = await _queued_events(db)
+    assert sorted((event.id, event.claimed_by) for event in events) == [
+        ("event-1", "another-delivery"),
+        ("event-2", None),
+    ]
+
+
+async def test_applies_queue_at_batch_priority(mocker: MockerFixture) -> None:
+    priorities = []
+
+    async def _sync_okta_events(**kwargs: Any) -> int:
+        priorities.append(current_request_priority())
+        return 0
+
+    mocker.patch.object(okta_events, "sync_okta_events", side_effect=_sync_okta_events)
+
+    await apply_queued_okta_events()
+
+    assert priorities == [RequestPriority.BATCH]
+
+
+async def test_group_rules_listed_once_per_ttl(db: Db, mocker: MockerFixture) -> None:
+    okta_group = GroupFactory.create()
+    await _seed_db(db, [], [okta_group])
+    mocker.patch.object(okta, "get_group", return_value=Group(okta_group))
+    mocker.patch.object(okta, "list_users_for_group", return_value=[])
+    list_rules_spy = mocker.patch.object(okta, "list_groups_with_active_rules", return_value={})
+
+    async def apply(event_id: str) -> None:
+        db.session.add(OktaEventHookEvent(id=event_id, event_type="group.lifecycle.create", group_id=okta_group.id))
+        await db.session.commit()
+        assert (
+            await sync_okta_events(sync_groups_authoritatively=False, sync_group_memberships_authoritatively=False) == 1
+        )
+
+    await apply("event-1")
+    await apply("event-2")
+    assert list_rules_spy.call_count == 1
+
+    mocker.patch.object(settings, "OKTA_EVENT_HOOK_GROUP_RULES_TTL_SECONDS", 0)
+    await apply("event-3")
+    assert list_rules_spy.call_count == 2
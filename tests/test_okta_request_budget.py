@@ -0,0 +1,131 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from api.services.okta_request_budget import (
+    OktaRequestBudget,
+    RequestPriority,
+    current_request_priority,
+    endpoint_family,
+    okta_request_priority,
+)
+from api.services.okta_service import OktaService
+from tests.factories import UserFactory
+
+
+@pytest.mark.parametrize(
+    "method_name, family",
+    [
+        ("list_users", "users"),
+        ("get_user", "users"),
+        ("list_groups", "groups"),
+        ("delete_group", "groups"),
+        ("list_group_users", "group_members"),
+        ("list_group_rules", "group_rules"),
+        ("list_group_owners", "group_owners"),
+        ("delete_group_owner", "group_owners"),
+        ("assign_user_to_group", "group_members"),
+        ("unassign_user_from_group", "group_members"),
+        ("list_group_push_mappings", "apps"),
+        ("get_user_schema", "users"),
+        ("list_applications", "other"),
+    ],
+)
+def test_endpoint_family(method_name: str, family: str) -> None:
+    assert endpoint_family(method_name) == family
+
+
+def _budget(
+    tmp_path: Path, *, rate: float = 0.001, burst: int = 4, interactive_reserve: float = 0.5
+) -> OktaRequestBudget:
+    return OktaRequestBudget(
+        str(tmp_path / "okta_budget.sqlite"), rate=rate, burst=burst, interactive_reserve=interactive_reserve
+    )
+
+
+@pytest.mark.parametrize(
+    "rate, burst, interactive_reserve",
+    [
+        (0.0, 4, 0.5),
+        (-1.0, 4, 0.5),
+        (1.0, 0, 0.0),
+        (1.0, 4, -0.1),
+        # Batch requests would have to leave every token of the bucket
+        (1.0, 4, 0.8),
+        (1.0, 1, 0.5),
+    ],
+)
+def test_rejects_settings_that_would_stall_requests(
+    tmp_path: Path, rate: float, burst: int, interactive_reserve: float
+) -> None:
+    with pytest.raises(ValueError):
+        _budget(tmp_path, rate=rate, burst=burst, interactive_reserve=interactive_reserve)
+
+
+def test_bucket_empties_then_asks_caller_to_wait(tmp_path: Path) -> None:
+    budget = _budget(tmp_path, interactive_reserve=0.0)
+
+    assert [budget._try_take("users", RequestPriority.INTERACTIVE) for _ in range(4)] == [0.0] * 4
+    assert budget._try_take("users", RequestPriority.INTERACTIVE) > 0
+    # Families have their own buckets.
+    assert budget._try_take("groups", RequestPriority.INTERACTIVE) == 0.0
+
+
+def test_batch_requests_leave_reserve_for_interactive(tmp_path: Path) -> None:
+    budget = _budget(tmp_path)
+
+    assert [budget._try_take("users", RequestPriority.BATCH) for _ in range(2)] == [0.0] * 2
+    assert budget._try_take("users", RequestPriority.BATCH) > 0
+    # The reserved half of the bucket is still there for interactive requests.
+    assert [budget._try_take("users", RequestPriority.INTERACTIVE) for _ in range(2)] == [0.0] * 2
+    assert budget._try_take("users", RequestPriority.INTERACTIVE) > 0
+
+
+def test_budget_is_shared_through_the_store(tmp_path: Path) -> None:
+    # Two instances on the same file stand in for two processes.
+    web, syncer = _budget(tmp_path, interactive_reserve=0.0), _budget(tmp_path, interactive_reserve=0.0)
+
+    for _ in range(2):
+        assert web._try_take("users", RequestPriority.INTERACTIVE) == 0.0
+        assert syncer._try_take("users", RequestPriority.BATCH) == 0.0
+    assert web._try_take("users", RequestPriority.INTERACTIVE) > 0
+
+
+async def test_acquire_waits_for_refill(tmp_path: Path) -> None:
+    budget = _budget(tmp_path, rate=100.0, burst=1, interactive_reserve=0.0)
+
+    with patch("api.services.okta_request_budget.asyncio.sleep", wraps=asyncio.sleep) as sleep:
+        await budget.acquire("users")
+        await budget.acquire("users")
+
+    assert sleep.await_count >= 1
+
+
+async def test_acquire_uses_context_priority(tmp_path: Path) -> None:
+    budget = _budget(tmp_path)
+    budget._try_take = MagicMock(return_value=0.0)  # type: ignore[method-assign]
+
+    assert current_request_priority() == RequestPriority.INTERACTIVE
+    with okta_request_priority(RequestPriority.BATCH):
+        await budget.acquire("users")
+    await budget.acquire("users")
+
+    assert [call.args for call in budget._try_take.call_args_list] == [
+        ("users", RequestPriority.BATCH),
+        ("users", RequestPriority.INTERACTIVE),
+    ]
+
+
+async def test_wrapped_client_calls_take_from_budget() -> None:
+    budget = MagicMock(spec=OktaRequestBudget)
+    budget.acquire = AsyncMock()
+    service = OktaService()
+    service.initialize("fake.domain", "fake.token", request_budget=budget)
+
+    success = (UserFactory(), MagicMock(status_code=200, headers={}), None)
+    with patch("okta.client.Client.get_user", AsyncMock(return_value=success)):
+        await service.get_user("okta_id")
+
+    budget.acquire.assert_awaited_once_with("users")
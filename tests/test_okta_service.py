@@ -1,5 +1,7 @@
 import asyncio
+import gc
 import json
+import tracemalloc
 from contextlib import asynccontextmanager
 from typing import Any, Optional
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -13,16 +15,24 @@ from okta.models.user_schema import UserSchema as OktaUserSchemaType
 
 from okta.errors.okta_api_error import OktaAPIError
 
+from api.services import okta_service
 from api.services.okta_service import (
     OKTA_TRANSIENT_RETRIES,
+    CompactGroup,
+    CompactUser,
+    Group,
+    ManagedGroupIndex,
     OktaResourceNotFoundError,
     OktaService,
     OktaTransientError,
+    RateLimitStatus,
+    User,
     UserSchema,
     _WrapperClient,
     is_managed_group,
+    observe_rate_limits,
 )
-from tests.factories import UserFactory
+from tests.factories import GroupFactory, UserFactory
 
 
 def _user_schema(base_properties: dict[str, Any], custom_properties: Optional[dict[str, Any]] = None) -> Any:
@@ -90,6 +100,113 @@ def test_is_managed_group_with_allow_discord_access_undefined() -> None:
         assert result is True
 
 
+def test_compact_user_matches_user() -> None:
+    okta_user = UserFactory.build(
+        status="DEPROVISIONED",
+        statusChanged="2024-01-01T00:00:00.000Z",
+        profile={
+            "login": "login@example.com",
+            "firstName": "First",
+            "lastName": "Last",
+            "employeeNumber": "123",
+            "managerId": "456",
+            "team": "Infra",
+        },
+    )
+    user_attrs_to_titles = {"login": "Username", "team": "Team"}
+
+    user, compact_user = User(okta_user), CompactUser(okta_user)
+
+    assert compact_user.type_id == user.type_id
+    assert compact_user.profile.manager_id == user.profile.manager_id
+    assert compact_user.get_deleted_at() == user.get_deleted_at()
+    assert compact_user.okta_user_values(user_attrs_to_titles) == user.okta_user_values(user_attrs_to_titles)
+    # The profile keeps the standard fields' order, so the stored JSON is unchanged too
+    assert list(compact_user.okta_user_values(user_attrs_to_titles)["profile"]) == list(
+        user.okta_user_values(user_attrs_to_titles)["profile"]
+    )
+    with pytest.raises(AttributeError):
+        compact_user.credentials
+
+
+def test_untyped_user_has_no_type_id() -> None:
+    okta_user = UserFactory.build(type=None)
+
+    assert User(okta_user).type_id is None
+    assert CompactUser(okta_user).type_id is None
+
+
+@pytest.mark.parametrize("allow_discord_access", [True, False, "unset"])
+def test_compact_group_matches_group(allow_discord_access: Any) -> None:
+    okta_group = _okta_group(allow_discord_access=allow_discord_access)
+
+    group, compact_group = Group(okta_group), CompactGroup(okta_group)
+
+    assert compact_group.okta_group_values({}) == group.okta_group_values({})
+    assert compact_group.okta_group_values({okta_group.id: []}) == group.okta_group_values({okta_group.id: []})
+    assert is_managed_group(compact_group, {}, "allow_discord_access") == is_managed_group(
+        group, {}, "allow_discord_access"
+    )
+
+
+@pytest.mark.parametrize(
+    "group_type, allow_discord_access, has_rule, expected",
+    [
+        ("OKTA_GROUP", "unset", False, True),
+        ("OKTA_GROUP", "unset", True, False),
+        ("OKTA_GROUP", True, True, True),
+        ("OKTA_GROUP", False, False, False),
+        ("BUILT_IN", "unset", False, False),
+        ("BUILT_IN", True, False, False),
+    ],
+)
+def test_is_managed_group_by_type_and_group_rules(
+    group_type: str, allow_discord_access: Any, has_rule: bool, expected: bool
+) -> None:
+    group = _okta_group(allow_discord_access=allow_discord_access)
+    group.type = group_type
+    group_ids_with_group_rules: dict[str, list[OktaGroupRuleType]] = {group.id: []} if has_rule else {}
+
+    assert is_managed_group(group, group_ids_with_group_rules, "allow_discord_access") is expected
+
+
+def test_managed_group_index_evaluates_each_group_once(mocker) -> None:
+    group = CompactGroup(_okta_group())
+    is_managed_group_spy = mocker.spy(okta_service, "is_managed_group")
+    index = ManagedGroupIndex({group.id: []})
+
+    assert index.is_managed(group) is False
+    assert index.is_managed(group) is False
+    assert is_managed_group_spy.call_count == 1
+
+
+def _retained_bytes(build: Any, count: int = 500) -> int:
+    """The memory still held by ``count`` objects ``build`` returns, once they were all built."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [build() for _ in range(count)]
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del kept
+    return retained
+
+
+@pytest.mark.parametrize(
+    "wrapper, compact, factory", [(User, CompactUser, UserFactory), (Group, CompactGroup, GroupFactory)]
+)
+def test_compact_wrappers_retain_less_memory(wrapper: Any, compact: Any, factory: Any) -> None:
+    wrapped_bytes = _retained_bytes(lambda: wrapper(factory.build()))
+    compact_bytes = _retained_bytes(lambda: compact(factory.build()))
+
+    # A listing's compact objects hold several times less than wrapped SDK
+    # models, even for these minimal factory payloads (~4-7x)
+    assert compact_bytes * 3 < wrapped_bytes, (compact_bytes, wrapped_bytes)
+
+
 async def test_update_group_preserves_custom_attributes() -> None:
     """Test that update_group preserves custom attributes when updating a group."""
     service = OktaService()
@@ -192,6 +309,12 @@ async def test_get_user_schema_resolves_schema_with_unique_attributes() -> None:
     assert result.user_attrs_to_titles()["login"] == "Login"
     mock_client.get_user_schema.assert_awaited_once_with("osc123")
 
+    # A user without a type reads the schema of the default user type
+    with patch.object(service, "_okta_client", return_value=MockOktaClientContext()):
+        await service.get_user_schema(None)
+
+    mock_client.get_user_type.assert_awaited_with("default")
+
 
 async def test_concurrent_calls_use_isolated_clients() -> None:
     """Concurrent Okta calls must each get their own client (and aiohttp session).
@@ -515,6 +638,48 @@ async def test_list_group_push_mappings_follows_pagination(mocker):
     assert client.list_group_push_mappings.await_args_list[1].kwargs["after"] == "CURSOR"
 
 
+async def test_paginate_reports_rate_limit_headers_to_listener(mocker):
+    # Every page's rate-limit headers reach the listener installed for the
+    # current context; pages without them (or outside a listener) are ignored.
+    svc = OktaService()
+    client = _fake_okta_client(mocker, svc)
+    first_page = _list_result([_mapping(id="m1")], next_cursor="CURSOR")
+    first_page[1].headers.update(
+        {"X-Rate-Limit-Limit": "600", "X-Rate-Limit-Remaining": "42", "x-rate-limit-reset": "1700000000"}
+    )
+    client.list_group_push_mappings = AsyncMock(side_effect=[first_page, _list_result([_mapping(id="m2")])])
+
+    statuses: list[RateLimitStatus] = []
+    with observe_rate_limits(statuses.append):
+        await svc.list_group_push_mappings("app-1")
+
+    assert statuses == [RateLimitStatus(limit=600, remaining=42, reset=1700000000)]
+
+
+async def test_iter_group_users_reads_the_next_page_ahead(mocker):
+    # Pages are yielded one at a time, and the next page is already requested
+    # while the caller is still processing the current one.
+    svc = OktaService()
+    client = _fake_okta_client(mocker, svc)
+    users = UserFactory.create_batch(3)
+    client.list_group_users = AsyncMock(
+        side_effect=[
+            _list_result(users[:2], next_cursor="CURSOR"),
+            _list_result(users[2:]),
+        ]
+    )
+
+    pages = []
+    async for page in svc.iter_group_users("group-1"):
+        pages.append([user.id for user in page])
+        await asyncio.sleep(0)
+        assert client.list_group_users.await_count == 2
+
+    assert pages == [[users[0].id, users[1].id], [users[2].id]]
+    assert client.list_group_users.await_args_list[1].args == ("group-1",)
+    assert client.list_group_users.await_args_list[1].kwargs["after"] == "CURSOR"
+
+
 async def test_list_group_push_mappings_requires_app_id():
     svc = OktaService()
     with pytest.raises(ValueError):
@@ -3,11 +3,16 @@ from datetime import UTC, datetime, timedelta
 from pytest_mock import MockerFixture
 from sqlalchemy import select
 
-from api.integrity import verify_and_fix_role_memberships
+from api.integrity import RoleMembershipDiscrepancy, RoleMembershipFixSummary, verify_and_fix_role_memberships
 from api.extensions import Db
 from api.models import OktaGroup, OktaUser, OktaUserGroupMember, RoleGroup
 from api.services import okta
-from tests.factories import OktaUserGroupMemberFactory, RoleGroupMapFactory
+from tests.factories import (
+    OktaGroupFactory,
+    OktaUserFactory,
+    OktaUserGroupMemberFactory,
+    RoleGroupMapFactory,
+)
 from tests.helpers import db_count
 
 
@@ -146,6 +151,8 @@ async def test_missing_user_from_group_membership_with_expiring_role_assignment(
     )
     await db.session.commit()
 
+    member_role_group_map_id = member_role_group_map.id
+    owner_role_group_map_id = owner_role_group_map.id
     # drop identity-map state staled by the ops above (expire_on_commit=False)
     db.session.expire_all()
 
@@ -161,7 +168,7 @@ async def test_missing_user_from_group_membership_with_expiring_role_assignment(
         await db_count(
             db.session,
             select(OktaUserGroupMember)
-            .where(OktaUserGroupMember.role_group_map_id == member_role_group_map.id)
+            .where(OktaUserGroupMember.role_group_map_id == member_role_group_map_id)
             .where(
                 OktaUserGroupMember.ended_at > (datetime.now(UTC) + timedelta(days=1)),
                 OktaUserGroupMember.ended_at < (datetime.now(UTC) + timedelta(days=3)),
@@ -173,7 +180,7 @@ async def test_missing_user_from_group_membership_with_expiring_role_assignment(
         await db_count(
             db.session,
             select(OktaUserGroupMember)
-            .where(OktaUserGroupMember.role_group_map_id == owner_role_group_map.id)
+            .where(OktaUserGroupMember.role_group_map_id == owner_role_group_map_id)
             .where(
                 OktaUserGroupMember.ended_at > (datetime.now(UTC) + timedelta(days=3)),
                 OktaUserGroupMember.ended_at < (datetime.now(UTC) + timedelta(days=5)),
@@ -185,7 +192,7 @@ async def test_missing_user_from_group_membership_with_expiring_role_assignment(
         await db_count(
             db.session,
             select(OktaUserGroupMember)
-            .where(OktaUserGroupMember.role_group_map_id == member_role_group_map.id)
+            .where(OktaUserGroupMember.role_group_map_id == member_role_group_map_id)
             .where(OktaUserGroupMember.ended_at.is_(None)),
         )
         == 0
@@ -194,7 +201,7 @@ async def test_missing_user_from_group_membership_with_expiring_role_assignment(
         await db_count(
             db.session,
             select(OktaUserGroupMember)
-            .where(OktaUserGroupMember.role_group_map_id == owner_role_group_map.id)
+            .where(OktaUserGroupMember.role_group_map_id == owner_role_group_map_id)
             .where(OktaUserGroupMember.ended_at.is_(None)),
         )
         == 0
@@ -407,3 +414,98 @@ async def test_extra_user_from_role_membership_with_direct(
         )
         == 2
     )
+
+
+async def test_dry_run_reports_without_fixing(
+    db: Db, mocker: MockerFixture, role_group: RoleGroup, okta_group: OktaGroup, user: OktaUser
+) -> None:
+    db.session.add(user)
+    db.session.add(role_group)
+    db.session.add(okta_group)
+    role_member = await OktaUserFactory.create_async()
+    await OktaUserGroupMemberFactory.create_async(user_id=role_member.id, group_id=role_group.id)
+    role_group_map = await RoleGroupMapFactory.create_async(
+        role_group_id=role_group.id, group_id=okta_group.id, is_owner=False
+    )
+    await OktaUserGroupMemberFactory.create_async(
+        user_id=user.id, group_id=okta_group.id, role_group_map_id=role_group_map.id
+    )
+    await db.session.commit()
+    okta_spies = [
+        mocker.patch.object(okta, call)
+        for call in ("add_user_to_group", "add_owner_to_group", "remove_user_from_group", "remove_owner_from_group")
+    ]
+    reported: list[RoleMembershipDiscrepancy] = []
+
+    summary = await verify_and_fix_role_memberships(dry_run=True, report=reported.append)
+
+    assert summary == RoleMembershipFixSummary(missing=1, extra=1)
+    assert reported == [
+        RoleMembershipDiscrepancy(
+            kind="missing",
+            role_group_map_id=role_group_map.id,
+            role_group_id=role_group.id,
+            group_id=okta_group.id,
+            is_owner=False,
+            user_id=role_member.id,
+        ),
+        RoleMembershipDiscrepancy(
+            kind="extra",
+            role_group_map_id=role_group_map.id,
+            role_group_id=role_group.id,
+            group_id=okta_group.id,
+            is_owner=False,
+            user_id=user.id,
+        ),
+    ]
+    assert all(spy.call_count == 0 for spy in okta_spies)
+    assert (
+        await db_count(
+            db.session,
+            select(OktaUserGroupMember)
+            .where(OktaUserGroupMember.role_group_map_id == role_group_map.id)
+            .where(OktaUserGroupMember.ended_at.is_(None)),
+        )
+        == 1
+    )
+
+
+async def test_fixes_role_group_maps_in_batches(db: Db, mocker: MockerFixture, role_group: RoleGroup) -> None:
+    db.session.add(role_group)
+    users = await OktaUserFactory.create_batch_async(3)
+    groups = await OktaGroupFactory.create_batch_async(3)
+    for user in users:
+        await OktaUserGroupMemberFactory.create_async(user_id=user.id, group_id=role_group.id)
+    role_group_map_ids = [
+        (await RoleGroupMapFactory.create_async(role_group_id=role_group.id, group_id=group.id, is_owner=False)).id
+        for group in groups
+    ]
+    await db.session.commit()
+    failing_group_id, failing_user_id = groups[2].id, users[0].id
+
+    async def _add_user_to_group(group_id: str, user_id: str) -> None:
+        if (group_id, user_id) == (failing_group_id, failing_user_id):
+            raise RuntimeError("Okta is down")
+
+    add_membership_spy = mocker.patch.object(okta, "add_user_to_group", side_effect=_add_user_to_group)
+    mocker.patch("api.integrity._ROLE_GROUP_MAP_BATCH_SIZE", 2)
+
+    summary = await verify_and_fix_role_memberships(okta_write_concurrency=2)
+
+    assert summary == RoleMembershipFixSummary(missing=9, extra=0, failed_okta_writes=1)
+    assert add_membership_spy.call_count == 9
+    granted = (
+        await db.session.execute(
+            select(OktaUserGroupMember.group_id, OktaUserGroupMember.user_id).where(
+                OktaUserGroupMember.role_group_map_id.in_(role_group_map_ids)
+            )
+        )
+    ).all()
+    # Access Okta didn't grant isn't recorded, so the next run retries it
+    assert len(granted) == 8
+    assert (failing_group_id, failing_user_id) not in granted
+
+    add_membership_spy.side_effect = None
+    summary = await verify_and_fix_role_memberships()
+    assert summary == RoleMembershipFixSummary(missing=1)
+    add_membership_spy.assert_called_with(failing_group_id, failing_user_id)
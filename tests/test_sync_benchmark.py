@@ -0,0 +1,126 @@
+"""End-to-end ``access sync`` timings against a large org served by the Okta emulator.
+
+Opt-in: set ``SYNC_BENCHMARK=1`` (``make benchmark-sync``). The Postgres cases
+also need ``TEST_DATABASE_URI`` pointing at a disposable Postgres database
+(``make benchmark-sync-postgres``); its tables are dropped and recreated for
+each case. Pick one size with ``-k``, e.g. ``-k 10k-users``.
+
+Each case seeds the emulator, creates an empty schema and times, each in a
+subprocess: ``access import-from-okta``, two ``access sync --full`` runs (the
+first also adds the group owners, which the import leaves out), and an
+``access sync --incremental`` after 1% of the org changed. The timings and the
+Okta requests each made are printed (run with ``-s``) and recorded as junit
+properties. ``SYNC_BENCHMARK_OKTA_LATENCY`` adds that many seconds to every
+Okta response.
+"""
+
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from api.extensions import Base
+from tests.okta_emulator import OktaEmulator, okta_client_env
+
+pytestmark = pytest.mark.skipif(not os.environ.get("SYNC_BENCHMARK"), reason="set SYNC_BENCHMARK=1 to run")
+
+ORG_SIZES = [
+    pytest.param(10_000, 5_000, id="10k-users-5k-groups"),
+    pytest.param(50_000, 10_000, id="50k-users-10k-groups"),
+    pytest.param(100_000, 20_000, id="100k-users-20k-groups"),
+]
+
+
+def _postgres_uri() -> str | None:
+    uri = os.environ.get("TEST_DATABASE_URI", "")
+    if not uri.startswith("postgresql"):
+        return None
+    return uri.replace("postgresql+pg8000://", "postgresql+asyncpg://").replace(
+        "postgresql://", "postgresql+asyncpg://", 1
+    )
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def database_uri(request: pytest.FixtureRequest, tmp_path: Path) -> str:
+    if request.param == "sqlite":
+        return f"sqlite+aiosqlite:///{tmp_path / 'access.db'}"
+    uri = _postgres_uri()
+    if uri is None:
+        pytest.skip("set TEST_DATABASE_URI to a Postgres database to benchmark against Postgres")
+    return uri
+
+
+async def _create_schema(uri: str) -> None:
+    engine = create_async_engine(uri)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+    finally:
+        await engine.dispose()
+
+
+def _timed_access(env: dict[str, str], *args: str) -> float:
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "from api.cli import cli; cli()", *args],
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - started
+
+
+def _change_one_percent(emulator: OktaEmulator) -> None:
+    """Rename 1% of the users and move a member of 1% of the groups, for the incremental sync to pick up."""
+    rng = random.Random(1)
+    user_ids = list(emulator.users)
+    for user_id in rng.sample(user_ids, len(user_ids) // 100):
+        emulator.update_user(user_id, lastName="Changed")
+    for group_id in rng.sample(list(emulator.groups), len(emulator.groups) // 100):
+        members = emulator.members[group_id]
+        if members:
+            emulator.remove_member(group_id, next(iter(members)))
+        emulator.add_member(group_id, rng.choice(user_ids))
+
+
+@pytest.mark.parametrize("users,groups", ORG_SIZES)
+def test_sync_benchmark(
+    users: int, groups: int, database_uri: str, record_property: Callable[[str, object], None]
+) -> None:
+    emulator = OktaEmulator(latency_seconds=float(os.environ.get("SYNC_BENCHMARK_OKTA_LATENCY", "0")))
+    emulator.populate(users=users, groups=groups)
+    asyncio.run(_create_schema(database_uri))
+
+    runs: list[tuple[str, Callable[[OktaEmulator], None] | None, tuple[str, ...]]] = [
+        ("import", None, ("import-from-okta",)),
+        # Also adds the group owners, which the import leaves out
+        ("first-full-sync", None, ("sync", "--full")),
+        ("full-sync", None, ("sync", "--full")),
+        ("incremental-sync", _change_one_percent, ("sync", "--incremental")),
+    ]
+    with emulator.serving_in_thread() as url:
+        env = {
+            **os.environ,
+            **okta_client_env(url),
+            "DATABASE_URI": database_uri,
+            "OKTA_USE_GROUP_OWNERS_API": "true",
+        }
+        for name, change_org, args in runs:
+            if change_org is not None:
+                change_org(emulator)
+            emulator.requests.clear()
+            seconds = _timed_access(env, *args)
+            record_property(f"{name}_seconds", round(seconds, 3))
+            record_property(f"{name}_okta_requests", sum(emulator.requests.values()))
+            print(
+                f"\n{database_uri.split(':')[0]}, {users} users / {groups} groups, {name}: {seconds:.1f}s, "
+                f"Okta requests: {dict(emulator.requests)}"
+            )
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+from pytest_mock import MockerFixture
+from sqlalchemy import select
+
+from api import syncer
+from api.extensions import Db
+from api.models import OktaGroup, OktaUser, SyncLedgerEntry
+from api.services import okta
+from api.services.okta_service import Group, OktaTransientError, User, _WrapperClient
+from api.syncer import record_sync_stage, sync_group_memberships, sync_groups
+from tests.factories import GroupFactory, OktaUserFactory, UserFactory
+from tests.helpers import okta_pages
+from tests.test_group_membership_sync import seed_db
+from tests.test_syncer_prefetch import _RecordingMetrics
+
+
+class _FakeOktaClient:
+    async def list_group_users(self, group_id: str, **kwargs: Any) -> tuple[list[Any], None, None]:
+        return [], None, None
+
+
+async def test_record_sync_stage_tallies_membership_sync(
+    db: Db, mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A stage's ledger entry and metrics count its Okta calls, the memberships it
+    added and ended, the groups it skipped and the peak fetch window."""
+    metrics = _RecordingMetrics()
+    monkeypatch.setattr(syncer, "get_metrics_reporter_hook", lambda: metrics)
+    okta_users = UserFactory.create_batch(3)
+    okta_groups = GroupFactory.create_batch(2)
+    await seed_db(db, okta_users, okta_groups)
+    mocker.patch.object(okta, "list_groups", return_value=okta_groups)
+    mocker.patch.object(okta, "list_groups_with_active_rules", return_value={})
+
+    def members_of(*users: User) -> Any:
+        def _list(group_id: str) -> list[User]:
+            if group_id == okta_groups[1].id:
+                raise OktaTransientError("rate limited")
+            return list(users)
+
+        return _list
+
+    mocker.patch.object(okta, "list_users_for_group", side_effect=members_of(okta_users[0], okta_users[1]))
+    async with record_sync_stage("run-1", "memberships"):
+        await sync_group_memberships(False, concurrency=10, full=True)
+
+    mocker.patch.object(okta, "list_users_for_group", side_effect=members_of(okta_users[1], okta_users[2]))
+    async with record_sync_stage("run-2", "memberships"):
+        await sync_group_memberships(False, concurrency=10, full=True)
+        client = _WrapperClient(_FakeOktaClient())
+        for _ in range(2):
+            await client.list_group_users(okta_groups[0].id)
+
+    entries = (await db.session.scalars(select(SyncLedgerEntry).order_by(SyncLedgerEntry.id))).all()
+    assert [(entry.run_id, entry.stage, entry.succeeded) for entry in entries] == [
+        ("run-1", "memberships", True),
+        ("run-2", "memberships", True),
+    ]
+    first, second = entries
+    assert first.rows_inserted == 2 and first.rows_ended == 0
+    assert second.rows_inserted == 1 and second.rows_ended == 1
+    assert second.groups_skipped == 1
+    assert second.peak_fetch_window == 2
+    assert second.okta_calls == {"list_group_users": 2}
+    assert second.duration_seconds >= 0
+
+    stage_tags = {"stage": "memberships"}
+    assert ("record_counter", "syncer.stage.rows", 1, {**stage_tags, "change": "ended"}) in metrics.calls
+    assert ("record_counter", "syncer.stage.groups_skipped", 1, stage_tags) in metrics.calls
+    assert ("record_gauge", "syncer.stage.peak_fetch_window", 2, stage_tags) in metrics.calls
+    assert (
+        "record_counter",
+        "syncer.stage.okta_calls",
+        2,
+        {**stage_tags, "endpoint": "list_group_users"},
+    ) in metrics.calls
+
+
+async def test_record_sync_stage_records_a_failed_stage(db: Db) -> None:
+    """A stage that raises is still recorded, as failed, and its uncommitted writes are dropped."""
+    user = OktaUserFactory.build()
+    with pytest.raises(RuntimeError):
+        async with record_sync_stage("run-1", "users"):
+            db.session.add(user)
+            await db.session.flush()
+            syncer._count_sync_stage_rows(inserted=1)
+            raise RuntimeError("boom")
+
+    entry = (await db.session.scalars(select(SyncLedgerEntry))).one()
+    assert entry.stage == "users" and not entry.succeeded
+    assert entry.rows_inserted == 1
+    assert (await db.session.scalars(select(OktaUser).where(OktaUser.id == user.id))).all() == []
+
+
+async def test_record_sync_stage_counts_resurrected_group_as_updated(db: Db, mocker: MockerFixture) -> None:
+    """Undeleting a group still listed by Okta updates it rather than ending it."""
+    okta_groups = [GroupFactory.create(), await GroupFactory.create_access_owner_group()]
+    await seed_db(db, [], okta_groups[:1])
+    mocker.patch.object(okta, "iter_groups", side_effect=okta_pages([Group(g) for g in okta_groups]))
+    mocker.patch.object(okta, "list_groups_with_active_rules", return_value={})
+    await sync_groups(False)
+    deleted_group = await db.session.get(OktaGroup, okta_groups[0].id)
+    assert deleted_group is not None
+    deleted_group.deleted_at = datetime.now()
+    await db.session.commit()
+
+    async with record_sync_stage("run-1", "groups"):
+        await sync_groups(False)
+
+    entry = (await db.session.scalars(select(SyncLedgerEntry))).one()
+    assert (entry.rows_inserted, entry.rows_updated, entry.rows_ended) == (0, 1, 0)
+
+
+async def test_list_sync_runs(client: AsyncClient, db: Db, mock_user: Any, url_for: Any) -> None:
+    started_at = datetime(2026, 10, 1, 12)
+    for minutes, stage in enumerate(("users", "groups", "memberships")):
+        db.session.add(
+            SyncLedgerEntry(
+                run_id="run-1",
+                stage=stage,
+                started_at=started_at + timedelta(minutes=minutes),
+                duration_seconds=1.5,
+                succeeded=True,
+                okta_calls={"list_groups": 3},
+                rows_inserted=1,
+                rows_updated=2,
+                rows_ended=3,
+                groups_skipped=0,
+                peak_fetch_window=0,
+            )
+        )
+    await db.session.commit()
+
+    rep = await client.get(url_for("api-sync-runs.sync_runs"))
+    assert rep.status_code == 200
+    data = rep.json()
+    assert data["total"] == 3
+    assert [entry["stage"] for entry in data["items"]] == ["memberships", "groups", "users"]
+    assert data["items"][0]["okta_calls"] == {"list_groups": 3}
+
+    user = await OktaUserFactory.create_async()
+    mock_user(user)
+    rep = await client.get(url_for("api-sync-runs.sync_runs"))
+    assert rep.status_code == 403
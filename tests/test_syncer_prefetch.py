@@ -2,7 +2,18 @@ import asyncio
 from types import SimpleNamespace
 from typing import Any
 
-from api.syncer import _prefetch_group_okta_lists
+import pytest
+
+from api import syncer
+from api.services.okta_service import OktaTransientError, RateLimitStatus, _report_rate_limit
+from api.services import okta
+from api.extensions import _session_scope
+from api.syncer import (
+    _AdaptiveFetchWindow,
+    _prefetch_group_okta_lists,
+    _reconcile_in_lanes,
+    _write_okta_group_users,
+)
 
 
 def _groups(n: int) -> list[Any]:
@@ -63,3 +74,206 @@ async def test_prefetch_handles_empty_group_list() -> None:
 
     out = [pair async for pair in _prefetch_group_okta_lists([], fetch, 10)]
     assert out == []
+
+
+class _RecordingMetrics:
+    """Stand-in for the metrics_reporter HookRelay that records each emit."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str, float, Any]] = []
+
+    def __getattr__(self, hook_name: str) -> Any:
+        def caller(*, metric_name: str, value: float, tags: Any) -> list[Any]:
+            self.calls.append((hook_name, metric_name, value, tags))
+            return []
+
+        return caller
+
+
+def _rate_limit_headers(remaining: int, reset: int) -> dict[str, str]:
+    return {"X-Rate-Limit-Limit": "100", "X-Rate-Limit-Remaining": str(remaining), "X-Rate-Limit-Reset": str(reset)}
+
+
+async def test_prefetch_window_shrinks_when_rate_limit_runs_low(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Pages reporting a nearly spent rate-limit bucket halve the window down to a
+    single fetch, and the shrinking is reported through the metrics hook."""
+    metrics = _RecordingMetrics()
+    monkeypatch.setattr(syncer, "get_metrics_reporter_hook", lambda: metrics)
+    groups = _groups(30)
+    active = 0
+    peak_after_throttling = 0
+    fetched = 0
+
+    async def fetch(group_id: str) -> list[str]:
+        nonlocal active, peak_after_throttling, fetched
+        active += 1
+        if fetched >= 10:
+            peak_after_throttling = max(peak_after_throttling, active)
+        await asyncio.sleep(0)
+        fetched += 1
+        # A new rate-limit window each page, every one nearly spent
+        _report_rate_limit(_rate_limit_headers(remaining=5, reset=fetched))
+        active -= 1
+        return [group_id]
+
+    out = [pair async for pair in _prefetch_group_okta_lists(groups, fetch, 8)]
+
+    assert len(out) == 30
+    assert peak_after_throttling == 1
+    gauges = [value for hook, name, value, _ in metrics.calls if name == "syncer.okta_fetch.window_size"]
+    assert gauges[0] == 8
+    assert gauges[-1] == 1
+    assert ("record_counter", "syncer.okta_fetch.throttled", 1, {"reason": "rate_limit"}) in metrics.calls
+
+
+async def test_prefetch_window_shrinks_on_transient_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    metrics = _RecordingMetrics()
+    monkeypatch.setattr(syncer, "get_metrics_reporter_hook", lambda: metrics)
+
+    async def fetch(group_id: str) -> list[str]:
+        raise OktaTransientError("429")
+
+    out = [pair async for pair in _prefetch_group_okta_lists(_groups(4), fetch, 4)]
+
+    assert all(isinstance(result, OktaTransientError) for _, result in out)
+    assert ("record_counter", "syncer.okta_fetch.throttled", 1, {"reason": "transient_error"}) in metrics.calls
+    assert [value for _, name, value, _ in metrics.calls if name == "syncer.okta_fetch.window_size"] == [4, 2, 1]
+
+
+async def test_prefetch_starts_the_largest_groups_first(monkeypatch: pytest.MonkeyPatch) -> None:
+    """With list sizes, the longest fetches start first and overlap the short ones,
+    and the pass reports its actual time against the critical path."""
+    metrics = _RecordingMetrics()
+    monkeypatch.setattr(syncer, "get_metrics_reporter_hook", lambda: metrics)
+    sizes = {"g0": 1, "g1": 1, "g2": 1, "g3": 1, "g4": 8}
+    started: list[str] = []
+
+    async def fetch(group_id: str) -> list[str]:
+        started.append(group_id)
+        await asyncio.sleep(sizes[group_id] / 100)
+        return [group_id]
+
+    out = [pair async for pair in _prefetch_group_okta_lists(_groups(5), fetch, 2, sizes)]
+
+    assert len(out) == 5
+    assert started[0] == "g4"
+    critical_path = {
+        tags["path"]: value
+        for _, name, value, tags in metrics.calls
+        if name == "syncer.okta_fetch.critical_path_seconds"
+    }
+    # The 80ms fetch is the critical path, and the four 10ms fetches fit beside it
+    assert critical_path["expected"] == pytest.approx(0.08, abs=0.02)
+    assert critical_path["actual"] < critical_path["expected"] + 0.03
+
+
+def test_adaptive_window_halves_once_per_rate_limit_window_and_grows_back() -> None:
+    window = _AdaptiveFetchWindow(8)
+
+    # Several low readings from the same rate-limit window halve it once
+    for _ in range(3):
+        window.observe(RateLimitStatus(limit=100, remaining=10, reset=1000))
+    assert window.size == 4
+    assert window.throttle_events == ["rate_limit"]
+
+    # Healthy pages grow it by about one per window's worth of pages, up to the maximum
+    for _ in range(5):
+        window.observe(RateLimitStatus(limit=100, remaining=90, reset=1000))
+    assert window.size == 5
+    for _ in range(100):
+        window.observe(RateLimitStatus(limit=100, remaining=90, reset=1000))
+    assert window.size == 8
+
+
+async def test_okta_writes_are_bounded_and_record_failures(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Corrective writes run up to ``concurrency`` at once, and a failing call is
+    returned rather than aborting the others."""
+    metrics = _RecordingMetrics()
+    monkeypatch.setattr(syncer, "get_metrics_reporter_hook", lambda: metrics)
+    active = 0
+    peak = 0
+    written: list[str] = []
+
+    async def add_user_to_group(group_id: str, user_id: str) -> None:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0)
+        active -= 1
+        if user_id == "u3":
+            raise RuntimeError("boom")
+        written.append(user_id)
+
+    monkeypatch.setattr(okta, "add_user_to_group", add_user_to_group)
+
+    user_ids = [f"u{i}" for i in range(20)]
+    failed = await _write_okta_group_users("add_user_to_group", "g0", user_ids, 5)
+
+    assert failed == ["u3"]
+    assert sorted(written) == sorted(set(user_ids) - {"u3"})
+    assert peak == 5
+    assert ("record_counter", "syncer.okta_write.failed", 1, {"call": "add_user_to_group"}) in metrics.calls
+
+
+async def _pairs(n: int) -> Any:
+    for group in _groups(n):
+        yield group, [group.id]
+
+
+async def test_reconcile_lanes_each_use_their_own_session_scope(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(syncer, "_supports_concurrent_sessions", lambda: True)
+    removed_scopes: list[str | None] = []
+
+    async def remove() -> None:
+        removed_scopes.append(_session_scope.get())
+
+    monkeypatch.setattr(syncer.db, "remove", remove)
+    active = 0
+    peak = 0
+    scopes: dict[str, str | None] = {}
+
+    async def reconcile(group: Any, fetched: Any) -> None:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        scopes[group.id] = _session_scope.get()
+        await asyncio.sleep(0.001)
+        active -= 1
+
+    await _reconcile_in_lanes(_pairs(20), reconcile, 4)
+
+    assert set(scopes) == {f"g{i}" for i in range(20)}
+    assert peak == 4
+    # Four lane scopes, none of them the caller's, each closing its session on the way out
+    assert len(set(scopes.values())) == 4
+    assert _session_scope.get() not in scopes.values()
+    assert sorted(removed_scopes, key=str) == sorted(set(scopes.values()), key=str)
+
+
+async def test_reconcile_lanes_surface_a_failed_lane(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(syncer, "_supports_concurrent_sessions", lambda: True)
+
+    async def remove() -> None:
+        pass
+
+    monkeypatch.setattr(syncer.db, "remove", remove)
+
+    async def reconcile(group: Any, fetched: Any) -> None:
+        if group.id == "g3":
+            raise RuntimeError("boom")
+        await asyncio.sleep(0)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await _reconcile_in_lanes(_pairs(20), reconcile, 2)
+
+
+async def test_reconcile_lanes_fall_back_to_the_callers_session(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(syncer, "_supports_concurrent_sessions", lambda: False)
+    scopes: set[str | None] = set()
+
+    async def reconcile(group: Any, fetched: Any) -> None:
+        scopes.add(_session_scope.get())
+
+    await _reconcile_in_lanes(_pairs(5), reconcile, 4)
+
+    assert scopes == {_session_scope.get()}
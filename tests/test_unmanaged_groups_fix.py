@@ -0,0 +1,148 @@
+from typing import Any
+
+from pytest_mock import MockerFixture
+from sqlalchemy import event, select
+
+from api.extensions import Db
+from api.integrity import UnmanagedGroupAccess, verify_and_fix_unmanaged_groups
+from api.models import AccessRequest, AccessRequestStatus, OktaUserGroupMember, RoleGroupMap, RoleRequest
+from api.operations import ModifyGroupUsers
+from tests.factories import (
+    AccessRequestFactory,
+    OktaGroupFactory,
+    OktaUserFactory,
+    OktaUserGroupMemberFactory,
+    RoleGroupFactory,
+    RoleGroupMapFactory,
+    RoleRequestFactory,
+)
+
+
+async def _seed_unmanaged_group_access(db: Db) -> dict[str, Any]:
+    user, requester = await OktaUserFactory.create_batch_async(2)
+    role_group = await RoleGroupFactory.create_async()
+    unmanaged_group = await OktaGroupFactory.create_async(is_managed=False)
+    managed_group = await OktaGroupFactory.create_async()
+    await ModifyGroupUsers(group=role_group, members_to_add=[user.id], sync_to_okta=False).execute()
+
+    role_group_map = await RoleGroupMapFactory.create_async(
+        role_group_id=role_group.id, group_id=unmanaged_group.id, is_owner=False
+    )
+    managed_role_group_map = await RoleGroupMapFactory.create_async(
+        role_group_id=role_group.id, group_id=managed_group.id, is_owner=False
+    )
+    role_membership = await OktaUserGroupMemberFactory.create_async(
+        user_id=user.id, group_id=unmanaged_group.id, role_group_map_id=role_group_map.id, is_owner=False
+    )
+    direct_membership = await OktaUserGroupMemberFactory.create_async(
+        user_id=requester.id, group_id=unmanaged_group.id, is_owner=False
+    )
+    access_request = await AccessRequestFactory.create_async(
+        requester_user_id=requester.id, requested_group_id=unmanaged_group.id
+    )
+    managed_access_request = await AccessRequestFactory.create_async(
+        requester_user_id=requester.id, requested_group_id=managed_group.id
+    )
+    role_request = await RoleRequestFactory.create_async(
+        requester_user_id=user.id, requester_role_id=role_group.id, requested_group_id=unmanaged_group.id
+    )
+    await db.session.commit()
+    return {
+        "unmanaged_group": unmanaged_group.id,
+        "role_group_map": role_group_map.id,
+        "managed_role_group_map": managed_role_group_map.id,
+        "role_membership": role_membership.id,
+        "direct_membership": direct_membership.id,
+        "access_request": access_request.id,
+        "managed_access_request": managed_access_request.id,
+        "role_request": role_request.id,
+    }
+
+
+async def test_fix_unmanaged_groups(db: Db) -> None:
+    ids = await _seed_unmanaged_group_access(db)
+    # An unmanaged group without access left to remove is skipped
+    await OktaGroupFactory.create_async(is_managed=False)
+    await db.session.commit()
+
+    summary = await verify_and_fix_unmanaged_groups()
+
+    assert summary.groups.count == 1
+    assert summary.role_memberships.count == 1
+    assert summary.role_group_maps.count == 1
+    assert summary.access_requests.count == 1
+    assert summary.role_requests.count == 1
+
+    db.session.expire_all()
+    assert (await db.session.get(OktaUserGroupMember, ids["role_membership"])).ended_at is not None
+    assert (await db.session.get(OktaUserGroupMember, ids["direct_membership"])).ended_at is None
+    assert (await db.session.get(RoleGroupMap, ids["role_group_map"])).ended_at is not None
+    assert (await db.session.get(RoleGroupMap, ids["managed_role_group_map"])).ended_at is None
+    assert (await db.session.get(AccessRequest, ids["access_request"])).status == AccessRequestStatus.REJECTED
+    assert (await db.session.get(AccessRequest, ids["managed_access_request"])).status == AccessRequestStatus.PENDING
+    assert (await db.session.get(RoleRequest, ids["role_request"])).status == AccessRequestStatus.REJECTED
+
+    # Nothing left to fix
+    summary = await verify_and_fix_unmanaged_groups()
+    assert summary.groups.count == 0
+
+
+async def test_fix_unmanaged_groups_dry_run(db: Db) -> None:
+    ids = await _seed_unmanaged_group_access(db)
+    reported: list[UnmanagedGroupAccess] = []
+
+    summary = await verify_and_fix_unmanaged_groups(dry_run=True, report=reported.append)
+
+    assert {(access.kind, access.id) for access in reported} == {
+        ("role_membership", ids["role_membership"]),
+        ("role_group_map", ids["role_group_map"]),
+        ("access_request", ids["access_request"]),
+        ("role_request", ids["role_request"]),
+    }
+    assert {access.group_id for access in reported} == {ids["unmanaged_group"]}
+
+    assert (
+        summary.groups.count,
+        summary.role_memberships.count,
+        summary.role_group_maps.count,
+        summary.access_requests.count,
+        summary.role_requests.count,
+    ) == (1, 1, 1, 1, 1)
+
+    db.session.expire_all()
+    assert (await db.session.get(OktaUserGroupMember, ids["role_membership"])).ended_at is None
+    assert (await db.session.get(RoleGroupMap, ids["role_group_map"])).ended_at is None
+    assert (await db.session.get(AccessRequest, ids["access_request"])).status == AccessRequestStatus.PENDING
+    assert (await db.session.get(RoleRequest, ids["role_request"])).status == AccessRequestStatus.PENDING
+
+
+async def test_fix_unmanaged_groups_in_batches(db: Db, mocker: MockerFixture) -> None:
+    role_group = await RoleGroupFactory.create_async()
+    unmanaged_groups = await OktaGroupFactory.create_batch_async(5, is_managed=False)
+    for unmanaged_group in unmanaged_groups:
+        await RoleGroupMapFactory.create_async(role_group_id=role_group.id, group_id=unmanaged_group.id)
+    await db.session.commit()
+    mocker.patch("api.integrity._UNMANAGED_GROUP_BATCH_SIZE", 2)
+
+    statements = []
+
+    def _count(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    event.listen(db.engine.sync_engine, "before_cursor_execute", _count)
+    try:
+        summary = await verify_and_fix_unmanaged_groups()
+    finally:
+        event.remove(db.engine.sync_engine, "before_cursor_execute", _count)
+
+    assert summary.groups.count == 5
+    assert summary.role_group_maps.count == 5
+    # One UPDATE per phase per batch, not per group
+    assert len([statement for statement in statements if statement.startswith("UPDATE role_group_map")]) == 3
+    assert (
+        await db.session.scalar(
+            select(RoleGroupMap.id)
+            .where(RoleGroupMap.role_group_id == role_group.id)
+            .where(RoleGroupMap.ended_at.is_(None))
+        )
+    ) is None
@@ -1,3 +1,4 @@
+from datetime import datetime, timedelta, timezone
 from typing import List
 
 from pytest_mock import MockerFixture
@@ -5,12 +6,21 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.extensions import Db
-from api.models import AccessRequest, AccessRequestStatus, OktaGroup, OktaUser, OktaUserGroupMember, RoleGroup
+from api.models import (
+    AccessRequest,
+    AccessRequestStatus,
+    OktaGroup,
+    OktaUser,
+    OktaUserGroupMember,
+    RoleGroup,
+    SyncState,
+)
 from api.operations import CreateAccessRequest
 from api.services import okta
 from api.services.okta_service import User, UserSchema
-from api.syncer import sync_users
+from api.syncer import USERS_SYNC_STATE, sync_users
 from tests.factories import UserFactory, UserSchemaFactory
+from tests.helpers import okta_pages
 
 
 async def test_user_sync_no_changes(db: Db, mocker: MockerFixture) -> None:
@@ -241,6 +251,183 @@ async def test_user_sync_ends_memberships_for_previously_deleted_user(
     assert delete_ownership_spy.call_count == 1
 
 
+async def test_user_sync_upserts_new_and_changed_users_in_chunks(db: Db, mocker: MockerFixture) -> None:
+    existing_users_in_okta = UserFactory.create_batch(2)
+    await seed_db(db, existing_users_in_okta)
+    new_users_in_okta = UserFactory.create_batch(5)
+    existing_users_in_okta[0].profile.first_name = "changed"
+
+    mocker.patch("api.syncer._UPSERT_CHUNK_SIZE", 2)
+    new_db_users = await run_sync(db, mocker, existing_users_in_okta + new_users_in_okta)
+
+    for user in new_users_in_okta:
+        new_db_user = get_user_by_id(new_db_users, user.id)
+        assert new_db_user.email == user.profile.login
+        assert new_db_user.deleted_at is None
+    assert get_user_by_id(new_db_users, existing_users_in_okta[0].id).first_name == "changed"
+
+
+async def test_user_sync_skips_unchanged_users(db: Db, mocker: MockerFixture) -> None:
+    initial_users_in_okta = UserFactory.create_batch(2)
+    # Seed through a first sync so the stored profiles use the same schema titles
+    initial_db_users = await run_sync(db, mocker, initial_users_in_okta)
+    initial_users_in_okta[0].profile.last_name = "changed"
+
+    new_db_users = await run_sync(db, mocker, initial_users_in_okta)
+
+    # The changed row is rewritten and its updated_at bumped, the unchanged one is left alone
+    changed_user = get_user_by_id(new_db_users, initial_users_in_okta[0].id)
+    assert changed_user.last_name == "changed"
+    assert changed_user.updated_at > get_user_by_id(initial_db_users, initial_users_in_okta[0].id).updated_at
+    unchanged_user = get_user_by_id(new_db_users, initial_users_in_okta[1].id)
+    assert unchanged_user.updated_at == get_user_by_id(initial_db_users, initial_users_in_okta[1].id).updated_at
+
+
+async def test_user_sync_rewrites_user_changed_outside_sync(db: Db, mocker: MockerFixture) -> None:
+    initial_users_in_okta = UserFactory.create_batch(1)
+    await run_sync(db, mocker, initial_users_in_okta)
+
+    # Deleting the user in Access clears the stored hash, so the next sync
+    # restores the user from Okta, where they are still active
+    async with AsyncSession(db.engine) as session:
+        db_user = await session.get(OktaUser, initial_users_in_okta[0].id)
+        db_user.deleted_at = func.now()
+        await session.commit()
+        await session.refresh(db_user)
+        assert db_user.okta_profile_hash is None
+
+    new_db_users = await run_sync(db, mocker, initial_users_in_okta)
+
+    db_user = get_user_by_id(new_db_users, initial_users_in_okta[0].id)
+    assert db_user.deleted_at is None
+    assert db_user.okta_profile_hash is not None
+
+
+async def test_user_sync_updates_managers(db: Db, mocker: MockerFixture) -> None:
+    manager, report, former_report = UserFactory.create_batch(3)
+    manager.profile.employee_number = "1000"
+    former_report.profile.manager_id = "1000"
+    await seed_db(db, [manager, report, former_report])
+    async with AsyncSession(db.engine) as session:
+        (await session.get(OktaUser, former_report.id)).manager_id = manager.id
+        await session.commit()
+
+    report.profile.manager_id = "1000"
+    former_report.profile.manager_id = None
+    new_db_users = await run_sync(db, mocker, [manager, report, former_report])
+
+    assert get_user_by_id(new_db_users, manager.id).manager_id is None
+    assert get_user_by_id(new_db_users, report.id).manager_id == manager.id
+    assert get_user_by_id(new_db_users, former_report.id).manager_id is None
+
+
+async def test_user_sync_incremental_only_lists_changed_users(db: Db, mocker: MockerFixture) -> None:
+    initial_users_in_okta = UserFactory.create_batch(2)
+    await seed_db(db, initial_users_in_okta)
+    watermark = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    await seed_sync_state(db, watermark=watermark, last_full_sync_at=datetime.now(timezone.utc))
+
+    # Only the first user changed in Okta since the last sync
+    initial_users_in_okta[0].profile.login = "changed"
+    iter_users_spy = mocker.patch.object(okta, "iter_users", side_effect=okta_pages([User(initial_users_in_okta[0])]))
+    mocker.patch.object(okta, "get_user_schema", return_value=UserSchema(UserSchemaFactory.create()))
+
+    await sync_users()
+
+    iter_users_spy.assert_called_once_with(query_params={"filter": 'lastUpdated gt "2024-05-01T12:25:00.000Z"'})
+    changed_user = await db.session.get(OktaUser, initial_users_in_okta[0].id)
+    unchanged_user = await db.session.get(OktaUser, initial_users_in_okta[1].id)
+    await db.session.refresh(changed_user)
+    await db.session.refresh(unchanged_user)
+    assert changed_user.email == "changed"
+    # Missing from the incremental listing is not the same as deleted from Okta
+    assert unchanged_user.deleted_at is None
+
+    state = await db.session.get(SyncState, USERS_SYNC_STATE)
+    await db.session.refresh(state)
+    assert state.watermark > watermark.replace(tzinfo=None)
+
+
+async def test_user_sync_runs_full_reconcile_when_due(db: Db, mocker: MockerFixture) -> None:
+    initial_users_in_okta = UserFactory.create_batch(2)
+    await seed_db(db, initial_users_in_okta)
+    last_full_sync_at = datetime.now(timezone.utc) - timedelta(days=2)
+    await seed_sync_state(db, watermark=datetime.now(timezone.utc), last_full_sync_at=last_full_sync_at)
+
+    iter_users_spy = mocker.patch.object(okta, "iter_users", side_effect=okta_pages([User(initial_users_in_okta[0])]))
+    mocker.patch.object(okta, "get_user_schema", return_value=UserSchema(UserSchemaFactory.create()))
+
+    await sync_users()
+
+    iter_users_spy.assert_called_once_with()
+    deleted_user = await db.session.get(OktaUser, initial_users_in_okta[1].id)
+    await db.session.refresh(deleted_user)
+    assert deleted_user.deleted_at is not None
+
+    state = await db.session.get(SyncState, USERS_SYNC_STATE)
+    await db.session.refresh(state)
+    assert state.last_full_sync_at > last_full_sync_at.replace(tzinfo=None)
+
+
+async def test_user_sync_falls_back_to_full_without_watermark(db: Db, mocker: MockerFixture) -> None:
+    initial_users_in_okta = UserFactory.create_batch(1)
+
+    iter_users_spy = mocker.patch.object(
+        okta, "iter_users", side_effect=okta_pages([User(u) for u in initial_users_in_okta])
+    )
+    mocker.patch.object(okta, "get_user_schema", return_value=UserSchema(UserSchemaFactory.create()))
+
+    await sync_users(full=False)
+
+    iter_users_spy.assert_called_once_with()
+    state = await db.session.get(SyncState, USERS_SYNC_STATE)
+    assert state is not None
+    assert state.watermark is not None
+    assert state.last_full_sync_at == state.watermark
+
+
+async def test_user_sync_incremental_resolves_manager_from_db(db: Db, mocker: MockerFixture) -> None:
+    manager = UserFactory.create()
+    manager.profile.employee_number = "1000"
+    report = UserFactory.create()
+    await seed_db(db, [manager, report])
+    await seed_sync_state(db, watermark=datetime.now(timezone.utc), last_full_sync_at=datetime.now(timezone.utc))
+
+    # Only the report changed in Okta: they now report to the manager
+    report.profile.manager_id = "1000"
+    mocker.patch.object(okta, "iter_users", side_effect=okta_pages([User(report)]))
+    mocker.patch.object(okta, "get_user_schema", return_value=UserSchema(UserSchemaFactory.create()))
+
+    await sync_users(full=False)
+
+    db_report = await db.session.get(OktaUser, report.id)
+    await db.session.refresh(db_report)
+    assert db_report.manager_id == manager.id
+
+
+async def test_user_sync_resolves_manager_listed_on_a_later_page(db: Db, mocker: MockerFixture) -> None:
+    report = UserFactory.create()
+    report.profile.manager_id = "1000"
+    manager = UserFactory.create()
+    manager.profile.employee_number = "1000"
+    mocker.patch.object(okta, "iter_users", side_effect=okta_pages([User(report)], [User(manager)]))
+    mocker.patch.object(okta, "get_user_schema", return_value=UserSchema(UserSchemaFactory.create()))
+
+    await sync_users(full=True)
+
+    db_report = await db.session.get(OktaUser, report.id)
+    assert db_report is not None
+    await db.session.refresh(db_report)
+    assert db_report.manager_id == manager.id
+    assert await db.session.get(OktaUser, manager.id) is not None
+
+
+async def seed_sync_state(db: Db, *, watermark: datetime, last_full_sync_at: datetime) -> None:
+    async with AsyncSession(db.engine) as session:
+        session.add(SyncState(name=USERS_SYNC_STATE, watermark=watermark, last_full_sync_at=last_full_sync_at))
+        await session.commit()
+
+
 async def seed_db(db: Db, users: List[User]) -> List[OktaUser]:
     async with AsyncSession(db.engine) as session:
         session.add_all([User(u).update_okta_user(OktaUser(), {}) for u in users])
@@ -251,7 +438,7 @@ async def seed_db(db: Db, users: List[User]) -> List[OktaUser]:
 async def run_sync(db: Db, mocker: MockerFixture, okta_users: List[User]) -> List[OktaUser]:
     schema = UserSchemaFactory.create()
     async with AsyncSession(db.engine) as session:
-        mocker.patch.object(okta, "list_users", return_value=[User(u) for u in okta_users])
+        mocker.patch.object(okta, "iter_users", side_effect=okta_pages([User(u) for u in okta_users]))
         mocker.patch.object(okta, "get_user_schema", return_value=UserSchema(schema))
         await sync_users()
         return list((await session.scalars(select(OktaUser))).all())